@@ -0,0 +1,107 @@
+"""
+Categorical encoding: LabelEncoder / pd.get_dummies vs CategoricalEncoder
+
+Encodes synthetic high-cardinality `occupation` and `region` columns (Zipf
+distributed) the previous way, LabelEncoder on astype(str) per column and
+pd.get_dummies + pd.concat, and with CategoricalEncoder (frozen vocabulary,
+hash lookups, sparse one-hot). Label codes are checked to be identical. Also
+shows what each does with a later batch holding unseen categories: the
+column set get_dummies produces and whether LabelEncoder can encode it.
+
+Usage:
+    python benchmarks/bench_categorical_encoding.py [n_rows] [n_occupations] [n_regions]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from common import print_header
+from src.preprocessing import CategoricalEncoder
+
+COLUMNS = ['occupation', 'region']
+
+
+def zipf_column(rng, prefix, n_categories, n_rows):
+    weights = 1 / np.arange(1, n_categories + 1)
+    names = np.array([f"{prefix}_{i:05d}" for i in range(n_categories)], dtype=object)
+    return names[rng.choice(n_categories, n_rows, p=weights / weights.sum())]
+
+
+def synthetic_frame(n_rows, n_occupations, n_regions, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'occupation': zipf_column(rng, 'occupation', n_occupations, n_rows),
+        'region': zipf_column(rng, 'region', n_regions, n_rows),
+        'annual_income': rng.lognormal(10.5, 0.8, n_rows),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def before_label(df):
+    encoders = {col: LabelEncoder() for col in COLUMNS}
+    return encoders, {col: encoders[col].fit_transform(df[col].astype(str)) for col in COLUMNS}
+
+
+def before_onehot(df):
+    dummies = pd.get_dummies(df[COLUMNS], prefix=COLUMNS)
+    return pd.concat([df.drop(columns=COLUMNS), dummies], axis=1)
+
+
+def main(n_rows: int = 500_000, n_occupations: int = 1_000, n_regions: int = 100):
+    df = synthetic_frame(n_rows, n_occupations, n_regions)
+    as_category = df.astype({col: 'category' for col in COLUMNS})
+    print_header(f"CATEGORICAL ENCODING: {n_rows:,} ROWS, {n_occupations:,} OCCUPATIONS, {n_regions:,} REGIONS")
+    print(f"{'Method':<34} {'Before (s)':>11} {'After (s)':>11} {'Speedup':>9}")
+    print("-" * 70)
+
+    (label_encoders, old_codes), before = timed(lambda: before_label(df))
+    encoder, fit_seconds = timed(lambda: CategoricalEncoder(COLUMNS).fit(df))
+    new_codes, after = timed(lambda: encoder.transform(df))
+    for col in COLUMNS:
+        assert np.array_equal(old_codes[col], new_codes[col].to_numpy()), col
+    print(f"{'label fit + encode (object)':<34} {before:>11.2f} {fit_seconds + after:>11.2f} "
+          f"{before / (fit_seconds + after):>8.1f}x")
+    print(f"{'label encode only (object)':<34} {'':>11} {after:>11.2f}")
+    category_codes, after = timed(lambda: encoder.transform(as_category))
+    assert category_codes.equals(new_codes)
+    print(f"{'label encode only (category)':<34} {'':>11} {after:>11.3f}")
+
+    dense, before = timed(lambda: before_onehot(df))
+    dense_mb = dense.drop(columns=['annual_income']).memory_usage(index=False).sum() / 1024**2
+    n_dense_columns = dense.shape[1] - 1
+    del dense
+    matrix, after = timed(lambda: encoder.one_hot(df))
+    assert matrix.shape[1] == n_dense_columns
+    sparse_mb = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024**2
+    print(f"{'one-hot (get_dummies vs CSR)':<34} {before:>11.2f} {after:>11.2f} {before / after:>8.1f}x")
+    print(f"\nOne-hot memory: dense {dense_mb:,.1f} MB, CSR {sparse_mb:,.1f} MB "
+          f"({matrix.shape[1]:,} columns, {dense_mb / sparse_mb:,.0f}x smaller)")
+
+    # A later scoring batch: a few categories only, plus values never seen in fit
+    batch = df.sample(1_000, random_state=0).reset_index(drop=True)
+    batch.loc[:9, 'occupation'] = 'occupation_unseen'
+    print("\nLater 1,000-row batch with 10 unseen occupations:")
+    print(f"  get_dummies columns:          {before_onehot(batch).shape[1] - 1:,} (fit: {n_dense_columns:,})")
+    print(f"  CategoricalEncoder columns:   {encoder.one_hot(batch).shape[1]:,}")
+    try:
+        label_encoders['occupation'].transform(batch['occupation'].astype(str))
+        outcome = "encoded"
+    except ValueError as e:
+        outcome = f"raises ValueError ({str(e)[:40]}...)"
+    print(f"  LabelEncoder.transform:       {outcome}")
+    unseen = (encoder.transform(batch)['occupation'] == -1).sum()
+    print(f"  CategoricalEncoder.transform: {unseen} rows get the reserved code -1")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
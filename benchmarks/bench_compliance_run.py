@@ -0,0 +1,146 @@
+"""
+Compliance run over partitioned extracts: one in-memory frame vs run_compliance
+
+Writes synthetic monthly extracts (applicant ids, names, e-mails, phone
+numbers, national IDs, amounts and free-text notes that sometimes hold a
+phone number) as Parquet or CSV partitions. Processes them two ways, each
+in a fresh process: as before, concatenated into one DataFrame and passed
+to anonymize_data and a name-only privacy report, and with run_compliance
+(chunked, one partition per pool task, content-sampled PII scan). Reports
+wall time, rows/s, rows/s per core and peak RSS. Checks that the anonymised
+rows are identical, and compares what the name-only and content checks flag.
+
+Usage:
+    python benchmarks/bench_compliance_run.py [n_partitions] [rows_per_partition] [parquet|csv] [workers]
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import print_header, EMPLOYMENT_STATUSES
+from src.compliance import find_partitions, run_compliance
+from src.preprocessing import anonymize_data
+
+KEY = 'benchmark-secret-key'
+SENSITIVE = ['applicant_id', 'full_name', 'contact', 'mobile_no', 'national_id']
+
+
+def partition_frame(part, n_rows, seed=42):
+    rng = np.random.default_rng(seed + part)
+    ids = part * n_rows + np.arange(n_rows)
+    contact = pd.Series([f"applicant{i}@example.co.ug" for i in ids], dtype=object)
+    contact[rng.random(n_rows) < 0.1] = None
+    notes = np.where(rng.random(n_rows) < 0.3,
+                     [f"asked to call back on 07{i % 100_000_000:08d}" for i in ids], "documents complete")
+    return pd.DataFrame({
+        'applicant_id': ids,
+        'full_name': [f"Applicant {i}" for i in ids],
+        'contact': contact,
+        'mobile_no': [f"+256 7{i % 100:02d} {i % 1000:03d} {(i // 7) % 1000:03d}" for i in ids],
+        'national_id': [f"C{'MF'[i % 2]}{i:012d}" for i in ids],
+        'employment_status': rng.choice(EMPLOYMENT_STATUSES, n_rows),
+        'annual_income': rng.lognormal(10.5, 0.8, n_rows),
+        'paid_amount': rng.lognormal(8, 1, n_rows),
+        'notes': notes,
+    })
+
+
+def write_partitions(root, n_partitions, rows_per_partition, fmt):
+    for part in range(n_partitions):
+        path = Path(root) / f"month={part // 4 + 1:02d}" / f"part-{part:03d}.{fmt}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df = partition_frame(part, rows_per_partition)
+        df.to_parquet(path, index=False) if fmt == 'parquet' else df.to_csv(path, index=False)
+
+
+def read_partition(path, anonymized=False):
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    # Pseudonyms exceed float64 precision; read them as nullable integers
+    return pd.read_csv(path, dtype={col: 'UInt64' for col in SENSITIVE} if anonymized else None)
+
+
+def before_create_privacy_report(df):
+    """The previous report: PII by column name only"""
+    pii_keywords = ['name', 'email', 'phone', 'address', 'ssn', 'id', 'passport']
+    return [col for col in df.columns if any(keyword in col.lower() for keyword in pii_keywords)]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def in_memory(input_dir, output_path):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    df = pd.concat([read_partition(p) for p in find_partitions(input_dir)], ignore_index=True)
+    anonymized = anonymize_data(df, SENSITIVE, key=KEY)
+    flagged = before_create_privacy_report(df)
+    anonymized.to_parquet(output_path, index=False)
+    seconds, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    return {'rows': len(df), 'seconds': seconds, 'cpu_seconds': cpu, 'peak': peak_rss_mb(), 'flagged': flagged}
+
+
+def pooled(input_dir, output_dir, workers):
+    # A spawned process defaults its own pools to spawn; use the platform default
+    # a command-line run gets, so workers do not re-import pandas per pool
+    multiprocessing.set_start_method(multiprocessing.get_all_start_methods()[0], force=True)
+    return run_compliance(input_dir, output_dir, SENSITIVE, key=KEY, workers=workers)
+
+
+def same_output(reference_path, output_dir):
+    reference = pd.read_parquet(reference_path)
+    pooled_rows = pd.concat([read_partition(p, anonymized=True) for p in find_partitions(output_dir)], ignore_index=True)
+    return all(reference[col].astype('UInt64').equals(pooled_rows[col].astype('UInt64')) for col in SENSITIVE)
+
+
+def isolated(fn, *args):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def main(n_partitions: int = 16, rows_per_partition: int = 250_000, fmt: str = 'parquet', workers: int = None):
+    workers = workers or os.cpu_count() or 1
+    n_rows = n_partitions * rows_per_partition
+    print_header(f"COMPLIANCE RUN: {n_partitions} {fmt.upper()} PARTITIONS, {n_rows:,} ROWS")
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir, reference = Path(tmp) / "extracts", Path(tmp) / "in_memory.parquet"
+        write_partitions(input_dir, n_partitions, rows_per_partition, fmt)
+
+        print(f"{'Mode':<30} {'Wall (s)':>9} {'Rows/s':>12} {'Rows/s/core':>12} {'Peak RSS (MB)':>15}")
+        print("-" * 82)
+        before = isolated(in_memory, input_dir, reference)
+        print(f"{'one frame (concat)':<30} {before['seconds']:>9.2f} {n_rows / before['seconds']:>12,.0f} "
+              f"{n_rows / before['cpu_seconds']:>12,.0f} {before['peak']:>15,.0f}")
+
+        for n_workers in sorted({1, workers}):
+            output_dir = Path(tmp) / f"anonymized_{n_workers}"
+            report = isolated(pooled, input_dir, output_dir, n_workers)
+            peaks = list(report['worker_peak_rss_mb'].values())
+            print(f"{f'run_compliance, {n_workers} worker(s)':<30} {report['wall_seconds']:>9.2f} "
+                  f"{report['rows_per_second']:>12,.0f} {report['rows_per_second_per_core']:>12,.0f} "
+                  f"{max(peaks):>15,.0f}")
+        print(f"\nPeak RSS per worker (MB): {', '.join(f'{p:,.0f}' for p in peaks)}")
+        print(f"Anonymised rows identical to the one-frame run: {isolated(same_output, reference, output_dir)}")
+
+    print(f"\nFlagged by column name (before): {before['flagged']}")
+    print("Flagged by content sample:")
+    for col, types in report['pii_columns'].items():
+        status = "anonymised" if col in report['anonymized_columns'] else "NOT anonymised"
+        print(f"  {col:<14} {', '.join(types):<14} {status}")
+
+
+if __name__ == "__main__":
+    n_partitions = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    rows_per_partition = int(sys.argv[2]) if len(sys.argv) > 2 else 250_000
+    fmt = sys.argv[3] if len(sys.argv) > 3 else 'parquet'
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    main(n_partitions, rows_per_partition, fmt, workers)
@@ -0,0 +1,171 @@
+"""
+dataset_overview: separate full scans vs the single-pass profile_dataset
+
+The "before" function computes what dataset_overview used to print:
+memory_usage(deep=True), isnull().sum(), duplicated().sum() (which hashes
+every full row) and describe(), each a separate pass over an in-memory
+frame. It runs against profile_dataset on the same frame, and on the same
+data read chunk by chunk from Parquet (out of core). Every run is in a
+fresh process. Reports time and peak RSS, plus the profile's error against
+the exact figures: duplicate rows, quartiles (as rank error: how far q is
+from the share of values at or below the estimate, which stays meaningful
+for 0/1 columns) and distinct counts (HyperLogLog vs nunique). Also checks
+that profiles of separate partitions merge to the profile of the whole.
+
+Usage:
+    python benchmarks/bench_dataset_profile.py [n_rows] [duplicate_share]
+"""
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import print_header, EMPLOYMENT_STATUSES, LOAN_PURPOSES
+from src.profiling import profile_dataset
+
+PARTITIONS = 4
+
+
+def synthetic_frame(n_rows, duplicate_share, seed=42):
+    """Applicant-like columns with missing values, and duplicate_share of rows repeated"""
+    rng = np.random.default_rng(seed)
+    n_unique = n_rows - int(n_rows * duplicate_share)
+    df = pd.DataFrame({
+        'applicant_id': np.arange(n_unique),
+        'age': rng.integers(18, 80, n_unique),
+        'annual_income': rng.lognormal(10.5, 0.8, n_unique),
+        'employment_status': rng.choice(EMPLOYMENT_STATUSES, n_unique),
+        'employment_duration_months': rng.integers(0, 360, n_unique).astype(np.float64),
+        'credit_score': rng.uniform(300, 850, n_unique).round(),
+        'existing_debt': rng.lognormal(9, 1.2, n_unique),
+        'loan_amount': rng.lognormal(9.5, 0.9, n_unique),
+        'loan_term_months': rng.choice([12, 24, 36, 48, 60], n_unique),
+        'loan_purpose': rng.choice(LOAN_PURPOSES, n_unique),
+        'num_credit_accounts': rng.integers(0, 12, n_unique),
+        'credit_utilization': rng.random(n_unique),
+        'num_delinquencies': rng.poisson(0.5, n_unique),
+        'default_status': rng.integers(0, 2, n_unique),
+    })
+    for col in ['employment_duration_months', 'credit_score', 'existing_debt']:
+        df.loc[rng.random(n_unique) < 0.05, col] = np.nan
+    repeats = rng.integers(0, n_unique, n_rows - n_unique)
+    return pd.concat([df, df.iloc[repeats]], ignore_index=True).sample(frac=1, random_state=seed)
+
+
+def before_overview(df):
+    """The separate passes the previous dataset_overview made"""
+    return {
+        'memory': df.memory_usage(deep=True).sum(),
+        'missing': df.isnull().sum(),
+        'duplicates': int(df.duplicated().sum()),
+        'describe': df.describe().T,
+    }
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(mode, n_rows, duplicate_share, path):
+    if mode == 'parquet':
+        start = time.perf_counter()
+        profile_dataset(path)
+        return {'seconds': time.perf_counter() - start, 'peak': peak_rss_mb()}
+    df = synthetic_frame(n_rows, duplicate_share)
+    start = time.perf_counter()
+    before_overview(df) if mode == 'before' else profile_dataset(df)
+    return {'seconds': time.perf_counter() - start, 'peak': peak_rss_mb()}
+
+
+def rank_error(values, estimate, q):
+    """Distance from q to the range of ranks [share below, share at or below] the estimate"""
+    below = np.searchsorted(values, estimate, side='left') / len(values)
+    at_or_below = np.searchsorted(values, estimate, side='right') / len(values)
+    return max(below - q, q - at_or_below, 0.0)
+
+
+def accuracy(n_rows, duplicate_share, path):
+    """The Parquet profile against exact figures from the whole frame"""
+    df = synthetic_frame(n_rows, duplicate_share)
+    profile = profile_dataset(path)
+    describe = profile.describe()
+    errors = {}
+    for col in describe.index:
+        values = np.sort(df[col].dropna().to_numpy(dtype=np.float64))
+        errors[col] = max(rank_error(values, describe.loc[col, f"{q:.0%}"], q) for q in (0.25, 0.5, 0.75))
+    distinct_error = (profile.to_frame()['distinct'] / df.nunique() - 1).abs()
+    exact = df.describe().T
+    return {
+        'duplicates': int(df.duplicated().sum()),
+        'profile_duplicates': profile.duplicate_rows,
+        'duplicates_exact': profile.duplicates_exact,
+        'rank_error': max(errors.values()),
+        'rank_error_column': max(errors, key=errors.get),
+        'distinct_error': distinct_error.max(),
+        'distinct_error_column': distinct_error.idxmax(),
+        'same_counts': bool((describe['count'] == exact['count']).all()),
+        'same_means': bool(np.allclose(describe['mean'], exact['mean'], rtol=1e-9)),
+        'means': describe['mean'],
+    }
+
+
+def merged_profile(path):
+    """Profile each Parquet row group range separately, then merge"""
+    import pyarrow.parquet as pq
+    table = pq.read_table(path)
+    step = -(-table.num_rows // PARTITIONS)
+    parts = [profile_dataset(table.slice(start, step).to_pandas()) for start in range(0, table.num_rows, step)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    return merged
+
+
+def isolated(fn, *args):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def write_parquet(n_rows, duplicate_share, path):
+    synthetic_frame(n_rows, duplicate_share).to_parquet(path, index=False, row_group_size=100_000)
+
+
+def main(n_rows: int = 5_000_000, duplicate_share: float = 0.02):
+    print_header(f"DATASET PROFILE: {n_rows:,} ROWS, {duplicate_share:.0%} DUPLICATES")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "applicants.parquet"
+        isolated(write_parquet, n_rows, duplicate_share, path)
+        results = {mode: isolated(run, mode, n_rows, duplicate_share, path)
+                   for mode in ['before', 'in_memory', 'parquet']}
+        merged = isolated(merged_profile, path)
+        check = isolated(accuracy, n_rows, duplicate_share, path)
+
+    print(f"{'Mode':<38} {'Time (s)':>9} {'Speedup':>8} {'Peak RSS (MB)':>14}")
+    print("-" * 72)
+    labels = {'before': 'separate passes (in memory)', 'in_memory': 'profile_dataset (in memory)',
+              'parquet': 'profile_dataset (Parquet, chunked)'}
+    base = results['before']['seconds']
+    for mode, r in results.items():
+        print(f"{labels[mode]:<38} {r['seconds']:>9.2f} {base / r['seconds']:>7.1f}x {r['peak']:>14,.0f}")
+    print("(peak RSS of the in-memory modes includes the frame itself)")
+
+    print(f"\nDuplicate rows: exact {check['duplicates']:,}, profile {check['profile_duplicates']:,} "
+          f"(exact count: {check['duplicates_exact']})")
+    print(f"Largest quartile rank error: {check['rank_error']:.2e} ({check['rank_error_column']})")
+    print(f"Distinct counts: largest relative error {check['distinct_error']:.2%} ({check['distinct_error_column']})")
+    print(f"Counts identical / means equal to 1e-9: {check['same_counts']} / {check['same_means']}")
+    print(f"Merged partition profiles: {merged.rows:,} rows, {merged.duplicate_rows:,} duplicates, "
+          f"means equal: {np.allclose(merged.describe()['mean'], check['means'], rtol=1e-9)}")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    duplicate_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    main(n_rows, duplicate_share)
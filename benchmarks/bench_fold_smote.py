@@ -0,0 +1,75 @@
+"""
+Per-fold SMOTE: imblearn per candidate vs FoldSMOTE with cached k-NN graphs
+
+Builds a large synthetic imbalanced training set and, for each stratified
+fold, times imblearn's SMOTE.fit_resample on the fold's training rows (the
+cost every candidate model pays when each oversamples its own folds) against
+FoldSMOTE, which builds the minority neighbour graph once per fold and then
+only interpolates per candidate. The imblearn call is timed once per fold;
+its per-candidate cost is identical, so the "before" total is that time
+multiplied by the number of candidates.
+
+Usage:
+    python benchmarks/bench_fold_smote.py [n_rows] [n_candidates]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from sklearn.model_selection import StratifiedKFold
+
+from common import print_header
+from src.train_models import FoldSMOTE
+
+
+def synthetic_training_set(n_rows, n_features=12, default_rate=0.2, seed=42):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n_rows) < default_rate).astype(int)
+    X = rng.normal(size=(n_rows, n_features)) + y[:, None] * 0.5
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(n_features)]), pd.Series(y, name="default_status")
+
+
+def main(n_rows: int = 1_000_000, n_candidates: int = 4, n_folds: int = 5):
+    X, y = synthetic_training_set(n_rows)
+    folds = list(StratifiedKFold(n_splits=n_folds).split(X, y))
+    resampler = FoldSMOTE(sampling_strategy=0.7)
+
+    print_header(f"PER-FOLD SMOTE: {n_rows:,} ROWS, {n_folds} FOLDS, {n_candidates} CANDIDATES")
+    print(f"{'Fold':<6} {'imblearn/cand':>14} {'k-NN graph':>12} {'interp/cand':>12} "
+          f"{'before total':>13} {'after total':>12} {'rows out':>11}")
+    print("-" * 86)
+    before_all = after_all = 0.0
+    for i, (train_idx, _) in enumerate(folds):
+        start = time.perf_counter()
+        X_old, _ = SMOTE(sampling_strategy=0.7, random_state=42).fit_resample(X.iloc[train_idx], y.iloc[train_idx])
+        imblearn_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        X_new, _ = resampler.resample(X, y, i, train_idx)
+        first_call = time.perf_counter() - start
+        graph_seconds = resampler.graph_seconds[i]
+        interp_seconds = first_call - graph_seconds
+        if n_candidates > 1:
+            start = time.perf_counter()
+            for _ in range(n_candidates - 1):
+                resampler.resample(X, y, i, train_idx)
+            interp_seconds = (time.perf_counter() - start) / (n_candidates - 1)
+        if len(X_new) != len(X_old):
+            raise AssertionError(f"fold {i}: FoldSMOTE produced {len(X_new)} rows, imblearn {len(X_old)}")
+
+        before = imblearn_seconds * n_candidates
+        after = first_call + interp_seconds * (n_candidates - 1)
+        before_all, after_all = before_all + before, after_all + after
+        print(f"{i:<6} {imblearn_seconds:>12.2f} s {graph_seconds:>10.2f} s {interp_seconds:>10.2f} s "
+              f"{before:>11.2f} s {after:>10.2f} s {len(X_new):>11,}")
+    print("-" * 86)
+    print(f"{'all':<6} {'':>14} {'':>12} {'':>12} {before_all:>11.2f} s {after_all:>10.2f} s "
+          f"({before_all / after_all:.1f}x)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
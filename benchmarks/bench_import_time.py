@@ -0,0 +1,71 @@
+"""
+Startup cost of importing src.utils: eager vs lazy matplotlib/seaborn
+
+Each import runs in a fresh interpreter, repeated, and the median wall
+time is reported for: pandas alone (the floor), what importing utils used
+to add (matplotlib.pyplot and seaborn with the style applied), src.utils
+now, and src.utils plus the first plot in headless mode (the deferred cost,
+paid only by code that plots). Also reports which plotting modules are
+loaded after importing utils. Steps that need matplotlib are skipped when
+it is not installed.
+
+Usage:
+    python benchmarks/bench_import_time.py [repeats]
+"""
+
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from common import print_header, ROOT
+
+MATPLOTLIB_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ['matplotlib', 'seaborn'])
+
+SETUP = f"import sys, time; sys.path.insert(0, {str(ROOT)!r}); start = time.perf_counter()\n"
+CASES = {
+    'pandas': ("import pandas", False),
+    'pandas + pyplot/seaborn (old utils)': (
+        "import pandas, matplotlib\nmatplotlib.use('Agg')\nimport matplotlib.pyplot as plt, seaborn as sns\n"
+        "plt.style.use('seaborn-v0_8-darkgrid'); sns.set_palette('husl')", True),
+    'src.utils': ("import src.utils", False),
+    'src.utils + first headless plot': (
+        "import os; os.environ['PLOT_REPORT_DIR'] = {report_dir!r}\n"
+        "import pandas as pd, src.utils as utils\n"
+        "import contextlib, io\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    utils.plot_distribution(pd.DataFrame({{'x': range(1000)}}), ['x'])", True),
+}
+REPORT = ("print(json.dumps({'seconds': time.perf_counter() - start, "
+          "'loaded': [m for m in ('matplotlib', 'seaborn', 'sklearn') if m in sys.modules]}))")
+
+
+def time_import(code, report_dir):
+    script = SETUP + code.format(report_dir=report_dir) + "\nimport json\n" + REPORT
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(repeats: int = 7):
+    print_header(f"IMPORT TIME: MEDIAN OF {repeats} FRESH INTERPRETERS")
+    if not MATPLOTLIB_AVAILABLE:
+        print("⚠️ matplotlib/seaborn not installed: plotting rows skipped\n")
+    print(f"{'Import':<38} {'Median (ms)':>12} {'Over pandas (ms)':>17}  Plotting modules loaded")
+    print("-" * 96)
+    baseline = None
+    with tempfile.TemporaryDirectory() as report_dir:
+        for label, (code, needs_matplotlib) in CASES.items():
+            if needs_matplotlib and not MATPLOTLIB_AVAILABLE:
+                continue
+            runs = [time_import(code, report_dir) for _ in range(repeats)]
+            ms = statistics.median(r['seconds'] for r in runs) * 1000
+            baseline = ms if baseline is None else baseline
+            loaded = ', '.join(runs[-1]['loaded']) or '-'
+            print(f"{label:<38} {ms:>12.0f} {ms - baseline:>17.0f}  {loaded}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,83 @@
+"""
+Training-data ingestion: bare read_csv vs typed chunked parse vs columnar cache
+
+Writes a synthetic applicant extract to a temporary CSV and reports parse
+time and in-memory size for pd.read_csv with inferred dtypes, for the typed
+chunked parse (first run, which also writes the cache) and for the cached
+load on later runs.
+
+Usage:
+    python benchmarks/bench_ingestion.py [n_rows] [cache_format]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import print_header, EMPLOYMENT_STATUSES, LOAN_PURPOSES
+from src.ingestion import load_csv
+
+REGIONS = ['Central', 'Eastern', 'Northern', 'Western']
+OCCUPATIONS = ['Teacher', 'Trader', 'Farmer', 'Nurse', 'Engineer', 'Driver', 'Civil Servant', 'Other']
+
+
+def synthetic_extract(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'applicant_id': np.arange(n_rows),
+        'age': rng.integers(18, 80, n_rows),
+        'annual_income': rng.uniform(5000, 250000, n_rows).round(2),
+        'credit_score': rng.integers(300, 850, n_rows),
+        'existing_debt': rng.uniform(0, 120000, n_rows).round(2),
+        'loan_amount': rng.uniform(500, 60000, n_rows).round(2),
+        'loan_term_months': rng.choice([12, 24, 36, 48, 60], n_rows),
+        'num_delinquencies': rng.integers(0, 6, n_rows),
+        'credit_utilization': rng.integers(0, 101, n_rows) / 100,
+        'employment_duration_months': rng.integers(0, 360, n_rows),
+        'employment_status': rng.choice(EMPLOYMENT_STATUSES, n_rows),
+        'loan_purpose': rng.choice(LOAN_PURPOSES, n_rows),
+        'region': rng.choice(REGIONS, n_rows),
+        'occupation': rng.choice(OCCUPATIONS, n_rows),
+        'gender': rng.choice(['F', 'M'], n_rows),
+        'default_status': (rng.random(n_rows) < 0.2).astype(int),
+    })
+
+
+def main(n_rows: int = 10_000_000, fmt: str = 'parquet'):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "extract.csv"
+        synthetic_extract(n_rows).to_csv(path, index=False)
+        size_mb = path.stat().st_size / 1e6
+
+        print_header(f"INGESTION: {n_rows:,} ROWS, {size_mb:,.0f} MB CSV, {fmt.upper()} CACHE")
+        print(f"{'Path':<30} {'Seconds':>10} {'Memory (MB)':>14}")
+        print("-" * 56)
+
+        start = time.perf_counter()
+        df = pd.read_csv(path)
+        seconds = time.perf_counter() - start
+        baseline_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"{'pd.read_csv (inferred)':<30} {seconds:>10.2f} {baseline_mb:>14,.1f}")
+        del df
+
+        start = time.perf_counter()
+        typed, report = load_csv(path, fmt=fmt)
+        total = time.perf_counter() - start
+        print(f"{'typed parse (first run)':<30} {report.seconds:>10.2f} {report.memory_bytes / 1e6:>14,.1f}")
+        print(f"{'  + cache write':<30} {total - report.seconds:>10.2f}")
+
+        cached, cached_report = load_csv(path, fmt=fmt)
+        if not cached_report.from_cache or not cached.equals(typed):
+            raise AssertionError("cached frame differs from the typed parse")
+        print(f"{'cache load (later runs)':<30} {cached_report.seconds:>10.2f} {cached_report.memory_bytes / 1e6:>14,.1f}")
+
+        print("\nDtypes: " + ", ".join(f"{col}={dt}" for col, dt in report.dtypes.items()))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000,
+         sys.argv[2] if len(sys.argv) > 2 else 'parquet')
@@ -0,0 +1,114 @@
+"""
+Peak memory of the DataPreprocessor chain: copying steps vs PreprocessingPipeline
+
+Runs impute -> cap -> encode -> scale -> interactions -> polynomials -> bins
+on a synthetic applicant frame three ways, each in a fresh process:
+notebook-style (every step copies and each intermediate is kept), the same
+chain rebinding one variable, and PreprocessingPipeline (one working copy,
+steps in place). Reports wall time and peak RSS, checks all three outputs
+are identical and prints the pipeline's per-step breakdown.
+
+Usage:
+    python benchmarks/bench_pipeline_memory.py [n_rows]
+"""
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import print_header, EMPLOYMENT_STATUSES, LOAN_PURPOSES
+from src.preprocessing import DataPreprocessor, PreprocessingPipeline
+
+NUMERIC = ['age', 'annual_income', 'existing_debt', 'loan_amount', 'credit_score', 'credit_utilization',
+           'employment_duration_months', 'num_credit_accounts', 'num_delinquencies', 'payment_history_months']
+STEPS = [
+    ('handle_missing_values', {}),
+    ('handle_outliers', {'columns': NUMERIC}),
+    ('encode_categorical', {'columns': ['employment_status'], 'method': 'label'}),
+    ('encode_categorical', {'columns': ['loan_purpose'], 'method': 'onehot'}),
+    ('scale_features', {'columns': NUMERIC}),
+    ('create_interaction_features', {'feature_pairs': [('loan_amount', 'annual_income'),
+                                                       ('existing_debt', 'annual_income')]}),
+    ('create_polynomial_features', {'columns': ['credit_score', 'credit_utilization'], 'degree': 3}),
+    ('create_binned_features', {'column': 'age', 'bins': 5}),
+]
+
+
+def synthetic_frame(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.lognormal(3, 1, n_rows) for col in NUMERIC})
+    df['employment_status'] = rng.choice(EMPLOYMENT_STATUSES, n_rows)
+    df['loan_purpose'] = rng.choice(LOAN_PURPOSES, n_rows)
+    for col in ['annual_income', 'existing_debt', 'employment_status']:
+        df.loc[rng.random(n_rows) < 0.05, col] = np.nan
+    return df
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(mode, n_rows, out_path):
+    df = synthetic_frame(n_rows)
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    prep = DataPreprocessor()
+    stats = None
+    if mode == 'notebook':
+        # Every intermediate stays referenced, as in the notebooks
+        frames = [df]
+        for name, kwargs in STEPS:
+            frames.append(getattr(prep, name)(frames[-1], **kwargs))
+        result = frames[-1]
+    elif mode == 'rebind':
+        result = df
+        for name, kwargs in STEPS:
+            result = getattr(prep, name)(result, **kwargs)
+    else:
+        pipeline = PreprocessingPipeline(STEPS, prep)
+        result = pipeline.run(df)
+        stats = pipeline.report()
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    result.to_parquet(out_path)
+    return seconds, base, peak, df.memory_usage(deep=True).sum() / 1024**2, stats
+
+
+def same_output(paths):
+    frames = [pd.read_parquet(p) for p in paths]
+    return all(frames[0].equals(f) for f in frames[1:])
+
+
+def isolated(fn, *args):
+    """Run fn in a fresh interpreter so ru_maxrss is its own peak"""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def main(n_rows: int = 2_000_000):
+    print_header(f"PREPROCESSING CHAIN MEMORY: {n_rows:,} ROWS")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        print(f"{'Mode':<22} {'Seconds':>9} {'Input (MB)':>12} {'Peak RSS over input load (MB)':>31}")
+        print("-" * 78)
+        for mode, label in [('notebook', 'copy per step, kept'), ('rebind', 'copy per step, rebound'),
+                            ('pipeline', 'PreprocessingPipeline')]:
+            path = Path(tmp) / f"{mode}.parquet"
+            seconds, base, peak, input_mb, stats = isolated(run, mode, n_rows, path)
+            paths.append(path)
+            print(f"{label:<22} {seconds:>9.2f} {input_mb:>12,.1f} {peak - base:>31,.1f}")
+        print(f"\nOutputs identical: {isolated(same_output, paths)}")
+
+        print("\nPipeline steps:")
+        print(stats.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
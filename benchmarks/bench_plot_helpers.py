@@ -0,0 +1,190 @@
+"""
+utils plot helpers: every row handed to matplotlib/seaborn vs a row budget
+
+The "before" functions are the previous helpers: a heatmap of
+df.isnull().T over every row, Series.hist and DataFrame.boxplot on full
+columns, and corr() over all rows with annotations. They run against the
+current helpers (row budget PLOT_ROW_BUDGET: binned null density,
+pre-computed bin counts, box statistics, sampled correlation) on a
+synthetic applicant frame, each call in a fresh process with the Agg
+backend, reporting time and peak RSS and the strategy each helper chose
+(skipped when matplotlib is not installed). Then counts the values each
+version plots (or, for the correlation, correlates), which drives its
+time and memory, and how far the plotted values are from the full-data ones:
+largest correlation difference and whether histogram and box statistics
+match.
+
+Usage:
+    python benchmarks/bench_plot_helpers.py [n_rows]
+"""
+
+import contextlib
+import io
+import importlib.util
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from common import print_header, EMPLOYMENT_STATUSES
+
+HELPERS = ['missing_values', 'distribution', 'correlation', 'boxplot']
+NUMERIC = ['age', 'annual_income', 'existing_debt', 'loan_amount', 'credit_score', 'credit_utilization']
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec('matplotlib') is not None
+
+
+def synthetic_frame(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    income = rng.lognormal(10.5, 0.8, n_rows)
+    df = pd.DataFrame({
+        'age': rng.integers(18, 80, n_rows).astype(np.float64),
+        'annual_income': income,
+        'existing_debt': income * rng.beta(2, 5, n_rows) + rng.lognormal(7, 1, n_rows),
+        'loan_amount': rng.lognormal(9.5, 0.9, n_rows),
+        'credit_score': rng.normal(600, 90, n_rows),
+        'credit_utilization': rng.random(n_rows),
+        'employment_status': rng.choice(EMPLOYMENT_STATUSES, n_rows),
+        'default_status': (rng.random(n_rows) < 0.15).astype(int),
+    })
+    for col, share in [('annual_income', 0.02), ('existing_debt', 0.1), ('credit_score', 0.05)]:
+        df.loc[rng.random(n_rows) < share, col] = np.nan
+    # A block of rows from one source without credit scores
+    df.loc[n_rows // 3:n_rows // 3 + n_rows // 20, 'credit_score'] = np.nan
+    return df
+
+
+def before_plot(helper, df):
+    """The previous helper bodies (plt.show() left out)"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if helper == 'missing_values':
+        fig, axes = plt.subplots(1, 2, figsize=(12, 6))
+        missing = df.isnull().sum()
+        missing = missing[missing > 0]
+        axes[0].barh(missing.index, missing / len(df) * 100, color='coral')
+        sns.heatmap(df.isnull().T, cmap='YlOrRd', cbar=True, ax=axes[1])
+    elif helper == 'distribution':
+        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+        for ax, col in zip(axes.flatten(), NUMERIC):
+            df[col].hist(bins=30, ax=ax, edgecolor='black', alpha=0.7)
+    elif helper == 'correlation':
+        plt.figure(figsize=(12, 10))
+        corr = df[NUMERIC + ['default_status']].corr()
+        sns.heatmap(corr, mask=np.triu(np.ones_like(corr, dtype=bool)), annot=True, fmt='.2f', cmap='coolwarm',
+                    center=0, square=True, linewidths=1, cbar_kws={"shrink": 0.8})
+    else:
+        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+        for ax, col in zip(axes.flatten(), NUMERIC):
+            df.boxplot(column=col, ax=ax)
+    plt.gcf().canvas.draw()
+
+
+def after_plot(helper, df):
+    from src import utils
+    import matplotlib.pyplot as plt
+    plt.show = lambda: plt.gcf().canvas.draw()
+    if helper == 'missing_values':
+        return utils.plot_missing_values(df)
+    if helper == 'distribution':
+        return utils.plot_distribution(df, NUMERIC)
+    if helper == 'correlation':
+        return utils.plot_correlation_matrix(df[NUMERIC + ['default_status']], stratify='default_status')
+    return utils.plot_outliers_boxplot(df, NUMERIC)
+
+
+def before_data(helper, df):
+    """What the previous helpers handed to matplotlib/seaborn"""
+    if helper == 'missing_values':
+        return [df.isnull().T.to_numpy()]
+    if helper == 'correlation':
+        return [df[NUMERIC + ['default_status']].to_numpy()]
+    return [df[col].dropna().to_numpy() for col in NUMERIC]
+
+
+def after_data(helper, df, utils):
+    """What the current helpers hand to matplotlib/seaborn"""
+    if helper == 'missing_values':
+        return [utils.null_density(df).to_numpy()]
+    if helper == 'distribution':
+        return [a for col in NUMERIC for a in utils.histogram_counts(df[col])]
+    if helper == 'correlation':
+        return [utils.sample_rows(df, utils.PLOT_ROW_BUDGET, 'default_status')[NUMERIC + ['default_status']].to_numpy()]
+    return [a for col in NUMERIC for a in (np.array([0.0] * 5), utils.box_stats(df[col], max_fliers=utils.PLOT_ROW_BUDGET // len(NUMERIC))['fliers'])]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(helper, mode, n_rows):
+    os.environ['MPLBACKEND'] = 'Agg'
+    df = synthetic_frame(n_rows)
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    strategy = 'full'
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'before':
+            before_plot(helper, df)
+        else:
+            strategy = after_plot(helper, df)
+    return {'seconds': time.perf_counter() - start, 'peak': peak_rss_mb() - base, 'strategy': strategy}
+
+
+def fidelity(n_rows):
+    """Plotted values vs the full-data ones"""
+    from src import utils
+    df = synthetic_frame(n_rows)
+    full = df[NUMERIC + ['default_status']].corr()
+    sampled = utils.sample_rows(df, utils.PLOT_ROW_BUDGET, 'default_status')[NUMERIC + ['default_status']].corr()
+    same_hist = all(np.array_equal(utils.histogram_counts(df[col])[0], np.histogram(df[col].dropna(), bins=30)[0])
+                    for col in NUMERIC)
+    same_boxes = True
+    for col in NUMERIC:
+        stats, values = utils.box_stats(df[col]), df[col].dropna()
+        same_boxes &= np.allclose([stats['q1'], stats['med'], stats['q3']], values.quantile([0.25, 0.5, 0.75]))
+        same_boxes &= stats['n_fliers'] == utils.detect_outliers_iqr(df.dropna(subset=[col]), col).sum()
+    handed = {helper: (sum(a.size for a in before_data(helper, df)), sum(a.size for a in after_data(helper, df, utils)))
+              for helper in HELPERS}
+    return {'corr': float((full - sampled).abs().to_numpy().max()), 'hist': same_hist, 'boxes': bool(same_boxes),
+            'handed': handed}
+
+
+def isolated(fn, *args):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def main(n_rows: int = 2_000_000):
+    print_header(f"PLOT HELPERS: {n_rows:,} ROWS")
+    if MATPLOTLIB_AVAILABLE:
+        print(f"{'Helper':<16} {'Before (s)':>11} {'After (s)':>10} {'Speedup':>8} "
+              f"{'Peak before':>12} {'Peak after':>11}  Strategy")
+        print("-" * 90)
+        for helper in HELPERS:
+            before = isolated(run, helper, 'before', n_rows)
+            after = isolated(run, helper, 'after', n_rows)
+            print(f"{helper:<16} {before['seconds']:>11.2f} {after['seconds']:>10.2f} "
+                  f"{before['seconds'] / after['seconds']:>7.1f}x {before['peak']:>9,.0f} MB {after['peak']:>8,.0f} MB"
+                  f"  {after['strategy']}")
+        print("(peak RSS above the process's state after building the frame)\n")
+    else:
+        print("⚠️ matplotlib not installed: rendering not timed\n")
+
+    check = isolated(fidelity, n_rows)
+    print(f"{'Helper':<16} {'Values plotted/correlated before':>33} {'after':>12}")
+    print("-" * 63)
+    for helper, (before, after) in check['handed'].items():
+        print(f"{helper:<16} {before:>33,} {after:>12,}")
+    print(f"\nLargest correlation difference, stratified sample vs all rows: {check['corr']:.4f}")
+    print(f"Histogram bin counts identical: {check['hist']}")
+    print(f"Box quartiles and outlier counts identical: {check['boxes']}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,61 @@
+"""
+Prediction cache throughput at a configurable duplicate ratio
+
+Replays a stream of /predict calls in which `duplicate_ratio` of the
+requests repeat an earlier application, with the PredictionCache
+disabled and enabled, using a synthetic RandomForest in place of
+models/best_model.pkl.
+
+Usage:
+    python benchmarks/bench_prediction_cache.py [duplicate_ratio] [n_requests]
+"""
+
+import sys
+import time
+import random
+import asyncio
+
+from common import random_application, fit_synthetic_model, print_header
+from src.deployment import api
+
+
+def request_stream(n_requests: int, duplicate_ratio: float, seed: int = 11):
+    rng = random.Random(seed)
+    seen = []
+    for _ in range(n_requests):
+        if seen and rng.random() < duplicate_ratio:
+            yield rng.choice(seen)
+        else:
+            application = api.LoanApplication(**random_application(rng))
+            seen.append(application)
+            yield application
+
+
+async def replay(applications) -> float:
+    start = time.perf_counter()
+    for application in applications:
+        await api.predict_credit_risk(application)
+    return len(applications) / (time.perf_counter() - start)
+
+
+async def main(duplicate_ratio: float = 0.3, n_requests: int = 5000):
+    api.serving = api.ModelBundle(fit_synthetic_model(), api.INPUT_FEATURES, "synthetic")
+    applications = list(request_stream(n_requests, duplicate_ratio))
+
+    api.prediction_cache = None
+    uncached = await replay(applications)
+
+    api.prediction_cache = api.PredictionCache(max_size=10000, ttl_seconds=300)
+    cached = await replay(applications)
+    counters = api.prediction_cache.counters
+
+    print_header(f"PREDICTION CACHE ({n_requests:,} requests, {duplicate_ratio:.0%} duplicates)")
+    print(f"{'Without cache':<20} {uncached:>10.1f} req/s")
+    print(f"{'With cache':<20} {cached:>10.1f} req/s  ({cached / uncached:.2f}x)")
+    print(f"{'Hit rate':<20} {counters['hit'] / (counters['hit'] + counters['miss']):>10.1%}")
+
+
+if __name__ == "__main__":
+    ratio = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    asyncio.run(main(ratio, n))
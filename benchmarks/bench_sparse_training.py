@@ -0,0 +1,192 @@
+"""
+Training on a sparse CSR feature matrix vs a dense one: memory and fit time
+
+Builds features for a synthetic applicant frame with wide categoricals
+(Zipf-distributed occupation and region, plus loan_purpose) two ways: dense,
+one float64 column per category (DataPreprocessor.fit_transform with the
+'onehot' method), and CSR (DataPreprocessor.fit_transform_sparse). Fits
+LogisticRegression, XGBoost and LightGBM on each layout, every fit in a fresh
+process, and reports feature build time, matrix size, fit time, peak RSS and
+test AUC, plus the largest difference between the layouts' predictions.
+Finally compares the CSR matrix saved with save_sparse_dataset against the
+dense matrix as Parquet.
+
+Usage:
+    python benchmarks/bench_sparse_training.py [n_rows] [n_occupations] [n_regions]
+"""
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+
+from common import print_header, EMPLOYMENT_STATUSES, LOAN_PURPOSES
+from src.ingestion import save_sparse_dataset, load_sparse_dataset
+from src.preprocessing import DataPreprocessor
+
+ONEHOT = ['occupation', 'region', 'loan_purpose']
+# As train_models.PREPROCESSING_STEPS
+STEPS = [
+    ('handle_missing_values', {}),
+    ('create_credit_features', {}),
+    ('encode_categorical', {'columns': ['employment_status'], 'method': 'label', 'suffix': '_encoded'}),
+]
+MODELS = ['logistic_regression', 'xgboost', 'lightgbm']
+
+
+def zipf_column(rng, prefix, n_categories, n_rows):
+    weights = 1 / np.arange(1, n_categories + 1)
+    return rng.choice(n_categories, n_rows, p=weights / weights.sum()), np.array(
+        [f"{prefix}_{i:05d}" for i in range(n_categories)], dtype=object)
+
+
+def synthetic_frame(n_rows, n_occupations, n_regions, seed=42):
+    """Applicants whose default probability depends on occupation, region and debt ratios"""
+    rng = np.random.default_rng(seed)
+    occupation, occupation_names = zipf_column(rng, 'occupation', n_occupations, n_rows)
+    region, region_names = zipf_column(rng, 'region', n_regions, n_rows)
+    df = pd.DataFrame({
+        'age': rng.integers(18, 80, n_rows).astype(np.float64),
+        'annual_income': rng.lognormal(10.5, 0.8, n_rows),
+        'existing_debt': rng.lognormal(9, 1.2, n_rows),
+        'loan_amount': rng.lognormal(9.5, 0.9, n_rows),
+        'loan_term_months': rng.choice([12, 24, 36, 48, 60], n_rows).astype(np.float64),
+        'credit_score': rng.uniform(300, 850, n_rows),
+        'num_delinquencies': rng.poisson(0.5, n_rows).astype(np.float64),
+        'employment_status': rng.choice(EMPLOYMENT_STATUSES, n_rows).astype(object),
+        'loan_purpose': rng.choice(LOAN_PURPOSES, n_rows).astype(object),
+        'occupation': occupation_names[occupation],
+        'region': region_names[region],
+    })
+    logit = (rng.normal(0, 0.8, n_occupations)[occupation] + rng.normal(0, 0.5, n_regions)[region]
+             + 2 * df['existing_debt'] / df['annual_income'] - (df['credit_score'] - 575) / 150
+             + 0.4 * df['num_delinquencies'] - 1)
+    y = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df, y
+
+
+def build_model(name):
+    if name == 'logistic_regression':
+        return LogisticRegression(max_iter=1000, class_weight='balanced', random_state=42, solver='liblinear')
+    if name == 'xgboost':
+        from xgboost import XGBClassifier
+        # missing=0.0 so absent CSR entries and dense zeros are scored alike (as in train_models)
+        return XGBClassifier(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42,
+                             eval_metric='logloss', missing=0.0, n_jobs=1)
+    from lightgbm import LGBMClassifier
+    return LGBMClassifier(n_estimators=100, max_depth=6, learning_rate=0.1, class_weight='balanced',
+                          random_state=42, verbose=-1, n_jobs=1)
+
+
+def build_features(layout, df, y):
+    n_train = int(len(df) * 0.8)
+    train, test = df.iloc[:n_train], df.iloc[n_train:]
+    prep = DataPreprocessor()
+    if layout == 'sparse':
+        X_train, names = prep.fit_transform_sparse(train, STEPS, ONEHOT)
+        X_test = prep.transform_sparse(test)
+    else:
+        X_train = prep.fit_transform(train, STEPS + [('encode_categorical', {'columns': ONEHOT, 'method': 'onehot'})])
+        names = [col for col in X_train.columns if X_train[col].dtype == np.float64]
+        X_train = X_train[names].to_numpy()
+        X_test = prep.transform(test)[names].to_numpy()
+    return X_train, X_test, y[:n_train], y[n_train:], names
+
+
+def matrix_mb(X):
+    if hasattr(X, 'indptr'):
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1024**2
+    return X.nbytes / 1024**2
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(layout, model_name, n_rows, n_occupations, n_regions):
+    df, y = synthetic_frame(n_rows, n_occupations, n_regions)
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test, names = build_features(layout, df, y)
+    build_seconds = time.perf_counter() - start
+    del df
+    start = time.perf_counter()
+    model = build_model(model_name).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    prob = model.predict_proba(X_test)[:, 1]
+    return {'build': build_seconds, 'matrix_mb': matrix_mb(X_train), 'fit': fit_seconds,
+            'peak': peak_rss_mb() - base, 'auc': roc_auc_score(y_test, prob), 'prob': prob,
+            'shape': X_train.shape}
+
+
+def same_features(n_rows, n_occupations, n_regions):
+    """Dense and CSR features hold the same values under the same names"""
+    df, y = synthetic_frame(n_rows, n_occupations, n_regions)
+    dense, _, _, _, dense_names = build_features('dense', df, y)
+    csr, _, _, _, csr_names = build_features('sparse', df, y)
+    return dense_names == csr_names and np.array_equal(dense, csr.toarray())
+
+
+def persist(n_rows, n_occupations, n_regions, tmp):
+    """Size and load time of the training matrix: CSR .npz vs dense Parquet"""
+    df, y = synthetic_frame(n_rows, n_occupations, n_regions)
+    results = {}
+    for layout in ['dense', 'sparse']:
+        X, _, y_train, _, names = build_features(layout, df, y)
+        if layout == 'sparse':
+            path = save_sparse_dataset(Path(tmp) / "features.npz", X, names, y_train)
+            start = time.perf_counter()
+            load_sparse_dataset(path)
+        else:
+            path = Path(tmp) / "features.parquet"
+            pd.DataFrame(X, columns=names).assign(default_status=y_train).to_parquet(path, index=False)
+            start = time.perf_counter()
+            pd.read_parquet(path)
+        results[layout] = (path.stat().st_size / 1024**2, time.perf_counter() - start)
+    return results
+
+
+def isolated(fn, *args):
+    """Run fn in a fresh interpreter so ru_maxrss is its own peak"""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def main(n_rows: int = 50_000, n_occupations: int = 1_000, n_regions: int = 200):
+    args = (n_rows, n_occupations, n_regions)
+    print_header(f"SPARSE VS DENSE TRAINING: {n_rows:,} ROWS, {n_occupations:,} OCCUPATIONS, {n_regions:,} REGIONS")
+    print(f"Feature values identical: {isolated(same_features, min(n_rows, 10_000), n_occupations, n_regions)}\n")
+
+    print(f"{'Model':<20} {'Layout':<7} {'Build (s)':>10} {'Matrix (MB)':>12} {'Fit (s)':>9} "
+          f"{'Peak RSS (MB)':>14} {'AUC':>7}")
+    print("-" * 84)
+    for model_name in MODELS:
+        results = {}
+        for layout in ['dense', 'sparse']:
+            r = results[layout] = isolated(run, layout, model_name, *args)
+            print(f"{model_name:<20} {layout:<7} {r['build']:>10.2f} {r['matrix_mb']:>12,.1f} {r['fit']:>9.2f} "
+                  f"{r['peak']:>14,.1f} {r['auc']:>7.4f}")
+        max_diff = np.abs(results['dense']['prob'] - results['sparse']['prob']).max()
+        print(f"{'':<20} train matrix {results['sparse']['shape'][0]:,} x {results['sparse']['shape'][1]:,}; "
+              f"fit speedup {results['dense']['fit'] / results['sparse']['fit']:.1f}x, "
+              f"max |Δp| dense vs sparse {max_diff:.1e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = isolated(persist, *args, tmp)
+    print("\nSaved training matrix:")
+    for layout, label in [('dense', 'dense Parquet'), ('sparse', 'CSR .npz')]:
+        size, seconds = saved[layout]
+        print(f"  {label:<14} {size:>10,.1f} MB, loaded in {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
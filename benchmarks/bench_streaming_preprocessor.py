@@ -0,0 +1,108 @@
+"""
+DataPreprocessor: in-memory chain vs out-of-core fit_stream/transform_stream
+
+For each dataset size, writes a synthetic applicant CSV with missing values
+and outliers, then runs impute -> IQR cap -> standard scale both in memory
+(read_csv + handle_missing_values + handle_outliers + scale_features) and
+streaming (fit_stream + transform_stream to Parquet). Each path runs in a fresh
+process so its wall time and peak RSS are measured in isolation; the
+largest difference between the two outputs is reported too.
+
+Usage:
+    python benchmarks/bench_streaming_preprocessor.py [max_rows]
+"""
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import print_header
+from src.preprocessing import DataPreprocessor
+
+NUMERIC = ['annual_income', 'existing_debt', 'loan_amount', 'credit_utilization', 'age']
+
+
+def synthetic_applicants(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'annual_income': rng.lognormal(10.5, 0.8, n_rows),
+        'existing_debt': rng.gamma(2.0, 15000, n_rows),
+        'loan_amount': rng.normal(20000, 8000, n_rows),
+        'credit_utilization': rng.beta(2, 5, n_rows),
+        'age': rng.integers(18, 80, n_rows).astype(float),
+        'employment_status': rng.choice(['Employed', 'Self-Employed', 'Unemployed'], n_rows, p=[0.6, 0.3, 0.1]),
+    })
+    for col in ['annual_income', 'existing_debt', 'employment_status']:
+        df.loc[rng.random(n_rows) < 0.05, col] = np.nan
+    return df
+
+
+def write_csv(n_rows, path):
+    synthetic_applicants(n_rows).to_csv(path, index=False)
+
+
+def compare(expected_path, out_path):
+    expected, actual = pd.read_parquet(expected_path), pd.read_parquet(out_path)
+    max_diff = max(float(np.abs(actual[col] - expected[col]).max()) for col in NUMERIC)
+    return max_diff, bool((actual['employment_status'] == expected['employment_status']).all())
+
+
+def in_memory(path, out_path):
+    start = time.perf_counter()
+    prep = DataPreprocessor()
+    df = pd.read_csv(path)
+    df = prep.handle_missing_values(df)
+    df = prep.handle_outliers(df, NUMERIC)
+    df = prep.scale_features(df, NUMERIC)
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    df.to_parquet(out_path)
+    return seconds, peak_mb
+
+
+def streaming(path, out_path):
+    start = time.perf_counter()
+    prep = DataPreprocessor().fit_stream(path, outlier_columns=NUMERIC, scale_columns=NUMERIC)
+    prep.transform_stream(path, out_path)
+    return time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def isolated(fn, *args):
+    """
+    Run fn in a fresh interpreter so ru_maxrss is its own peak.
+
+    ru_maxrss survives fork+exec, so the parent itself never holds the data.
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def main(max_rows: int = 4_000_000):
+    sizes = [n for n in (250_000, 1_000_000, 4_000_000, 16_000_000) if n <= max_rows] or [max_rows]
+    print_header("DATA PREPROCESSOR: IN-MEMORY VS STREAMING")
+    print(f"{'Rows':>12} {'Path':<12} {'Seconds':>9} {'Peak RSS (MB)':>14} {'max |Δ| (std units)':>21}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = Path(tmp) / "applicants.csv"
+            expected_path, out_path = Path(tmp) / "expected.parquet", Path(tmp) / "transformed.parquet"
+            isolated(write_csv, n_rows, path)
+
+            seconds, peak = isolated(in_memory, path, expected_path)
+            print(f"{n_rows:>12,} {'in-memory':<12} {seconds:>9.2f} {peak:>14,.1f}")
+
+            seconds, peak = isolated(streaming, path, out_path)
+            max_diff, same_fill = isolated(compare, expected_path, out_path)
+            print(f"{'':>12} {'streaming':<12} {seconds:>9.2f} {peak:>14,.1f} {max_diff:>21.2e}"
+                  f"{'' if same_fill else '  (categorical fill differs!)'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000)
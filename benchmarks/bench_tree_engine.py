@@ -0,0 +1,82 @@
+"""
+Compiled NumPy tree ensembles vs native predict_proba
+
+Fits each supported ensemble on synthetic applications, checks parity of
+CompiledTreeEnsemble against predict_proba on a held-out split, and reports
+single-row and 10k-row latency for both.
+
+Usage:
+    python benchmarks/bench_tree_engine.py
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+
+from common import random_application, time_per_call, print_header
+from src.deployment.api import (LoanApplication, INPUT_FEATURES, build_feature_columns,
+                                calculate_rule_based_probabilities)
+from src.tree_engine import CompiledTreeEnsemble
+
+
+def candidate_models():
+    models = {
+        'RandomForest': RandomForestClassifier(n_estimators=100, max_depth=15, min_samples_split=10,
+                                               class_weight='balanced', random_state=42, n_jobs=-1),
+        'GradientBoosting': GradientBoostingClassifier(n_estimators=100, random_state=42),
+    }
+    try:
+        from xgboost import XGBClassifier
+        models['XGBoost'] = XGBClassifier(n_estimators=100, max_depth=6, learning_rate=0.1,
+                                          random_state=42, eval_metric='logloss')
+    except ImportError:
+        print("⚠️ XGBoost not available")
+    try:
+        from lightgbm import LGBMClassifier
+        models['LightGBM'] = LGBMClassifier(n_estimators=100, max_depth=6, learning_rate=0.1,
+                                            class_weight='balanced', random_state=42, verbose=-1)
+    except ImportError:
+        print("⚠️ LightGBM not available")
+    return models
+
+
+def main(n_train: int = 20000, n_test: int = 10000):
+    rng = random.Random(42)
+    applications = [LoanApplication(**random_application(rng)) for _ in range(n_train + n_test)]
+    columns = build_feature_columns(applications)
+    X = pd.DataFrame({col: columns[col] for col in INPUT_FEATURES})
+    y = (np.random.default_rng(42).random(len(X)) < calculate_rule_based_probabilities(columns)).astype(int)
+    X_train, X_test, y_train = X.iloc[:n_train], X.iloc[n_train:], y[:n_train]
+    X_test_np = X_test.to_numpy()
+
+    print_header("COMPILED TREE ENGINE: PARITY AND LATENCY")
+    print(f"{'Model':<18} {'max |Δp|':>10} {'1-row native':>14} {'1-row NumPy':>13} "
+          f"{'10k native':>12} {'10k NumPy':>11}")
+    print("-" * 82)
+    for name, model in candidate_models().items():
+        model.fit(X_train, y_train)
+        compiled = CompiledTreeEnsemble.from_model(model, INPUT_FEATURES)
+
+        max_diff = np.abs(model.predict_proba(X_test)[:, 1] - compiled.predict_proba(X_test_np)[:, 1]).max()
+        if max_diff > 1e-6:
+            raise AssertionError(f"{name}: compiled ensemble differs by {max_diff:.2e}")
+        for width in (X_test_np.shape[1] - 1, X_test_np.shape[1] + 7):
+            try:
+                compiled.predict_proba(np.zeros((2, width)))
+            except ValueError:
+                continue
+            raise AssertionError(f"{name}: compiled ensemble accepted {width} features")
+
+        row_df, row_np = X_test.iloc[:1], X_test_np[:1]
+        native_1 = time_per_call(lambda: model.predict_proba(row_df), 50)
+        numpy_1 = time_per_call(lambda: compiled.predict_proba(row_np), 200)
+        native_10k = time_per_call(lambda: model.predict_proba(X_test), 3)
+        numpy_10k = time_per_call(lambda: compiled.predict_proba(X_test_np), 3)
+        print(f"{name:<18} {max_diff:>10.1e} {native_1 * 1e3:>11.3f} ms {numpy_1 * 1e3:>10.3f} ms "
+              f"{native_10k * 1e3:>9.1f} ms {numpy_10k * 1e3:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Shared helpers for the benchmark scripts in this directory
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+from typing import Callable, Dict, Any
+
+# Make `src` importable when running `python benchmarks/<script>.py` from the repo root
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+EMPLOYMENT_STATUSES = ['Employed', 'Self-Employed', 'Unemployed']
+LOAN_PURPOSES = ['Home', 'Car', 'Education', 'Business', 'Personal']
+
+
+def random_application(rng: random.Random) -> Dict[str, Any]:
+    """Random LoanApplication payload within the schema's validation bounds"""
+    return {
+        'age': rng.randint(18, 80),
+        'annual_income': round(rng.uniform(5000, 250000), 2),
+        'employment_status': rng.choice(EMPLOYMENT_STATUSES),
+        'employment_duration_months': rng.randint(0, 360),
+        'credit_score': rng.uniform(300, 850),
+        'existing_debt': round(rng.uniform(0, 120000), 2),
+        'loan_amount': round(rng.uniform(500, 60000), 2),
+        'loan_term_months': rng.choice([12, 24, 36, 48, 60]),
+        'loan_purpose': rng.choice(LOAN_PURPOSES),
+        'num_credit_accounts': rng.randint(0, 12),
+        'credit_utilization': rng.random(),
+        'num_delinquencies': rng.randint(0, 6),
+        'payment_history_months': rng.randint(0, 240),
+    }
+
+
+def time_per_call(fn: Callable[[], Any], repeat: int) -> float:
+    """Mean wall-clock seconds per call of fn over `repeat` calls"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def print_header(title: str) -> None:
+    print("=" * 80)
+    print(title.center(80))
+    print("=" * 80)
+
+
+def fit_synthetic_model(n_rows: int = 5000, seed: int = 42, n_estimators: int = 100):
+    """
+    RandomForest fitted on random applications labelled by the rule-based
+    scorer, with the API's INPUT_FEATURES as columns. Stands in for
+    models/best_model.pkl when benchmarking without trained artifacts.
+    """
+    import numpy as np
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from src.deployment.api import (LoanApplication, INPUT_FEATURES, build_feature_columns,
+                                    calculate_rule_based_probabilities)
+
+    rng = random.Random(seed)
+    applications = [LoanApplication(**random_application(rng)) for _ in range(n_rows)]
+    columns = build_feature_columns(applications)
+    X = pd.DataFrame({col: columns[col] for col in INPUT_FEATURES})
+    y = (np.random.default_rng(seed).random(n_rows) < calculate_rule_based_probabilities(columns)).astype(int)
+    return RandomForestClassifier(n_estimators=n_estimators, max_depth=10, random_state=seed, n_jobs=1).fit(X, y)
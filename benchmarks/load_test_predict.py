@@ -0,0 +1,97 @@
+"""
+Concurrent /predict load test across serving modes
+
+Drives the ASGI app in-process with httpx, using a synthetic RandomForest
+in place of models/best_model.pkl, and reports throughput, latency
+percentiles, rejected (503) requests and worst /health latency for inline
+scoring, the thread-pool InferenceExecutor and the MicroBatcher.
+
+Usage:
+    python benchmarks/load_test_predict.py [n_requests] [concurrency]
+"""
+
+import sys
+import time
+import random
+import asyncio
+
+import httpx
+import numpy as np
+
+from common import random_application, fit_synthetic_model, print_header
+from src.deployment import api
+
+
+async def run_load(n_requests: int, concurrency: int) -> dict:
+    rng = random.Random(7)
+    payloads = [random_application(rng) for _ in range(n_requests)]
+    latencies = []
+    health_latencies = []
+    rejected = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://test") as client:
+        async def one(payload):
+            nonlocal rejected
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/predict", json=payload)
+                if response.status_code == 503:
+                    rejected += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        async def probe_health():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe = asyncio.create_task(probe_health())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(p) for p in payloads))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+
+    lat = np.array(latencies) * 1000
+    return {
+        'throughput': len(latencies) / elapsed,
+        'rejected': rejected,
+        'health_max': max(health_latencies) * 1000,
+        'p50': np.percentile(lat, 50),
+        'p95': np.percentile(lat, 95),
+        'p99': np.percentile(lat, 99),
+    }
+
+
+async def main(n_requests: int = 2000, concurrency: int = 200):
+    api.serving = api.ModelBundle(fit_synthetic_model(), api.INPUT_FEATURES, "synthetic")
+    results = {}
+
+    await api.stop_batcher()
+    api.stop_executor()
+    results['inline'] = await run_load(n_requests, concurrency)
+
+    api.start_executor(kind="thread")
+    results['thread executor'] = await run_load(n_requests, concurrency)
+
+    await api.start_batcher()
+    results['micro-batched'] = await run_load(n_requests, concurrency)
+    await api.stop_batcher()
+    api.stop_executor()
+
+    print_header(f"/predict LOAD TEST ({n_requests:,} requests, concurrency {concurrency})")
+    print(f"{'Mode':<18} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'503s':>7} {'/health max ms':>15}")
+    print("-" * 80)
+    for mode, r in results.items():
+        print(f"{mode:<18} {r['throughput']:>9.1f} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f} "
+              f"{r['rejected']:>7} {r['health_max']:>15.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -0,0 +1,217 @@
+"""
+Compliance run over a directory of partitioned extracts
+
+Every CSV/Parquet partition under an input directory is streamed in chunks
+through anonymize_data and written to the same relative path under an
+output directory, while a bounded sample of each column's raw values is
+scanned for PII (privacy.PIISample). Partitions are processed in a process
+pool; per-partition results (rows, time, the worker's peak RSS, PII match
+counts) are merged into one report.
+
+Usage:
+    PSEUDONYMIZATION_KEY=... python src/compliance.py <input_dir> <output_dir> --sensitive applicant_id [more ...]
+        [--workers N] [--chunksize ROWS] [--sample-rows N] [--report report.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+try:
+    # Imported here rather than per task, so forked workers start with it loaded
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from preprocessing import anonymize_data, iter_chunks, STREAM_CHUNK_ROWS
+    from privacy import PIISample, pii_findings, resolve_key, PII_SAMPLE_ROWS, PII_MIN_MATCH_RATE
+except ImportError:
+    from src.preprocessing import anonymize_data, iter_chunks, STREAM_CHUNK_ROWS
+    from src.privacy import PIISample, pii_findings, resolve_key, PII_SAMPLE_ROWS, PII_MIN_MATCH_RATE
+
+PARTITION_SUFFIXES = ('.csv', '.parquet')
+
+
+def find_partitions(input_dir: Union[str, Path]) -> List[Path]:
+    """CSV/Parquet files under input_dir (recursively, e.g. Hive-style month=.../ directories), sorted"""
+    return sorted(p for p in Path(input_dir).rglob('*') if p.is_file() and p.suffix in PARTITION_SUFFIXES)
+
+
+def anonymize_partition(path: Path, output_path: Path, sensitive_columns: List[str], key: Union[str, bytes],
+                        chunksize: int = STREAM_CHUNK_ROWS, sample_rows: int = PII_SAMPLE_ROWS,
+                        seed: int = 0) -> Dict[str, Any]:
+    """
+    Anonymise one partition chunk by chunk and scan a sample of its raw values.
+
+    The output has the input's format; it is written under a temporary
+    name and renamed, so a partially written partition is never left behind.
+    Pseudonym columns are written as nullable UInt64, so a chunk with
+    missing values does not turn them into floats on reading. Runs in a
+    pool worker; the returned peak RSS is that worker's so far.
+    """
+    if path.suffix == '.parquet' and not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required to process Parquet partitions")
+    start, cpu_start = time.perf_counter(), time.process_time()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    sample = PIISample(sample_rows, seed=seed)
+    rows, writer = 0, None
+    try:
+        for chunk in iter_chunks(str(path), chunksize):
+            sample.update(chunk)
+            anonymized = anonymize_data(chunk, sensitive_columns, key=key)
+            anonymized = anonymized.astype({col: 'UInt64' for col in sensitive_columns if col in anonymized.columns})
+            if path.suffix == '.parquet':
+                # Later chunks are cast to the first chunk's schema
+                table = pa.Table.from_pandas(anonymized, schema=writer.schema if writer else None,
+                                             preserve_index=False)
+                writer = writer or pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            else:
+                anonymized.to_csv(tmp_path, mode='a' if rows else 'w', header=not rows, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if tmp_path.exists():
+        os.replace(tmp_path, output_path)
+    return {
+        'partition': str(path),
+        'output': str(output_path),
+        'rows': rows,
+        'seconds': time.perf_counter() - start,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'worker_pid': os.getpid(),
+        'worker_peak_rss_mb': peak_rss_mb(),
+        'pii_counts': sample.scan(),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB, NaN where the resource module is unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024**2 if sys.platform == 'darwin' else maxrss / 1024
+
+
+def merge_results(results: List[Dict[str, Any]], sensitive_columns: List[str], wall_seconds: float,
+                  workers: int, min_match_rate: float = PII_MIN_MATCH_RATE) -> Dict[str, Any]:
+    """One report from the per-partition results: totals, throughput, per-worker peak RSS and PII findings"""
+    counts = {}
+    for result in results:
+        for col, c in result['pii_counts'].items():
+            merged = counts.setdefault(col, dict.fromkeys(c, 0))
+            for name, n in c.items():
+                merged[name] += n
+    findings = pii_findings(counts, min_match_rate)
+    worker_peaks = {}
+    for result in results:
+        pid = result['worker_pid']
+        worker_peaks[pid] = max(worker_peaks.get(pid, 0.0), result['worker_peak_rss_mb'])
+    rows = sum(r['rows'] for r in results)
+    busy_seconds = sum(r['seconds'] for r in results)
+    return {
+        'partitions': len(results),
+        'rows': rows,
+        'workers': workers,
+        'wall_seconds': wall_seconds,
+        'rows_per_second': rows / wall_seconds if wall_seconds else 0.0,
+        # Throughput of one worker while busy, i.e. per core used
+        'rows_per_second_per_core': rows / busy_seconds if busy_seconds else 0.0,
+        'worker_peak_rss_mb': {str(pid): peak for pid, peak in worker_peaks.items()},
+        'anonymized_columns': list(sensitive_columns),
+        'pii_counts': counts,
+        'pii_columns': findings,
+        # PII found by content in columns that were left in clear
+        'unanonymized_pii_columns': [col for col in findings if col not in sensitive_columns],
+        'partition_stats': [{k: v for k, v in r.items() if k != 'pii_counts'} for r in results],
+    }
+
+
+def run_compliance(input_dir: Union[str, Path], output_dir: Union[str, Path], sensitive_columns: List[str],
+                   key: Union[str, bytes] = None, workers: int = None, chunksize: int = STREAM_CHUNK_ROWS,
+                   sample_rows: int = PII_SAMPLE_ROWS, min_match_rate: float = PII_MIN_MATCH_RATE) -> Dict[str, Any]:
+    """
+    Anonymise and PII-scan every partition under input_dir in a process pool.
+
+    Parameters:
+    -----------
+    input_dir : str or Path
+        Directory of CSV/Parquet partitions
+    output_dir : str or Path
+        Anonymised partitions are written here under their relative paths
+    sensitive_columns : List[str]
+        Columns replaced by keyed pseudonyms (see anonymize_data)
+    key : str or bytes
+        Pseudonymisation key (default: the PSEUDONYMIZATION_KEY environment variable)
+    workers : int
+        Worker processes (default: min(CPU count, partitions))
+    chunksize : int
+        Rows per chunk within a partition, which bounds each worker's memory
+    sample_rows : int
+        Values per column and partition sampled for the PII scan
+    min_match_rate : float
+        Share of sampled values matching a pattern for a column to be reported
+
+    Returns:
+    --------
+    Dict : Merged report (see merge_results)
+    """
+    key = resolve_key(key)
+    input_dir, output_dir = Path(input_dir), Path(output_dir)
+    partitions = find_partitions(input_dir)
+    if not partitions:
+        raise ValueError(f"No CSV/Parquet partitions under {input_dir}")
+    workers = workers or min(os.cpu_count() or 1, len(partitions))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(anonymize_partition, path, output_dir / path.relative_to(input_dir),
+                               sensitive_columns, key, chunksize, sample_rows, i)
+                   for i, path in enumerate(partitions)]
+        results = [future.result() for future in futures]
+    return merge_results(results, sensitive_columns, time.perf_counter() - start, workers, min_match_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anonymise and PII-scan a directory of CSV/Parquet partitions")
+    parser.add_argument('input_dir')
+    parser.add_argument('output_dir')
+    parser.add_argument('--sensitive', nargs='+', required=True, help="Columns to pseudonymise")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=STREAM_CHUNK_ROWS)
+    parser.add_argument('--sample-rows', type=int, default=PII_SAMPLE_ROWS)
+    parser.add_argument('--report', default=None, help="Write the JSON report here (default: print it)")
+    args = parser.parse_args()
+
+    report = run_compliance(args.input_dir, args.output_dir, args.sensitive, workers=args.workers,
+                            chunksize=args.chunksize, sample_rows=args.sample_rows)
+    print(f"✅ {report['partitions']} partitions, {report['rows']:,} rows in {report['wall_seconds']:.2f}s "
+          f"with {report['workers']} worker(s): {report['rows_per_second']:,.0f} rows/s, "
+          f"{report['rows_per_second_per_core']:,.0f} rows/s per core")
+    print("   Peak RSS per worker (MB): "
+          + ", ".join(f"{peak:,.0f}" for peak in report['worker_peak_rss_mb'].values()))
+    for col, types in report['pii_columns'].items():
+        status = "anonymised" if col in report['anonymized_columns'] else "⚠️ NOT anonymised"
+        print(f"   PII in {col}: {', '.join(types)} ({status})")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved: {args.report}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
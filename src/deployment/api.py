@@ -3,15 +3,42 @@ FastAPI deployment for Credit Scoring Model
 MILESTONE TWO - Deployment Component
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+_IMPORT_START = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-import joblib
+from fastapi.responses import PlainTextResponse, JSONResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 import numpy as np
-import pandas as pd
 from pathlib import Path
+from contextlib import contextmanager
+from collections import OrderedDict
+import asyncio
+import bisect
+import hmac
+import os
+import sys
 import logging
+import threading
+import warnings
+
+# pandas and joblib are imported lazily: the compiled-model serving path needs neither
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    from src.tree_engine import CompiledTreeEnsemble
+    from src.preprocessing_artifact import PreprocessingArtifact
+    from src import ensemble
+except ImportError:
+    from tree_engine import CompiledTreeEnsemble
+    from preprocessing_artifact import PreprocessingArtifact
+    import ensemble
+
+# python src/train_models.py pickles FoldEnsemble as ensemble.FoldEnsemble
+sys.modules.setdefault('ensemble', ensemble)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -78,6 +105,7 @@ class PredictionResponse(BaseModel):
     decision: str
     confidence: float
     explanation: Optional[Dict] = None
+    model_version: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
@@ -85,72 +113,263 @@ class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
     version: str
+    model_version: Optional[str] = None
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness check response"""
+    ready: bool
+    model_loaded: bool
+    import_seconds: Optional[float] = None
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    post_warmup_latency_ms: Optional[float] = None
 
 
 # Global variables for model
 MODEL_PATH = Path(__file__).parent.parent.parent / "models"
-model = None
-feature_columns = []
+# Prefer the NumPy-compiled ensemble exported by train_models.py when present
+USE_COMPILED_MODEL = os.getenv("USE_COMPILED_MODEL", "1") == "1"
+# Memory-map model arrays so replicas on one host share pages ("" disables)
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+ready = False
+startup_timings = {}
+
+# Application fields handed to the model's preprocessing artifact (models/preprocessor.json)
+NUMERIC_INPUT_FIELDS = [
+    'age', 'annual_income', 'employment_duration_months', 'credit_score',
+    'existing_debt', 'loan_amount', 'loan_term_months', 'num_credit_accounts',
+    'credit_utilization', 'num_delinquencies', 'payment_history_months',
+]
+CATEGORICAL_INPUT_FIELDS = ['employment_status', 'loan_purpose']
+RAW_INPUT_FIELDS = NUMERIC_INPUT_FIELDS + CATEGORICAL_INPUT_FIELDS
+# Features derived by PreprocessingArtifact.legacy(), for models saved without feature columns
+DERIVED_FEATURES = [
+    'debt_to_income_ratio', 'loan_to_income_ratio', 'interest_rate',
+    'monthly_payment', 'payment_to_income_ratio', 'employment_status_encoded',
+]
+INPUT_FEATURES = NUMERIC_INPUT_FIELDS + DERIVED_FEATURES
+
+RISK_THRESHOLDS = np.array([0.20, 0.40, 0.60])
+RISK_CATEGORIES = np.array(["LOW_RISK", "MODERATE_RISK", "HIGH_RISK", "VERY_HIGH_RISK"])
+DECISION_THRESHOLDS = np.array([0.30, 0.50])
+DECISIONS = np.array(["APPROVED", "CONDITIONAL_APPROVAL", "REJECTED"])
+MIN_CONFIDENCE = 0.7
+
+# Micro-batching of concurrent /predict calls (see MicroBatcher)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_BATCH_SIZE = int(os.getenv("MICROBATCH_MAX_BATCH_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_MAX_QUEUE_SIZE = int(os.getenv("MICROBATCH_MAX_QUEUE_SIZE", "1024"))
+batcher = None
+
+# Executor for CPU-bound inference (see InferenceExecutor)
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Requests waiting for a free worker before /predict and /batch_predict return 503
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "1024"))
+inference_executor = None
+
+# Synthetic requests run through /predict and /batch_predict before reporting ready
+WARMUP_REQUESTS = int(os.getenv("WARMUP_REQUESTS", "32"))
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "256"))
+
+# In-process cache of /predict and /batch_predict results (0 disables)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+
+# Hot reload: poll models/ every MODEL_WATCH_INTERVAL seconds (0 disables) and/or
+# POST /admin/reload_model, which is only enabled when ADMIN_TOKEN is set
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+class ModelBundle:
+    """
+    A loaded model together with its preprocessing, feature order and version.
+    
+    Requests read the module-level `serving` bundle once and use that
+    snapshot throughout, so a reload swaps model, preprocessing and features
+    as one unit. Without a saved preprocessor the legacy transform is used.
+    
+    Raises ValueError when the model's feature columns cannot be served
+    exactly, so a mismatched bundle is never swapped in.
+    """
+    
+    def __init__(self, model=None, feature_columns: List[str] = None, version: str = "rule_based",
+                 preprocessor: PreprocessingArtifact = None):
+        self.model = model
+        self.feature_columns = list(feature_columns or [])
+        self.version = version
+        self.preprocessor = preprocessor or PreprocessingArtifact.legacy()
+        self.available_features = set(self.preprocessor.output_columns(RAW_INPUT_FIELDS))
+        self.loaded_at = time.time()
+        if model is not None:
+            self._check_features()
+    
+    def _check_features(self) -> None:
+        order = self.feature_order()
+        missing = [col for col in order if col not in self.available_features]
+        if missing:
+            raise ValueError(f"Model {self.version} expects features the preprocessing cannot produce: {missing}")
+        n_expected = getattr(self.model, 'n_features_in_', getattr(self.model, 'n_features', len(order)))
+        if n_expected != len(order):
+            raise ValueError(f"Model {self.version} expects {n_expected} features, feature columns list {len(order)}")
+        names = getattr(self.model, 'feature_names_in_', None)
+        if names is not None and list(names) != order:
+            raise ValueError(f"Model {self.version} was fitted on a different column order than its feature columns")
+    
+    def feature_order(self) -> List[str]:
+        """Column order for model input: the saved feature_columns, or INPUT_FEATURES for models saved without them"""
+        return self.feature_columns or INPUT_FEATURES
+
+
+serving = ModelBundle()
+
+
+def artifact_fingerprint(model_path: Path = None) -> Optional[str]:
+    """Short hash of the size and mtime of the model artifacts, or None if there are none"""
+    import hashlib
+    model_path = model_path or MODEL_PATH
+    files = [model_path / "best_model.pkl", model_path / "feature_columns.pkl", model_path / "preprocessor.json"]
+    compiled_dir = model_path / "best_model_compiled"
+    if compiled_dir.exists():
+        files.extend(sorted(compiled_dir.iterdir()))
+    stats = [(f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files if f.exists()]
+    if not stats:
+        return None
+    return hashlib.blake2b(repr(stats).encode(), digest_size=6).hexdigest()
+
+
+def read_preprocessor(model_path: Path) -> Optional[PreprocessingArtifact]:
+    """The fitted preprocessing saved with the model, or None for model directories without one"""
+    path = model_path / "preprocessor.json"
+    if not path.exists():
+        logger.warning(f"{path} not found, deriving features with the legacy transform")
+        return None
+    preprocessor = PreprocessingArtifact.load(path)
+    logger.info(f"Preprocessing state loaded from {path} ({len(preprocessor.steps)} steps)")
+    return preprocessor
+
+
+def read_model_bundle(model_path: Path = None) -> ModelBundle:
+    """Load model artifacts from disk into a new ModelBundle (raises on failure)"""
+    model_path = model_path or MODEL_PATH
+    model_file = model_path / "best_model.pkl"
+    compiled_dir = model_path / "best_model_compiled"
+    version = artifact_fingerprint(model_path)
+    if USE_COMPILED_MODEL and compiled_dir.exists():
+        # Pure NumPy: no scikit-learn/XGBoost/LightGBM or joblib import needed
+        model = CompiledTreeEnsemble.load(compiled_dir, mmap_mode=MODEL_MMAP_MODE)
+        logger.info(f"Compiled {model.meta['source']} loaded from {compiled_dir} (version {version})")
+        return ModelBundle(model, model.feature_names, version, read_preprocessor(model_path))
+    if model_file.exists():
+        # Unpickling imports only the library the saved model belongs to
+        import joblib
+        model = joblib.load(model_file, mmap_mode=MODEL_MMAP_MODE)
+        logger.info(f"Model loaded successfully from {model_file} (version {version})")
+        
+        # Load feature columns
+        feature_columns = []
+        features_file = model_path / "feature_columns.pkl"
+        if features_file.exists():
+            feature_columns = joblib.load(features_file)
+            logger.info(f"Loaded {len(feature_columns)} feature columns")
+        return ModelBundle(model, feature_columns, version, read_preprocessor(model_path))
+    logger.warning(f"Model file not found at {model_file}")
+    # For demo purposes, model will be None
+    return ModelBundle()
 
 
 def load_model():
     """Load the trained model"""
-    global model, feature_columns
+    global serving
     try:
-        model_file = MODEL_PATH / "best_model.pkl"
-        if model_file.exists():
-            model = joblib.load(model_file)
-            logger.info(f"Model loaded successfully from {model_file}")
-            
-            # Load feature columns
-            features_file = MODEL_PATH / "feature_columns.pkl"
-            if features_file.exists():
-                feature_columns = joblib.load(features_file)
-                logger.info(f"Loaded {len(feature_columns)} feature columns")
-        else:
-            logger.warning(f"Model file not found at {model_file}")
-            # For demo purposes, model will be None
+        serving = read_model_bundle()
     except Exception as e:
         logger.error(f"Error loading model: {e}")
 
 
-def preprocess_input(application: LoanApplication) -> pd.DataFrame:
-    """Preprocess input data to match training format"""
-    # Create DataFrame from input
-    data = {
-        'age': [application.age],
-        'annual_income': [application.annual_income],
-        'employment_duration_months': [application.employment_duration_months],
-        'credit_score': [application.credit_score],
-        'existing_debt': [application.existing_debt],
-        'loan_amount': [application.loan_amount],
-        'loan_term_months': [application.loan_term_months],
-        'num_credit_accounts': [application.num_credit_accounts],
-        'credit_utilization': [application.credit_utilization],
-        'num_delinquencies': [application.num_delinquencies],
-        'payment_history_months': [application.payment_history_months],
+def raw_columns(applications: List[LoanApplication]) -> Dict[str, np.ndarray]:
+    """Application fields as columns: float64 arrays for numeric fields, object arrays for categorical ones"""
+    columns = {
+        field: np.array([getattr(a, field) for a in applications], dtype=np.float64)
+        for field in NUMERIC_INPUT_FIELDS
     }
+    for field in CATEGORICAL_INPUT_FIELDS:
+        columns[field] = np.array([getattr(a, field) for a in applications], dtype=object)
+    return columns
+
+
+def preprocess_input(application: LoanApplication, bundle: ModelBundle = None) -> "pd.DataFrame":
+    """Preprocess input data to match training format"""
+    import pandas as pd
     
-    df = pd.DataFrame(data)
-    
-    # Calculate derived features
-    df['debt_to_income_ratio'] = df['existing_debt'] / (df['annual_income'] + 1)
-    df['loan_to_income_ratio'] = df['loan_amount'] / (df['annual_income'] + 1)
+    # The fitted training transform, replayed on a one-row batch
+    preprocessor = (bundle or serving).preprocessor
+    return pd.DataFrame(preprocessor.transform_columns(raw_columns([application])))
+
+
+def feature_order() -> List[str]:
+    """Column order for model input of the serving bundle"""
+    return serving.feature_order()
+
+
+def preprocess_input_array(application: LoanApplication, order: List[str] = None,
+                           bundle: ModelBundle = None) -> np.ndarray:
+    """
+    DataFrame-free equivalent of preprocess_input.
     
-    # Interest rate estimate (simplified)
-    interest_rate = 12.0  # Default rate
-    df['interest_rate'] = interest_rate
+    Runs the bundle's preprocessing on the application's scalar fields
+    (PreprocessingArtifact.transform_row) and writes the result into a
+    preallocated (1, n_features) float64 row in feature_order(). The result
+    is bit-for-bit identical to preprocess_input(application)[feature_order()].
+    """
+    bundle = bundle or serving
+    values = {field: float(getattr(application, field)) for field in NUMERIC_INPUT_FIELDS}
+    for field in CATEGORICAL_INPUT_FIELDS:
+        values[field] = getattr(application, field)
+    values = bundle.preprocessor.transform_row(values)
     
-    # Monthly payment calculation
-    monthly_rate = interest_rate / 100 / 12
-    df['monthly_payment'] = df['loan_amount'] * monthly_rate / (1 - (1 + monthly_rate) ** (-df['loan_term_months']))
-    df['payment_to_income_ratio'] = (df['monthly_payment'] * 12) / (df['annual_income'] + 1)
+    order = order or bundle.feature_order()
+    row = np.empty((1, len(order)), dtype=np.float64)
+    for i, col in enumerate(order):
+        row[0, i] = values[col]
+    return row
+
+
+def build_feature_columns(applications: List[LoanApplication], bundle: ModelBundle = None) -> Dict[str, np.ndarray]:
+    """
+    Build columnar feature arrays for a batch of applications.
     
-    # Encode categorical features (simplified for demo)
-    employment_mapping = {'Employed': 0, 'Self-Employed': 1, 'Unemployed': 2}
-    df['employment_status_encoded'] = employment_mapping.get(application.employment_status, 0)
+    Derived features are computed in a single vectorized pass of the
+    bundle's preprocessing (PreprocessingArtifact.transform_columns).
+    """
+    return (bundle or serving).preprocessor.transform_columns(raw_columns(applications))
+
+
+def assemble_matrix(columns: Dict[str, np.ndarray], order: List[str] = None) -> np.ndarray:
+    """Stack columnar features into a (n_rows, n_features) float64 matrix in model order"""
+    return np.column_stack([columns[col] for col in (order or feature_order())])
+
+
+_feature_names_warning_lock = threading.Lock()
+
+
+def model_predict_proba(model, X: np.ndarray) -> np.ndarray:
+    """
+    model.predict_proba on a NumPy matrix already in the model's feature order.
     
-    return df
+    Estimators fitted on DataFrames warn that X has no feature names; that
+    warning is silenced for this call only. catch_warnings swaps the global
+    filter list, so concurrent calls are serialised to keep one thread from
+    restoring another's filters.
+    """
+    if not hasattr(model, 'feature_names_in_'):
+        return model.predict_proba(X)
+    with _feature_names_warning_lock, warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return model.predict_proba(X)
 
 
 def calculate_risk_category(probability: float) -> str:
@@ -177,11 +396,257 @@ def make_decision(probability: float, confidence: float) -> str:
         return "REJECTED"
 
 
+def calculate_risk_categories(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized calculate_risk_category over an array of probabilities"""
+    return RISK_CATEGORIES[np.searchsorted(RISK_THRESHOLDS, probabilities, side='right')]
+
+
+def make_decisions(probabilities: np.ndarray, confidences: np.ndarray) -> np.ndarray:
+    """Vectorized make_decision over arrays of probabilities and confidences"""
+    decisions = DECISIONS[np.searchsorted(DECISION_THRESHOLDS, probabilities, side='right')]
+    return np.where(confidences < MIN_CONFIDENCE, "MANUAL_REVIEW", decisions)
+
+
+class StageHistogram:
+    """
+    Minimal thread-safe Prometheus histogram keyed by label values.
+    
+    Rendered in the Prometheus text exposition format by /metrics, so no
+    client library or external collector is required.
+    """
+    
+    def __init__(self, name: str, help_text: str, label_names: List[str], buckets: List[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = sorted(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, label_values: tuple, value: float) -> None:
+        """Record one observation for the given label values"""
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            series['counts'][idx] += 1
+            series['sum'] += value
+    
+    def render(self) -> str:
+        """Render all series in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: (list(s['counts']), s['sum']) for labels, s in self._series.items()}
+        for label_values, (counts, total) in sorted(snapshot.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float('inf')], counts):
+                cumulative += count
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+    
+    def reset(self) -> None:
+        """Drop all recorded observations"""
+        with self._lock:
+            self._series.clear()
+
+
+STAGE_DURATION = StageHistogram(
+    "credit_scoring_stage_duration_seconds",
+    "Per-request time spent in each scoring stage",
+    ["endpoint", "stage", "model"],
+    [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction responses with TTL expiry.
+    
+    Keys are the validated application fields plus the model version, so
+    entries from a previous model can never be served; clear() is also
+    called on every model swap to release them immediately.
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hit": 0, "miss": 0, "eviction": 0, "expiration": 0}
+    
+    @staticmethod
+    def key(application: LoanApplication, model_version: str) -> tuple:
+        return (model_version,) + tuple(getattr(application, field) for field in APPLICATION_FIELDS)
+    
+    def get(self, key: tuple) -> Optional[Dict]:
+        """Cached response with a fresh application_id, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self._entries[key]
+                self.counters["expiration"] += 1
+                entry = None
+            if entry is None:
+                self.counters["miss"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hit"] += 1
+        import uuid
+        return {**entry[1], "application_id": f"APP_{uuid.uuid4().hex[:8].upper()}"}
+    
+    def put(self, key: tuple, response: Dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.counters["eviction"] += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def render(self) -> str:
+        """Counters and size in Prometheus text format"""
+        name = "credit_scoring_prediction_cache_events_total"
+        lines = [f"# HELP {name} Prediction cache lookups and removals", f"# TYPE {name} counter"]
+        with self._lock:
+            lines += [f'{name}{{event="{event}"}} {count}' for event, count in self.counters.items()]
+            size = len(self._entries)
+        lines += ["# HELP credit_scoring_prediction_cache_entries Entries currently cached",
+                  "# TYPE credit_scoring_prediction_cache_entries gauge",
+                  f"credit_scoring_prediction_cache_entries {size}"]
+        return "\n".join(lines) + "\n"
+
+
+APPLICATION_FIELDS = list(getattr(LoanApplication, 'model_fields', None) or LoanApplication.__fields__)
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+
+
+def model_type(bundle: ModelBundle = None) -> str:
+    """Label identifying the model serving predictions"""
+    model = (bundle or serving).model
+    return type(model).__name__ if model is not None else "rule_based"
+
+
+@contextmanager
+def stage_timer(endpoint: str, stage: str, bundle: ModelBundle = None):
+    """Record the wall-clock duration of a block in STAGE_DURATION"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe((endpoint, stage, model_type(bundle)), time.perf_counter() - start)
+
+
+@app.middleware("http")
+async def record_request_start(request: Request, call_next):
+    """Stamp request arrival so handlers can attribute body parsing/validation time"""
+    request.state.start_time = time.perf_counter()
+    return await call_next(request)
+
+
 # API Endpoints
 @app.on_event("startup")
 async def startup_event():
     """Load model on startup"""
+    global ready
+    startup_timings['import_seconds'] = _IMPORT_DONE - _IMPORT_START
+    start = time.perf_counter()
     load_model()
+    startup_timings['load_seconds'] = time.perf_counter() - start
+    logger.info(f"Cold start: imports {startup_timings['import_seconds'] * 1000:.0f} ms, "
+                f"model load {startup_timings['load_seconds'] * 1000:.0f} ms ({model_type()})")
+    start_executor()
+    if MICROBATCH_ENABLED:
+        await start_batcher()
+    if WARMUP_REQUESTS > 0:
+        await warm_up(WARMUP_REQUESTS, WARMUP_BATCH_SIZE)
+    if MODEL_WATCH_INTERVAL > 0:
+        start_model_watcher(MODEL_WATCH_INTERVAL)
+    ready = True
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain the micro-batcher and inference executor on shutdown"""
+    await stop_model_watcher()
+    await stop_batcher()
+    stop_executor()
+
+
+def warmup_payloads(n: int, bundle: ModelBundle = None) -> List[Dict[str, Any]]:
+    """
+    Synthetic applications derived from the LoanApplication schema example.
+    
+    Amounts, scores and categorical fields are varied deterministically so
+    warm-up exercises different tree paths rather than one cached leaf.
+    """
+    example = LoanApplication.Config.schema_extra["example"]
+    # Every employment status the bundle's encoder knows
+    statuses = (bundle or serving).preprocessor.vocabulary('employment_status') or [example["employment_status"]]
+    payloads = []
+    for i in range(n):
+        scale = 0.5 + (i % 8) / 4
+        payload = dict(example)
+        payload.update({
+            "annual_income": example["annual_income"] * scale,
+            "existing_debt": example["existing_debt"] * (2 - scale / 2),
+            "loan_amount": example["loan_amount"] * scale,
+            "credit_score": 300 + (i * 37) % 551,
+            "credit_utilization": (i % 10) / 10,
+            "num_delinquencies": i % 4,
+            "employment_status": statuses[i % len(statuses)],
+        })
+        payloads.append(payload)
+    return payloads
+
+
+async def warm_up(n_requests: int, batch_size: int) -> None:
+    """Run synthetic traffic through the /predict and /batch_predict paths"""
+    global prediction_cache
+    start = time.perf_counter()
+    payloads = warmup_payloads(max(n_requests, batch_size))
+    applications = [LoanApplication(**p) for p in payloads[:n_requests]]
+    
+    # Concurrent, but within the executor's back-pressure limit
+    limit = asyncio.Semaphore(inference_executor.max_workers + inference_executor.max_queue
+                              if inference_executor is not None else n_requests or 1)
+    
+    async def predict_one(application):
+        async with limit:
+            await predict_credit_risk(application)
+    
+    # Bypass the prediction cache: synthetic entries would occupy it and the
+    # repeated latency probe below would measure cache hits, not inference
+    cache, prediction_cache = prediction_cache, None
+    try:
+        await asyncio.gather(*(predict_one(a) for a in applications))
+        if batch_size > 0:
+            await batch_predict(payloads[:batch_size])
+        startup_timings['warmup_seconds'] = time.perf_counter() - start
+        
+        # Steady-state single-request latency after warm-up
+        latencies = []
+        for application in applications[:8]:
+            t0 = time.perf_counter()
+            await predict_credit_risk(application)
+            latencies.append(time.perf_counter() - t0)
+        startup_timings['post_warmup_latency_ms'] = float(np.median(latencies)) * 1000
+    finally:
+        prediction_cache = cache
+    
+    # Keep synthetic traffic out of the served metrics
+    STAGE_DURATION.reset()
+    logger.info(f"Warm-up: {n_requests} /predict + {batch_size}-row /batch_predict in "
+                f"{startup_timings['warmup_seconds'] * 1000:.0f} ms, "
+                f"post-warm-up /predict latency {startup_timings['post_warmup_latency_ms']:.2f} ms")
 
 
 @app.get("/", response_model=HealthResponse)
@@ -189,8 +654,9 @@ async def root():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "model_loaded": model is not None,
-        "version": "1.0.0"
+        "model_loaded": serving.model is not None,
+        "version": "1.0.0",
+        "model_version": serving.version
     }
 
 
@@ -198,14 +664,35 @@ async def root():
 async def health_check():
     """Detailed health check"""
     return {
-        "status": "healthy" if model is not None else "degraded",
-        "model_loaded": model is not None,
-        "version": "1.0.0"
+        "status": "healthy" if serving.model is not None else "degraded",
+        "model_loaded": serving.model is not None,
+        "version": "1.0.0",
+        "model_version": serving.version
     }
 
 
+@app.get("/ready", response_model=ReadinessResponse)
+async def readiness_check():
+    """
+    Readiness probe: 200 once startup has loaded and warmed up the model, 503 before.
+    
+    /health is the liveness probe and answers as soon as the process is up.
+    """
+    body = {"ready": ready, "model_loaded": serving.model is not None, **startup_timings}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage timing histograms (and prediction cache counters) in Prometheus text format"""
+    body = STAGE_DURATION.render()
+    if prediction_cache is not None:
+        body += prediction_cache.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_credit_risk(application: LoanApplication):
+async def predict_credit_risk(application: LoanApplication, request: Request = None):
     """
     Predict credit default risk for a loan application
     
@@ -216,19 +703,58 @@ async def predict_credit_risk(application: LoanApplication):
     - confidence: Model confidence in prediction
     """
     try:
-        # Generate application ID
-        import uuid
-        app_id = f"APP_{uuid.uuid4().hex[:8].upper()}"
+        # Request parsing and schema validation happen before the handler runs
+        if request is not None and hasattr(request.state, 'start_time'):
+            STAGE_DURATION.observe(("predict", "validation", model_type()), time.perf_counter() - request.state.start_time)
+        
+        # One lookup of the module-level cache, which warm-up swaps out
+        cache = prediction_cache
+        cache_key = None
+        if cache is not None:
+            cache_key = PredictionCache.key(application, serving.version)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if batcher is not None:
+            result = await batcher.submit(application)
+        else:
+            result = await run_inference(score_application, application)
         
-        # Preprocess input
-        df = preprocess_input(application)
+        if cache_key is not None and result["model_version"] == cache_key[0]:
+            cache.put(cache_key, result)
+        return result
         
-        # Make prediction
+    except (asyncio.QueueFull, InferenceQueueFull):
+        raise HTTPException(status_code=503, detail="Prediction queue is full, retry later",
+                            headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+def score_application(application: LoanApplication, bundle: ModelBundle = None) -> Dict:
+    """Score one validated application (runs on the inference executor)"""
+    # One snapshot for the whole request, so a concurrent reload cannot mix models
+    bundle = bundle or serving
+    model = bundle.model
+    
+    # Generate application ID
+    import uuid
+    app_id = f"APP_{uuid.uuid4().hex[:8].upper()}"
+    
+    # Preprocess input
+    with stage_timer("predict", "feature_assembly", bundle):
+        features = preprocess_input_array(application, bundle.feature_order(), bundle)
+    
+    # Make prediction
+    with stage_timer("predict", "inference", bundle):
         if model is not None:
-            # Use actual model
+            # Use actual model; one predict_proba call serves both outputs
             try:
-                probability = model.predict_proba(df)[0][1]
-                confidence = max(model.predict_proba(df)[0])
+                proba = model_predict_proba(model, features)[0]
+                probability = proba[1]
+                confidence = max(proba)
             except Exception as e:
                 logger.error(f"Model prediction error: {e}")
                 # Fallback to rule-based prediction
@@ -238,7 +764,8 @@ async def predict_credit_risk(application: LoanApplication):
             # Rule-based prediction for demo
             probability = calculate_rule_based_probability(application)
             confidence = 0.6
-        
+    
+    with stage_timer("predict", "post_processing", bundle):
         # Calculate risk category and decision
         risk_category = calculate_risk_category(probability)
         decision = make_decision(probability, confidence)
@@ -250,36 +777,411 @@ async def predict_credit_risk(application: LoanApplication):
             "employment_impact": "high" if application.employment_status == "Unemployed" else "low",
             "delinquency_impact": "high" if application.num_delinquencies > 2 else "low"
         }
-        
-        return {
-            "application_id": app_id,
-            "default_probability": round(probability, 4),
-            "risk_category": risk_category,
-            "decision": decision,
-            "confidence": round(confidence, 4),
-            "explanation": explanation
-        }
-        
-    except Exception as e:
-        logger.error(f"Prediction error: {e}")
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    
+    return {
+        "application_id": app_id,
+        "default_probability": round(probability, 4),
+        "risk_category": risk_category,
+        "decision": decision,
+        "confidence": round(confidence, 4),
+        "explanation": explanation,
+        "model_version": bundle.version
+    }
 
 
 @app.post("/batch_predict")
-async def batch_predict(applications: List[LoanApplication]):
-    """Batch prediction endpoint"""
-    results = []
-    for app in applications:
+async def batch_predict(applications: List[Dict[str, Any]]):
+    """
+    Batch prediction endpoint
+    
+    Applications are validated individually so that invalid rows are reported
+    per row; all valid rows are scored with a single predict_proba call.
+    """
+    results: List[Optional[Dict]] = [None] * len(applications)
+    valid_idx = []
+    valid_apps = []
+    with stage_timer("batch_predict", "validation"):
+        for idx, raw in enumerate(applications):
+            try:
+                valid_apps.append(LoanApplication(**raw))
+                valid_idx.append(idx)
+            except (ValidationError, TypeError) as e:
+                logger.error(f"Batch validation error at row {idx}: {e}")
+                results[idx] = {"index": idx, "error": str(e)}
+    
+    cache = prediction_cache
+    cache_keys = {}
+    if cache is not None and valid_apps:
+        version = serving.version
+        uncached_idx, uncached_apps = [], []
+        for idx, application in zip(valid_idx, valid_apps):
+            cache_keys[idx] = PredictionCache.key(application, version)
+            cached = cache.get(cache_keys[idx])
+            if cached is not None:
+                results[idx] = cached
+            else:
+                uncached_idx.append(idx)
+                uncached_apps.append(application)
+        valid_idx, valid_apps = uncached_idx, uncached_apps
+    
+    if valid_apps:
         try:
-            result = await predict_credit_risk(app)
-            results.append(result)
+            predictions = await run_inference(predict_batch, valid_apps)
+            for idx, prediction in zip(valid_idx, predictions):
+                results[idx] = prediction
+                if idx in cache_keys and prediction["model_version"] == cache_keys[idx][0]:
+                    cache.put(cache_keys[idx], prediction)
+        except InferenceQueueFull:
+            raise HTTPException(status_code=503, detail="Inference executor is saturated, retry later",
+                                headers={"Retry-After": "1"})
         except Exception as e:
             logger.error(f"Batch prediction error: {e}")
-            results.append({"error": str(e)})
+            for idx in valid_idx:
+                results[idx] = {"index": idx, "error": str(e)}
     
     return {"predictions": results, "total": len(applications), "successful": len([r for r in results if "error" not in r])}
 
 
+def predict_batch(applications: List[LoanApplication], endpoint: str = "batch_predict",
+                  bundle: ModelBundle = None) -> List[Dict]:
+    """Score a list of validated applications with one vectorized pass"""
+    bundle = bundle or serving
+    model = bundle.model
+    n = len(applications)
+    with stage_timer(endpoint, "feature_assembly", bundle):
+        raw = raw_columns(applications)
+        X = assemble_matrix(bundle.preprocessor.transform_columns(raw), bundle.feature_order())
+    
+    with stage_timer(endpoint, "inference", bundle):
+        probabilities = None
+        if model is not None:
+            try:
+                proba = model_predict_proba(model, X)
+                probabilities = proba[:, 1]
+                confidences = proba.max(axis=1)
+            except Exception as e:
+                logger.error(f"Model batch prediction error: {e}")
+        if probabilities is None:
+            probabilities = calculate_rule_based_probabilities(raw)
+            confidences = np.full(n, 0.6)
+    
+    with stage_timer(endpoint, "post_processing", bundle):
+        return _format_batch(applications, raw, probabilities, confidences, bundle.version)
+
+
+def _format_batch(applications: List[LoanApplication], columns: Dict[str, np.ndarray],
+                  probabilities: np.ndarray, confidences: np.ndarray, model_version: str) -> List[Dict]:
+    """Map batch probabilities to per-application response dicts"""
+    n = len(applications)
+    risk_categories = calculate_risk_categories(probabilities)
+    decisions = make_decisions(probabilities, confidences)
+    
+    credit_impact = np.where(columns['credit_score'] < 600, "high", "low")
+    debt_impact = np.where(columns['existing_debt'] / columns['annual_income'] > 0.5, "high", "low")
+    employment_impact = np.where(columns['employment_status'] == "Unemployed", "high", "low")
+    delinquency_impact = np.where(columns['num_delinquencies'] > 2, "high", "low")
+    
+    import uuid
+    return [
+        {
+            "application_id": f"APP_{uuid.uuid4().hex[:8].upper()}",
+            "default_probability": round(float(probabilities[i]), 4),
+            "risk_category": str(risk_categories[i]),
+            "decision": str(decisions[i]),
+            "confidence": round(float(confidences[i]), 4),
+            "explanation": {
+                "credit_score_impact": str(credit_impact[i]),
+                "debt_ratio_impact": str(debt_impact[i]),
+                "employment_impact": str(employment_impact[i]),
+                "delinquency_impact": str(delinquency_impact[i])
+            },
+            "model_version": model_version
+        }
+        for i in range(n)
+    ]
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference executor's wait queue already holds max_queue jobs"""
+
+
+class InferenceExecutor:
+    """
+    Bounded executor for CPU-bound scoring.
+    
+    kind='thread' suits GIL-releasing boosters (XGBoost/LightGBM/sklearn trees);
+    kind='process' suits pure-Python paths such as the rule-based scorer at
+    scale. Process workers load the model themselves, and their stage timings
+    are not visible in /metrics. At most max_workers jobs run at once and up
+    to max_queue more wait for a worker on the event loop; further
+    submissions raise InferenceQueueFull instead of queueing without bound.
+    """
+    
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue: int = 1024):
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+        if kind == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        elif kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=load_model)
+        else:
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.waiting = 0
+        # Created on first use so it binds to the serving event loop
+        self._slots = None
+    
+    async def run(self, fn, *args):
+        # Only touched from the event loop thread, so the counters need no lock
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                raise InferenceQueueFull()
+            self.waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+    
+    def shutdown(self, cancel_pending: bool = True) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+
+
+def start_executor(kind: str = None, max_workers: int = None, max_queue: int = None) -> None:
+    """Route inference through an InferenceExecutor (defaults from INFERENCE_* settings)"""
+    global inference_executor
+    previous = inference_executor
+    inference_executor = InferenceExecutor(
+        kind=kind or INFERENCE_EXECUTOR,
+        max_workers=max_workers or INFERENCE_WORKERS,
+        max_queue=INFERENCE_MAX_QUEUE if max_queue is None else max_queue,
+    )
+    logger.info(f"Inference executor: kind={inference_executor.kind}, "
+                f"max_workers={inference_executor.max_workers}, max_queue={inference_executor.max_queue}")
+    # Jobs already submitted to a replaced executor finish there
+    if previous is not None:
+        previous.shutdown(cancel_pending=False)
+
+
+def stop_executor() -> None:
+    """Shut down the InferenceExecutor, if any, and score inline"""
+    global inference_executor
+    if inference_executor is not None:
+        current, inference_executor = inference_executor, None
+        current.shutdown()
+
+
+async def run_inference(fn, *args):
+    """Run fn(*args) on the inference executor, or inline when none is configured"""
+    if inference_executor is None:
+        return fn(*args)
+    return await inference_executor.run(fn, *args)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-application predictions into batches.
+    
+    Requests are queued and collected for up to max_wait_ms or until
+    max_batch_size rows are waiting; each batch is scored with one
+    predict_batch call on the inference executor so the event loop stays free.
+    submit raises asyncio.QueueFull once max_queue_size requests are waiting.
+    """
+    
+    def __init__(self, max_batch_size: int = 64, max_wait_ms: float = 2.0, max_queue_size: int = 1024):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        # Requests taken off the queue but not yet answered
+        self._batch = []
+        self._task = None
+    
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Fail the interrupted batch and anything still waiting rather than leaving callers hanging
+        pending, self._batch = self._batch, []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+    
+    async def submit(self, application: LoanApplication) -> Dict:
+        """Queue one application and wait for its prediction"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((application, future))
+        return await future
+    
+    async def _collect(self) -> list:
+        # Collected into self._batch so stop() can fail requests taken off the queue
+        batch = self._batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            applications = [application for application, _ in batch]
+            try:
+                predictions = await run_inference(predict_batch, applications, "predict")
+            except Exception as e:
+                logger.error(f"Micro-batch prediction error: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._batch = []
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(prediction)
+            self._batch = []
+
+
+async def start_batcher(max_batch_size: int = None, max_wait_ms: float = None, max_queue_size: int = None) -> None:
+    """Start routing /predict through a MicroBatcher (defaults from MICROBATCH_* settings)"""
+    global batcher
+    await stop_batcher()
+    batcher = MicroBatcher(
+        max_batch_size=max_batch_size or MICROBATCH_MAX_BATCH_SIZE,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms,
+        max_queue_size=max_queue_size or MICROBATCH_MAX_QUEUE_SIZE,
+    )
+    batcher.start()
+    logger.info(f"Micro-batching enabled: max_batch_size={batcher.max_batch_size}, "
+                f"max_wait_ms={batcher.max_wait * 1000:g}, max_queue_size={batcher.queue.maxsize}")
+
+
+async def stop_batcher() -> None:
+    """Stop the MicroBatcher, if any, and return /predict to inline scoring"""
+    global batcher
+    if batcher is not None:
+        current, batcher = batcher, None
+        await current.stop()
+
+
+_reload_lock = None
+_watcher_task = None
+
+
+def warm_bundle(bundle: ModelBundle) -> None:
+    """Score synthetic traffic with a candidate bundle before it is swapped in"""
+    applications = [LoanApplication(**p) for p in warmup_payloads(max(WARMUP_BATCH_SIZE, 1), bundle)]
+    if bundle.model is not None:
+        # Fail loudly here: predict_batch would silently fall back to rules
+        columns = build_feature_columns(applications, bundle)
+        model_predict_proba(bundle.model, assemble_matrix(columns, bundle.feature_order()))
+    predict_batch(applications, "reload_warmup", bundle)
+    for application in applications[:WARMUP_REQUESTS]:
+        score_application(application, bundle)
+
+
+async def reload_model() -> Dict[str, Any]:
+    """
+    Load, warm and atomically swap in the model currently on disk.
+    
+    The old bundle keeps serving until the new one is warm; in-flight
+    requests finish on whichever bundle they started with.
+    """
+    global serving, _reload_lock
+    if _reload_lock is None:
+        _reload_lock = asyncio.Lock()
+    async with _reload_lock:
+        previous = serving
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        candidate = await loop.run_in_executor(None, read_model_bundle)
+        if candidate.version == previous.version:
+            return {"reloaded": False, "model_version": previous.version, "previous_version": previous.version}
+        await loop.run_in_executor(None, warm_bundle, candidate)
+        serving = candidate
+        if prediction_cache is not None:
+            prediction_cache.clear()
+        
+        # Process workers hold their own copy of the model
+        if inference_executor is not None and inference_executor.kind == "process":
+            start_executor()
+        logger.info(f"Model swapped {previous.version} -> {candidate.version} "
+                    f"({model_type(candidate)}) in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return {"reloaded": True, "model_version": candidate.version, "previous_version": previous.version}
+
+
+async def watch_model_dir(interval: float) -> None:
+    """Reload when the artifacts in MODEL_PATH change and have been stable for one interval"""
+    last_seen = serving.version
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            fingerprint = await asyncio.get_running_loop().run_in_executor(None, artifact_fingerprint)
+            # Require two identical polls so a half-written artifact is never loaded
+            if fingerprint is not None and fingerprint != serving.version and fingerprint == last_seen:
+                await reload_model()
+            last_seen = fingerprint
+        except Exception as e:
+            logger.error(f"Model reload failed, keeping version {serving.version}: {e}")
+
+
+def start_model_watcher(interval: float) -> None:
+    global _watcher_task
+    _watcher_task = asyncio.get_running_loop().create_task(watch_model_dir(interval))
+    logger.info(f"Watching {MODEL_PATH} for new models every {interval:g}s")
+
+
+async def stop_model_watcher() -> None:
+    global _watcher_task
+    if _watcher_task is not None:
+        _watcher_task.cancel()
+        try:
+            await _watcher_task
+        except asyncio.CancelledError:
+            pass
+        _watcher_task = None
+
+
+@app.post("/admin/reload_model")
+async def admin_reload_model(x_admin_token: Optional[str] = Header(None)):
+    """Load, warm and swap in the model currently in models/ without dropping requests"""
+    # Disabled unless a token is configured: a model swap must always be authenticated
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        return await reload_model()
+    except Exception as e:
+        logger.error(f"Model reload failed, keeping version {serving.version}: {e}")
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+
+
 def calculate_rule_based_probability(application: LoanApplication) -> float:
     """
     Calculate default probability using rules (for demo when model not available)
@@ -322,6 +1224,31 @@ def calculate_rule_based_probability(application: LoanApplication) -> float:
     return min(probability, 0.95)  # Cap at 95%
 
 
+def calculate_rule_based_probabilities(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized calculate_rule_based_probability over columnar application fields (see raw_columns)"""
+    credit_score = columns['credit_score']
+    probability = np.full(len(credit_score), 0.10)
+    
+    probability += np.select([credit_score < 600, credit_score < 650, credit_score < 700], [0.25, 0.15, 0.05], 0.0)
+    
+    dti = columns['existing_debt'] / (columns['annual_income'] + 1)
+    probability += np.select([dti > 0.5, dti > 0.4], [0.20, 0.10], 0.0)
+    
+    employment = columns['employment_status']
+    probability += np.select([employment == "Unemployed", employment == "Self-Employed"], [0.15, 0.05], 0.0)
+    
+    delinquencies = columns['num_delinquencies']
+    probability += np.select([delinquencies > 2, delinquencies > 0], [0.20, 0.10], 0.0)
+    
+    utilization = columns['credit_utilization']
+    probability += np.select([utilization > 0.8, utilization > 0.6], [0.10, 0.05], 0.0)
+    
+    return np.minimum(probability, 0.95)
+
+
+_IMPORT_DONE = time.perf_counter()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
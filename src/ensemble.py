@@ -0,0 +1,32 @@
+"""
+Model wrappers saved as best_model.pkl
+
+Kept in their own module, importable by both the trainer and the serving
+API, so a pickled model does not refer to classes defined in the training
+script (__main__ when run as python src/train_models.py).
+"""
+
+import numpy as np
+
+
+class FoldEnsemble:
+    """
+    Bagged ensemble of the per-fold models from cross-validation.
+
+    Used instead of a separate full-data refit: probabilities are the mean
+    of the fold models' predict_proba.
+    """
+
+    def __init__(self, models):
+        self.models = models
+        self.classes_ = models[0].classes_
+        # Input schema of the fold models, for the serving API's feature checks
+        for attr in ('n_features_in_', 'feature_names_in_'):
+            if hasattr(models[0], attr):
+                setattr(self, attr, getattr(models[0], attr))
+
+    def predict_proba(self, X):
+        return np.mean([m.predict_proba(X) for m in self.models], axis=0)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
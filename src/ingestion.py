@@ -0,0 +1,275 @@
+"""
+Typed, chunked CSV ingestion with a columnar on-disk cache
+
+The CSV is parsed once in chunks; each column is stored in the narrowest
+dtype that holds it exactly (int8/int16/int32, float32 when the round trip
+through float32 is lossless, `category` for low-cardinality strings). The
+typed frame is written to a Parquet (or Feather) file next to the CSV,
+keyed by a hash of the CSV's contents, and later runs load that instead.
+
+Model-ready sparse feature matrices (wide one-hot encodings) are persisted
+as CSR arrays plus feature names and target in one .npz file instead, see
+save_sparse_dataset.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet/Feather engine)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CHUNK_ROWS = 1_000_000
+# Rows per chunk when streaming a source through preprocessing or profiling
+STREAM_CHUNK_ROWS = 100_000
+CACHE_DIR_NAME = ".cache"
+# Strings with more distinct values than this share of rows stay object (e.g. IDs)
+MAX_CATEGORY_RATIO = 0.5
+
+
+@dataclass
+class IngestionReport:
+    """What load_csv did: source, whether the cache was hit, timing and memory"""
+    source: str
+    cache_path: Optional[str]
+    from_cache: bool
+    rows: int
+    columns: int
+    seconds: float
+    memory_bytes: int
+    dtypes: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        path = "cache" if self.from_cache else "CSV parse"
+        return (f"{path}: {self.rows:,} rows x {self.columns} cols in {self.seconds:.2f}s, "
+                f"{self.memory_bytes / 1e6:,.1f} MB in memory")
+
+
+def file_digest(path, block_size: int = 1 << 22) -> str:
+    """blake2b of the file contents (the cache key)"""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, 'rb') as f:
+        while chunk := f.read(block_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def downcast_column(s: pd.Series) -> pd.Series:
+    """Narrowest exact dtype for one column"""
+    if pd.api.types.is_bool_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast='integer')
+    if pd.api.types.is_float_dtype(s):
+        values = s.to_numpy()
+        as32 = values.astype(np.float32)
+        if np.array_equal(as32.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(as32, index=s.index, name=s.name)
+        return s
+    if pd.api.types.is_string_dtype(s):
+        return s.astype('category')
+    return s
+
+
+def _combine_chunks(chunks):
+    """Concatenate typed chunks, widening each column to the dtype every chunk fits in"""
+    combined = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            combined[col] = pd.api.types.union_categoricals(parts, ignore_order=True)
+        else:
+            dtypes = {p.dtype for p in parts}
+            if len(dtypes) > 1:
+                if not all(pd.api.types.is_numeric_dtype(d) for d in dtypes):
+                    parts = [p.astype(object) for p in parts]
+                else:
+                    target = np.result_type(*dtypes)
+                    parts = [p.astype(target) for p in parts]
+            combined[col] = np.concatenate([p.to_numpy() for p in parts])
+    df = pd.DataFrame(combined)
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and len(df[col].cat.categories) > MAX_CATEGORY_RATIO * len(df):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
+
+
+def iter_chunks(source: Union[str, Path, pd.DataFrame, Iterable[pd.DataFrame]],
+                chunksize: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Yield DataFrame chunks from a CSV/Parquet path, a DataFrame or an iterable of DataFrames.
+    
+    Paths are re-read on every call, so the same source can be passed to
+    DataPreprocessor.fit_stream and then to transform_stream.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, (str, Path)):
+        if str(source).endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(source, chunksize=chunksize)
+    else:
+        yield from source
+
+
+
+def read_csv_typed(path, chunksize: int = CHUNK_ROWS, dtype: Dict[str, str] = None) -> pd.DataFrame:
+    """
+    Parse a CSV chunk by chunk into compact dtypes.
+
+    Parameters:
+    -----------
+    path : str or Path
+        CSV file
+    chunksize : int
+        Rows parsed at a time; only one chunk is held at float64/object width
+    dtype : Dict[str, str]
+        Optional explicit dtypes for some columns (applied as given, not downcast)
+
+    Returns:
+    --------
+    pd.DataFrame : Typed frame
+    """
+    fixed = set(dtype or {})
+    chunks = []
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtype):
+        for col in chunk.columns:
+            if col not in fixed:
+                chunk[col] = downcast_column(chunk[col])
+        chunks.append(chunk)
+    if not chunks:
+        return pd.read_csv(path, dtype=dtype)
+    return _combine_chunks(chunks)
+
+
+def cache_path_for(path, digest: str, fmt: str = 'parquet') -> Path:
+    path = Path(path)
+    return path.parent / CACHE_DIR_NAME / f"{path.stem}-{digest}.{fmt}"
+
+
+def load_csv(path, use_cache: bool = True, fmt: str = 'parquet', chunksize: int = CHUNK_ROWS,
+             dtype: Dict[str, str] = None):
+    """
+    Load a CSV through the typed parser, reusing the columnar cache when the file is unchanged.
+
+    Parameters:
+    -----------
+    path : str or Path
+        CSV file
+    use_cache : bool
+        Read/write the Parquet/Feather cache (needs pyarrow)
+    fmt : str
+        Cache format ('parquet' or 'feather')
+    chunksize : int
+        Rows per parse chunk
+    dtype : Dict[str, str]
+        Optional explicit dtypes for some columns
+
+    Returns:
+    --------
+    Tuple[pd.DataFrame, IngestionReport] : Typed frame and load report
+    """
+    if fmt not in ('parquet', 'feather'):
+        raise ValueError(f"Unknown cache format: {fmt}")
+    use_cache = use_cache and PYARROW_AVAILABLE
+    start = time.perf_counter()
+    cache_path = cache_path_for(path, file_digest(path), fmt) if use_cache else None
+
+    from_cache = cache_path is not None and cache_path.exists()
+    if from_cache:
+        df = pd.read_parquet(cache_path) if fmt == 'parquet' else pd.read_feather(cache_path)
+    else:
+        df = read_csv_typed(path, chunksize=chunksize, dtype=dtype)
+    seconds = time.perf_counter() - start
+
+    if cache_path is not None and not from_cache:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + '.tmp')
+        if fmt == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.reset_index(drop=True).to_feather(tmp_path)
+        tmp_path.replace(cache_path)
+        # Caches of earlier versions of this file are stale now
+        for stale in cache_path.parent.glob(f"{Path(path).stem}-*.{fmt}"):
+            if stale != cache_path:
+                stale.unlink()
+
+    report = IngestionReport(
+        source=str(path),
+        cache_path=str(cache_path) if cache_path else None,
+        from_cache=from_cache,
+        rows=len(df),
+        columns=df.shape[1],
+        seconds=seconds,
+        memory_bytes=int(df.memory_usage(deep=True).sum()),
+        dtypes={col: str(dt) for col, dt in df.dtypes.items()},
+    )
+    return df, report
+
+
+def save_sparse_dataset(path, X, feature_names: List[str], y=None) -> Path:
+    """
+    Persist a CSR feature matrix with its column names (and optional target) as one .npz.
+
+    Parameters:
+    -----------
+    path : str or Path
+        Destination .npz file
+    X : scipy.sparse matrix
+        Feature matrix (converted to CSR)
+    feature_names : List[str]
+        Column names, one per column of X
+    y : array-like
+        Optional target, one value per row of X
+
+    Returns:
+    --------
+    Path : Written file
+    """
+    from scipy import sparse
+
+    X = sparse.csr_matrix(X)
+    if len(feature_names) != X.shape[1]:
+        raise ValueError(f"{len(feature_names)} feature names for {X.shape[1]} columns")
+    arrays = {'data': X.data, 'indices': X.indices, 'indptr': X.indptr, 'shape': np.array(X.shape),
+              'feature_names': np.array(feature_names, dtype=str)}
+    if y is not None:
+        y = np.asarray(y)
+        if len(y) != X.shape[0]:
+            raise ValueError(f"{len(y)} target values for {X.shape[0]} rows")
+        arrays['target'] = y
+    path = Path(path)
+    # Written via a temporary name; np.savez appends .npz to names without it
+    tmp_path = path.with_name(path.name + '.tmp.npz')
+    np.savez(tmp_path, **arrays)
+    tmp_path.replace(path)
+    return path
+
+
+def load_sparse_dataset(path) -> Tuple['sparse.csr_matrix', List[str], Optional[np.ndarray]]:
+    """
+    Load a dataset written by save_sparse_dataset.
+
+    Returns:
+    --------
+    Tuple[scipy.sparse.csr_matrix, List[str], Optional[np.ndarray]] : Features, feature names, target (None if not saved)
+    """
+    from scipy import sparse
+
+    with np.load(path) as f:
+        X = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+        return X, f['feature_names'].tolist(), f['target'] if 'target' in f.files else None
@@ -4,12 +4,151 @@ Data preprocessing functions for Credit Scoring project
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Any
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, LabelEncoder, OneHotEncoder
-from sklearn.impute import SimpleImputer
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Tuple, Dict, Any, Union
+from pandas.api.types import is_numeric_dtype
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from ingestion import iter_chunks, STREAM_CHUNK_ROWS
+    from sketches import QuantileSketch, RunningMoments, BinnedSums
+    from privacy import pseudonymize, resolve_key, PIISample, pii_findings, PII_SAMPLE_ROWS
+    from preprocessing_artifact import PreprocessingArtifact, STEP_TRANSFORMS, DEFAULT_INTEREST_RATE, prepare_step
+except ImportError:
+    from src.ingestion import iter_chunks, STREAM_CHUNK_ROWS
+    from src.sketches import QuantileSketch, RunningMoments, BinnedSums
+    from src.privacy import pseudonymize, resolve_key, PIISample, pii_findings, PII_SAMPLE_ROWS
+    from src.preprocessing_artifact import (PreprocessingArtifact, STEP_TRANSFORMS, DEFAULT_INTEREST_RATE,
+                                            prepare_step)
+
+# Columns each credit feature is computed from (see create_credit_features)
+CREDIT_FEATURE_INPUTS = {
+    'debt_to_income_ratio': ['existing_debt', 'annual_income'],
+    'loan_to_income_ratio': ['loan_amount', 'annual_income'],
+    'interest_rate': ['loan_amount'],
+    'monthly_payment': ['loan_amount', 'loan_term_months', 'interest_rate'],
+    'payment_to_income_ratio': ['monthly_payment', 'annual_income'],
+}
+
+
+def _plain(value):
+    """NumPy scalar -> Python scalar, so learned state is JSON-serialisable"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+UNKNOWN_CODE = -1
+
+
+class CategoricalEncoder:
+    """
+    Label and one-hot encoding against vocabularies frozen at fit time.
+    
+    fit() records each column's categories (sorted, missing values excluded)
+    as a {category: code} dict. Encoding is one vectorized hash lookup per
+    column (Index.get_indexer) rather than LabelEncoder's astype(str) copy
+    and binary search; columns that are already pd.Categorical only have
+    their categories looked up and are then mapped by integer codes.
+    Categories not seen in fit, and missing values, get the reserved
+    UNKNOWN_CODE instead of raising.
+    
+    one_hot() returns a SciPy CSR matrix whose column layout is fixed by the
+    vocabularies (see feature_names()), so every batch has the same columns;
+    an unknown value sets no column in its block.
+    
+    Parameters:
+    -----------
+    columns : List[str]
+        Columns to encode (default: the object/category/string columns seen in fit)
+    drop_first : bool
+        Leave each column's first category out of one_hot(), as pd.get_dummies(drop_first=True)
+    """
+    
+    def __init__(self, columns: List[str] = None, drop_first: bool = False):
+        self.columns = columns
+        self.drop_first = drop_first
+        self.vocabularies = {}
+        self._categories = {}
+    
+    def fit(self, df: pd.DataFrame) -> 'CategoricalEncoder':
+        columns = self.columns
+        if columns is None:
+            columns = df.select_dtypes(include=['object', 'category', 'string']).columns
+        for col in columns:
+            if col not in df.columns:
+                continue
+            _, categories = pd.factorize(df[col], sort=True)
+            categories = pd.Index(np.asarray(categories))
+            self._categories[col] = categories
+            self.vocabularies[col] = {category: code for code, category in enumerate(categories)}
+        return self
+    
+    def categories(self, col: str) -> List[Any]:
+        """Fitted categories of col, in code order"""
+        return list(self._categories[col])
+    
+    def codes(self, values: pd.Series, col: str) -> np.ndarray:
+        """Integer codes of values against col's vocabulary (UNKNOWN_CODE for unseen/missing)"""
+        categories = self._categories[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Look up the (few) input categories, then map the codes
+            mapping = np.append(categories.get_indexer(values.cat.categories), UNKNOWN_CODE)
+            return mapping[values.cat.codes.to_numpy()].astype(np.int64)
+        return categories.get_indexer(values).astype(np.int64)
+    
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Integer codes for every fitted column present in df"""
+        return pd.DataFrame({col: self.codes(df[col], col) for col in self.vocabularies if col in df.columns},
+                            index=df.index)
+    
+    def feature_names(self) -> List[str]:
+        """Column names of one_hot(), in order"""
+        start = 1 if self.drop_first else 0
+        return [f'{col}_{category}' for col, categories in self._categories.items()
+                for category in categories[start:]]
+    
+    def one_hot(self, df: pd.DataFrame, dtype=np.float64):
+        """
+        One-hot encode all fitted columns as a CSR matrix.
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Data with every fitted column
+        dtype : numpy dtype
+            Dtype of the stored ones
+        
+        Returns:
+        --------
+        scipy.sparse.csr_matrix : (len(df), len(feature_names())) indicator matrix
+        """
+        from scipy import sparse
+        
+        start = 1 if self.drop_first else 0
+        offset = 0
+        blocks = []
+        for col, categories in self._categories.items():
+            codes = self.codes(df[col], col) - start
+            blocks.append(np.where(codes >= 0, codes + offset, -1))
+            offset += len(categories) - start
+        if not blocks:
+            return sparse.csr_matrix((len(df), 0), dtype=dtype)
+        # Row-major (n_rows, n_columns) column indices; offsets increase, so each row's are sorted
+        idx = np.column_stack(blocks)
+        present = idx >= 0
+        index_dtype = np.int32 if max(offset, present.size) < 2**31 else np.int64
+        indptr = np.zeros(len(df) + 1, dtype=index_dtype)
+        np.cumsum(present.sum(axis=1), out=indptr[1:])
+        indices = idx[present].astype(index_dtype)
+        return sparse.csr_matrix((np.ones(len(indices), dtype=dtype), indices, indptr), shape=(len(df), offset))
+
 
 class DataPreprocessor:
     """
@@ -20,9 +159,13 @@ class DataPreprocessor:
         self.label_encoders = {}
         self.scaler = None
         self.imputers = {}
+        self.outlier_bounds = {}
         self.feature_names = []
+        self.artifact = None
+        self.sparse_encoder = None
         
-    def handle_missing_values(self, df: pd.DataFrame, strategy: Dict[str, str] = None) -> pd.DataFrame:
+    def handle_missing_values(self, df: pd.DataFrame, strategy: Dict[str, str] = None,
+                              inplace: bool = False) -> pd.DataFrame:
         """
         Handle missing values with specified strategies.
         
@@ -33,45 +176,59 @@ class DataPreprocessor:
         strategy : Dict[str, str]
             Dictionary mapping column names to imputation strategies
             ('mean', 'median', 'mode', 'ffill', 'bfill', or specific value)
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
         
         Returns:
         --------
         pd.DataFrame : DataFrame with imputed values
         """
-        df_clean = df.copy()
+        df_clean = df if inplace else df.copy()
+        has_missing = df_clean.isnull().any()
         
         if strategy is None:
-            # Default strategy: mean for numerical, mode for categorical
+            # Default strategy: median for numerical, mode for categorical
             numerical_cols = df_clean.select_dtypes(include=[np.number]).columns
             categorical_cols = df_clean.select_dtypes(include=['object', 'category']).columns
-            
-            for col in numerical_cols:
-                if df_clean[col].isnull().any():
-                    df_clean[col].fillna(df_clean[col].median(), inplace=True)
-            
-            for col in categorical_cols:
-                if df_clean[col].isnull().any():
-                    df_clean[col].fillna(df_clean[col].mode()[0] if not df_clean[col].mode().empty else 'Unknown', inplace=True)
-        else:
-            for col, strat in strategy.items():
-                if col in df_clean.columns and df_clean[col].isnull().any():
-                    if strat == 'mean':
-                        df_clean[col].fillna(df_clean[col].mean(), inplace=True)
-                    elif strat == 'median':
-                        df_clean[col].fillna(df_clean[col].median(), inplace=True)
-                    elif strat == 'mode':
-                        df_clean[col].fillna(df_clean[col].mode()[0] if not df_clean[col].mode().empty else 'Unknown', inplace=True)
-                    elif strat == 'ffill':
-                        df_clean[col].fillna(method='ffill', inplace=True)
-                    elif strat == 'bfill':
-                        df_clean[col].fillna(method='bfill', inplace=True)
-                    else:
-                        df_clean[col].fillna(strat, inplace=True)
+            strategy = {**{col: 'median' for col in numerical_cols}, **{col: 'mode' for col in categorical_cols}}
+        
+        by_strategy = {}
+        for col, strat in strategy.items():
+            if col in df_clean.columns and has_missing[col]:
+                by_strategy.setdefault(strat, []).append(col)
+        
+        # One statistics call per strategy over all of its columns, then a single fill
+        fill_values = {}
+        for strat, cols in by_strategy.items():
+            if strat == 'mean':
+                fill_values.update(df_clean[cols].mean().to_dict())
+            elif strat == 'median':
+                fill_values.update(df_clean[cols].median().to_dict())
+            elif strat == 'mode':
+                fill_values.update({col: self._mode(df_clean[col]) for col in cols})
+            elif strat == 'ffill':
+                df_clean[cols] = df_clean[cols].ffill()
+            elif strat == 'bfill':
+                df_clean[cols] = df_clean[cols].bfill()
+            else:
+                fill_values.update({col: strat for col in cols})
+        if fill_values:
+            df_clean.fillna(fill_values, inplace=True)
         
         return df_clean
     
+    @staticmethod
+    def _mode(series: pd.Series):
+        """Most frequent value from one value_counts pass (Series.mode()[0] semantics), or 'Unknown'"""
+        counts = series.value_counts(dropna=True)
+        if counts.empty or counts.iloc[0] == 0:
+            return 'Unknown'
+        ties = counts.index[counts.to_numpy() == counts.iloc[0]]
+        # mode() returns ties sorted; only sort when there is a tie
+        return ties[0] if len(ties) == 1 else series.mode()[0]
+    
     def handle_outliers(self, df: pd.DataFrame, columns: List[str], method: str = 'iqr', 
-                       action: str = 'cap', multiplier: float = 1.5) -> pd.DataFrame:
+                       action: str = 'cap', multiplier: float = 1.5, inplace: bool = False) -> pd.DataFrame:
         """
         Handle outliers in specified columns.
         
@@ -87,44 +244,71 @@ class DataPreprocessor:
             Action to take ('cap', 'remove', or 'flag')
         multiplier : float
             Multiplier for IQR method
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned); action='remove'
+            still returns a new, filtered frame
         
         Returns:
         --------
         pd.DataFrame : DataFrame with handled outliers
         """
-        df_clean = df.copy()
+        df_clean = df if inplace else df.copy()
+        numeric = [col for col in columns
+                   if col in df_clean.columns and df_clean[col].dtype in [np.int64, np.float64]]
+        if not numeric or method not in ('iqr', 'zscore'):
+            return df_clean
         
-        for col in columns:
-            if col not in df_clean.columns or df_clean[col].dtype not in [np.int64, np.float64]:
-                continue
-            
-            if method == 'iqr':
-                Q1 = df_clean[col].quantile(0.25)
-                Q3 = df_clean[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - multiplier * IQR
-                upper_bound = Q3 + multiplier * IQR
-            elif method == 'zscore':
-                mean = df_clean[col].mean()
-                std = df_clean[col].std()
-                lower_bound = mean - 3 * std
-                upper_bound = mean + 3 * std
-            else:
-                continue
-            
-            if action == 'cap':
-                df_clean[col] = df_clean[col].clip(lower=lower_bound, upper=upper_bound)
-            elif action == 'remove':
-                df_clean = df_clean[(df_clean[col] >= lower_bound) & (df_clean[col] <= upper_bound)]
-            elif action == 'flag':
-                df_clean[f'{col}_is_outlier'] = ((df_clean[col] < lower_bound) | (df_clean[col] > upper_bound)).astype(int)
+        if action == 'remove':
+            # Rows are dropped column by column, so each column's bounds
+            # come from the rows that survived the previous columns
+            for col in numeric:
+                lower_bound, upper_bound = self._outlier_bounds(df_clean[[col]], method, multiplier)
+                df_clean = df_clean[(df_clean[col] >= lower_bound[col]) & (df_clean[col] <= upper_bound[col])]
+            return df_clean
+        
+        # Bounds for all columns from one vectorized statistics call
+        block = df_clean[numeric]
+        lower_bound, upper_bound = self._outlier_bounds(block, method, multiplier)
+        
+        if action == 'cap':
+            # One np.clip over the float block (DataFrame.clip with per-column bounds is ~4x slower);
+            # int64 columns keep Series.clip, which stays int64 unless a fractional bound is applied
+            floats = [col for col in numeric if block[col].dtype == np.float64]
+            if floats:
+                df_clean[floats] = np.clip(block[floats].to_numpy(), lower_bound[floats].to_numpy(),
+                                           upper_bound[floats].to_numpy())
+            for col in numeric:
+                if col not in floats:
+                    df_clean[col] = block[col].clip(lower=lower_bound[col], upper=upper_bound[col])
+        elif action == 'flag':
+            flags = (block.lt(lower_bound, axis=1) | block.gt(upper_bound, axis=1)).astype(int)
+            for col in numeric:
+                df_clean[f'{col}_is_outlier'] = flags[col]
         
         return df_clean
     
-    def encode_categorical(self, df: pd.DataFrame, columns: List[str], method: str = 'label') -> pd.DataFrame:
+    @staticmethod
+    def _outlier_bounds(block: pd.DataFrame, method: str, multiplier: float) -> Tuple[pd.Series, pd.Series]:
+        """Per-column (lower, upper) outlier bounds of a numeric block"""
+        if method == 'iqr':
+            quartiles = block.quantile([0.25, 0.75])
+            Q1, Q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+            IQR = Q3 - Q1
+            return Q1 - multiplier * IQR, Q3 + multiplier * IQR
+        mean = block.mean()
+        std = block.std()
+        return mean - 3 * std, mean + 3 * std
+    
+    def encode_categorical(self, df: pd.DataFrame, columns: List[str], method: str = 'label',
+                           suffix: str = '', inplace: bool = False) -> pd.DataFrame:
         """
         Encode categorical variables.
         
+        Each column's vocabulary is learned on the first call (see
+        CategoricalEncoder) and reused afterwards, so later batches get the
+        same codes and one-hot columns; unseen or missing values are coded
+        UNKNOWN_CODE (label) or set no one-hot column.
+        
         Parameters:
         -----------
         df : pd.DataFrame
@@ -133,32 +317,41 @@ class DataPreprocessor:
             Columns to encode
         method : str
             Encoding method ('label' or 'onehot')
+        suffix : str
+            Label method only: write the codes to f'{col}{suffix}' and keep the
+            original column (e.g. '_encoded'); by default col is replaced
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
         
         Returns:
         --------
         pd.DataFrame : DataFrame with encoded variables
         """
-        df_encoded = df.copy()
+        df_encoded = df if inplace else df.copy()
         
         for col in columns:
             if col not in df_encoded.columns:
                 continue
             
+            # The vocabulary is frozen on the first call; later batches are encoded against it
+            if col not in self.label_encoders:
+                self.label_encoders[col] = CategoricalEncoder([col]).fit(df_encoded)
+            codes = self.label_encoders[col].codes(df_encoded[col], col)
+            
             if method == 'label':
-                if col not in self.label_encoders:
-                    self.label_encoders[col] = LabelEncoder()
-                    df_encoded[col] = self.label_encoders[col].fit_transform(df_encoded[col].astype(str))
-                else:
-                    df_encoded[col] = self.label_encoders[col].transform(df_encoded[col].astype(str))
+                df_encoded[col + suffix] = codes
             
             elif method == 'onehot':
-                dummies = pd.get_dummies(df_encoded[col], prefix=col, drop_first=True)
-                df_encoded = pd.concat([df_encoded, dummies], axis=1)
-                df_encoded.drop(col, axis=1, inplace=True)
+                # Fixed columns (the vocabulary minus its first category, as get_dummies(drop_first=True)),
+                # assigned column-wise instead of concat, which would copy the whole frame
+                for code, category in enumerate(self.label_encoders[col].categories(col)[1:], start=1):
+                    df_encoded[f'{col}_{category}'] = codes == code
+                del df_encoded[col]
         
         return df_encoded
     
-    def scale_features(self, df: pd.DataFrame, columns: List[str], method: str = 'standard') -> pd.DataFrame:
+    def scale_features(self, df: pd.DataFrame, columns: List[str], method: str = 'standard',
+                       inplace: bool = False) -> pd.DataFrame:
         """
         Scale numerical features.
         
@@ -170,12 +363,14 @@ class DataPreprocessor:
             Columns to scale
         method : str
             Scaling method ('standard' or 'minmax')
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
         
         Returns:
         --------
         pd.DataFrame : DataFrame with scaled features
         """
-        df_scaled = df.copy()
+        df_scaled = df if inplace else df.copy()
         
         if method == 'standard':
             if self.scaler is None:
@@ -193,7 +388,8 @@ class DataPreprocessor:
         
         return df_scaled
     
-    def create_interaction_features(self, df: pd.DataFrame, feature_pairs: List[Tuple[str, str]]) -> pd.DataFrame:
+    def create_interaction_features(self, df: pd.DataFrame, feature_pairs: List[Tuple[str, str]],
+                                    inplace: bool = False) -> pd.DataFrame:
         """
         Create interaction features from pairs of columns.
         
@@ -203,12 +399,14 @@ class DataPreprocessor:
             Input dataframe
         feature_pairs : List[Tuple[str, str]]
             List of feature pairs to create interactions
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
         
         Returns:
         --------
         pd.DataFrame : DataFrame with interaction features
         """
-        df_features = df.copy()
+        df_features = df if inplace else df.copy()
         
         for col1, col2 in feature_pairs:
             if col1 in df_features.columns and col2 in df_features.columns:
@@ -218,7 +416,8 @@ class DataPreprocessor:
         
         return df_features
     
-    def create_polynomial_features(self, df: pd.DataFrame, columns: List[str], degree: int = 2) -> pd.DataFrame:
+    def create_polynomial_features(self, df: pd.DataFrame, columns: List[str], degree: int = 2,
+                                   inplace: bool = False) -> pd.DataFrame:
         """
         Create polynomial features.
         
@@ -230,12 +429,14 @@ class DataPreprocessor:
             Columns to create polynomial features
         degree : int
             Polynomial degree
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
         
         Returns:
         --------
         pd.DataFrame : DataFrame with polynomial features
         """
-        df_poly = df.copy()
+        df_poly = df if inplace else df.copy()
         
         for col in columns:
             if col in df_poly.columns and df_poly[col].dtype in [np.int64, np.float64]:
@@ -244,7 +445,8 @@ class DataPreprocessor:
         
         return df_poly
     
-    def create_binned_features(self, df: pd.DataFrame, column: str, bins: int = 5, labels: List[str] = None) -> pd.DataFrame:
+    def create_binned_features(self, df: pd.DataFrame, column: str, bins: int = 5, labels: List[str] = None,
+                               inplace: bool = False) -> pd.DataFrame:
         """
         Create binned categorical features from continuous variables.
         
@@ -258,12 +460,14 @@ class DataPreprocessor:
             Number of bins
         labels : List[str]
             Custom labels for bins
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
         
         Returns:
         --------
         pd.DataFrame : DataFrame with binned feature
         """
-        df_binned = df.copy()
+        df_binned = df if inplace else df.copy()
         
         if column in df_binned.columns and df_binned[column].dtype in [np.int64, np.float64]:
             if labels is None:
@@ -272,41 +476,600 @@ class DataPreprocessor:
             df_binned[f'{column}_binned'] = pd.cut(df_binned[column], bins=bins, labels=labels)
         
         return df_binned
+    
+    def create_credit_features(self, df: pd.DataFrame, interest_rate: float = None,
+                               inplace: bool = False) -> pd.DataFrame:
+        """
+        Create affordability features: debt/loan-to-income ratios, interest rate,
+        amortised monthly payment and payment-to-income ratio.
+        
+        Each feature is created only when its input columns exist and df does
+        not already have it: engineered columns are never overwritten. An
+        existing interest_rate column has its gaps filled with its median;
+        without one, the column is created with that rate.
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Input dataframe
+        interest_rate : float
+            Annual rate (%) to fill or create interest_rate with; defaults to
+            the median of df's interest_rate, else DEFAULT_INTEREST_RATE
+        inplace : bool
+            Modify df itself instead of a copy (df is also returned)
+        
+        Returns:
+        --------
+        pd.DataFrame : DataFrame with credit features
+        """
+        df_features = df if inplace else df.copy()
+        state = self._fit_create_credit_features(df_features, interest_rate)
+        if state is not None:
+            # The artifact's expressions work on DataFrame columns as well as arrays
+            STEP_TRANSFORMS['create_credit_features'](df_features, state, False)
+        return df_features
+    
+    def fit(self, df: pd.DataFrame, steps: List[Tuple[str, Dict[str, Any]]]) -> 'DataPreprocessor':
+        """
+        Learn the state of a declared list of steps for replay with transform().
+        
+        Steps are fitted in order, each on the output of the previous ones,
+        and stored in self.artifact (see PreprocessingArtifact), which
+        save_state() writes for the serving API. Row-dependent options that
+        cannot be replayed on new data (ffill/bfill imputation, outlier
+        action='remove') raise ValueError.
+        
+        transform() differs from calling the step methods directly in that
+        all numeric columns come out as float64, one-hot columns are 0/1
+        floats and binned labels are plain objects rather than a Categorical.
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Training data
+        steps : List[Tuple[str, Dict[str, Any]]]
+            (DataPreprocessor method name, keyword arguments) pairs, as in
+            PreprocessingPipeline (without inplace)
+        
+        Returns:
+        --------
+        DataPreprocessor : self, fitted
+        """
+        self._fit(df, steps)
+        return self
+    
+    def fit_transform(self, df: pd.DataFrame, steps: List[Tuple[str, Dict[str, Any]]]) -> pd.DataFrame:
+        """fit(df, steps), returning transform(df) from the same pass"""
+        return pd.DataFrame(self._fit(df, steps), index=df.index)
+    
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the steps learned by fit() to new data"""
+        if self.artifact is None:
+            raise ValueError("DataPreprocessor is not fitted; call fit(df, steps) or load_state(path) first")
+        return pd.DataFrame(self.artifact.transform_columns(self._columns(df)), index=df.index)
+    
+    def fit_transform_sparse(self, df: pd.DataFrame, steps: List[Tuple[str, Dict[str, Any]]],
+                             onehot_columns: List[str]) -> Tuple['sparse.csr_matrix', List[str]]:
+        """
+        fit_transform into a SciPy CSR feature matrix, one-hot encoding wide categoricals sparsely.
+        
+        The steps run as in fit_transform. Each of onehot_columns is then
+        one-hot encoded (drop_first, as the 'onehot' method) straight into
+        CSR instead of one dense 0/1 column per category, and stacked after
+        the float64 columns; other non-numeric columns are left out. The
+        encoding is appended to self.artifact, so transform() and the
+        serving API produce the same columns densely.
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Training data
+        steps : List[Tuple[str, Dict[str, Any]]]
+            Steps as in fit()
+        onehot_columns : List[str]
+            Categorical columns to one-hot encode sparsely
+        
+        Returns:
+        --------
+        Tuple[scipy.sparse.csr_matrix, List[str]] : Feature matrix and its column names
+        """
+        data = self._fit(df, steps)
+        onehot = [col for col in onehot_columns if col in data]
+        self.sparse_encoder = CategoricalEncoder(onehot, drop_first=True).fit(
+            pd.DataFrame({col: data[col] for col in onehot}))
+        categories = {col: [_plain(v) for v in self.sparse_encoder.categories(col)] for col in onehot}
+        self.artifact.steps.append(prepare_step({'step': 'encode_categorical', 'state': {
+            'method': 'onehot', 'drop_first': True, 'categories': categories}}))
+        return self._sparse_features(data)
+    
+    def transform_sparse(self, df: pd.DataFrame) -> 'sparse.csr_matrix':
+        """The CSR features of fit_transform_sparse for new data"""
+        if self.sparse_encoder is None:
+            raise ValueError("DataPreprocessor has no sparse encoding; call fit_transform_sparse first")
+        # Every step but the final one-hot, which one_hot() does sparsely
+        data = self._columns(df)
+        for s in self.artifact.steps[:-1]:
+            STEP_TRANSFORMS[s['step']](data, s['state'], False)
+        return self._sparse_features(data)[0]
+    
+    def _sparse_features(self, data):
+        from scipy import sparse
+        
+        encoded = list(self.sparse_encoder.vocabularies)
+        numeric = [col for col, values in data.items() if values.dtype.kind == 'f' and col not in encoded]
+        n_rows = len(next(iter(data.values())))
+        dense = sparse.csr_matrix(np.column_stack([data[col] for col in numeric]) if numeric
+                                  else np.empty((n_rows, 0)))
+        onehot = self.sparse_encoder.one_hot(pd.DataFrame({col: data[col] for col in encoded},
+                                                          index=pd.RangeIndex(n_rows)))
+        return sparse.hstack([dense, onehot], format='csr'), numeric + self.sparse_encoder.feature_names()
+    
+    def save_state(self, path: Union[str, Path]) -> Path:
+        """Write the fitted state as a compact JSON artifact (see PreprocessingArtifact)"""
+        if self.artifact is None:
+            raise ValueError("DataPreprocessor is not fitted; nothing to save")
+        return self.artifact.save(path)
+    
+    @classmethod
+    def load_state(cls, path: Union[str, Path]) -> 'DataPreprocessor':
+        """DataPreprocessor whose transform() replays a saved artifact"""
+        preprocessor = cls()
+        preprocessor.artifact = PreprocessingArtifact.load(path)
+        return preprocessor
+    
+    def _fit(self, df, steps):
+        unknown = [name for name, _ in steps if name not in STEP_TRANSFORMS]
+        if unknown:
+            raise ValueError(f"Steps without a fittable state: {unknown}")
+        data = self._columns(df)
+        fitted = []
+        for name, kwargs in steps:
+            state = getattr(self, f'_fit_{name}')(data, **kwargs)
+            if state is None:
+                # Nothing to do on this data (e.g. its columns are absent)
+                continue
+            step = prepare_step({'step': name, 'state': state})
+            STEP_TRANSFORMS[name](data, step['state'], False)
+            fitted.append(step)
+        self.artifact = PreprocessingArtifact(fitted)
+        return data
+    
+    @staticmethod
+    def _columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Columnar arrays as PreprocessingArtifact takes them: float64 with NaN, else object with None"""
+        return {col: df[col].to_numpy(dtype=np.float64, na_value=np.nan) if is_numeric_dtype(df[col])
+                else df[col].to_numpy(dtype=object, na_value=None)
+                for col in df.columns}
+    
+    def _fit_handle_missing_values(self, data, strategy=None):
+        if strategy is None:
+            strategy = {col: 'median' if values.dtype.kind == 'f' else 'mode' for col, values in data.items()}
+        by_strategy = {}
+        for col, strat in strategy.items():
+            if col in data:
+                by_strategy.setdefault(strat, []).append(col)
+        fill_values = {}
+        for strat, cols in by_strategy.items():
+            if strat in ('ffill', 'bfill'):
+                raise ValueError(f"'{strat}' imputation depends on row order and cannot be fitted")
+            if strat in ('mean', 'median'):
+                fill_values.update(getattr(pd.DataFrame({col: data[col] for col in cols}), strat)().to_dict())
+            elif strat == 'mode':
+                fill_values.update({col: self._mode(pd.Series(data[col])) for col in cols})
+            else:
+                fill_values.update({col: strat for col in cols})
+        return {'fill_values': {col: _plain(value) for col, value in fill_values.items()}}
+    
+    def _fit_handle_outliers(self, data, columns, method='iqr', action='cap', multiplier=1.5):
+        if action == 'remove':
+            raise ValueError("action='remove' drops rows and cannot be replayed on new data; use 'cap' or 'flag'")
+        numeric = [col for col in columns if col in data and data[col].dtype.kind == 'f']
+        if not numeric or method not in ('iqr', 'zscore'):
+            return None
+        lower, upper = self._outlier_bounds(pd.DataFrame({col: data[col] for col in numeric}), method, multiplier)
+        return {'action': action, 'bounds': {col: [float(lower[col]), float(upper[col])] for col in numeric}}
+    
+    def _fit_encode_categorical(self, data, columns, method='label', suffix=''):
+        present = [col for col in columns if col in data]
+        if not present:
+            return None
+        encoder = CategoricalEncoder(present).fit(pd.DataFrame({col: data[col] for col in present}))
+        categories = {col: [_plain(v) for v in encoder.categories(col)] for col in present}
+        if method == 'label':
+            return {'method': 'label', 'suffix': suffix, 'unknown': UNKNOWN_CODE, 'vocabularies': categories}
+        # drop_first, as encode_categorical's get_dummies
+        return {'method': 'onehot', 'drop_first': True, 'categories': categories}
+    
+    def _fit_scale_features(self, data, columns, method='standard'):
+        present = [col for col in columns if col in data]
+        if not present:
+            return None
+        # A DataFrame block, as scale_features passes, so the sums run in the same order
+        block = pd.DataFrame({col: data[col] for col in present})
+        if method == 'standard':
+            scaler = StandardScaler().fit(block)
+            return {'method': method, 'columns': present, 'mean': scaler.mean_.tolist(), 'scale': scaler.scale_.tolist()}
+        if method == 'minmax':
+            scaler = MinMaxScaler().fit(block)
+            return {'method': method, 'columns': present, 'min': scaler.min_.tolist(), 'scale': scaler.scale_.tolist()}
+        raise ValueError(f"Unknown scaling method: {method}")
+    
+    def _fit_create_interaction_features(self, data, feature_pairs):
+        pairs = [[col1, col2] for col1, col2 in feature_pairs
+                 if col1 in data and col2 in data and data[col1].dtype.kind == 'f' and data[col2].dtype.kind == 'f']
+        return {'pairs': pairs} if pairs else None
+    
+    def _fit_create_polynomial_features(self, data, columns, degree=2):
+        numeric = [col for col in columns if col in data and data[col].dtype.kind == 'f']
+        return {'columns': numeric, 'degree': degree} if numeric else None
+    
+    def _fit_create_binned_features(self, data, column, bins=5, labels=None):
+        if column not in data or data[column].dtype.kind != 'f':
+            return None
+        _, edges = pd.cut(pd.Series(data[column]), bins=bins, retbins=True)
+        if labels is None:
+            labels = [f'{column}_bin_{i}' for i in range(len(edges) - 1)]
+        return {'column': column, 'edges': edges.tolist(), 'labels': list(labels)}
+    
+    def _fit_create_credit_features(self, data, interest_rate=None):
+        features = []
+        for feature, inputs in CREDIT_FEATURE_INPUTS.items():
+            # interest_rate is only gap-filled, which keeps existing values
+            if feature in data and feature != 'interest_rate':
+                continue
+            if all(col in data or col in features for col in inputs):
+                features.append(feature)
+        if not features:
+            return None
+        if interest_rate is None:
+            rates = np.asarray(data['interest_rate'], dtype=np.float64) if 'interest_rate' in data else np.empty(0)
+            rates = rates[~np.isnan(rates)]
+            interest_rate = float(np.median(rates)) if len(rates) else DEFAULT_INTEREST_RATE
+        return {'interest_rate': float(interest_rate), 'features': features}
+    
+    def fit_stream(self, source, outlier_columns: List[str] = None, scale_columns: List[str] = None,
+                   multiplier: float = 1.5, chunksize: int = STREAM_CHUNK_ROWS,
+                   sketch_size: int = 4096) -> 'DataPreprocessor':
+        """
+        Fit imputation, IQR capping and standard scaling in one pass over chunks.
+        
+        Equivalent to handle_missing_values(df) (median/mode defaults), then
+        handle_outliers(df, outlier_columns, 'iqr', 'cap', multiplier), then
+        scale_features(df, scale_columns, 'standard'), without holding df in
+        memory. Memory is bounded by the number of columns and category
+        cardinality, not rows.
+        
+        Tolerance vs the in-memory path: modes are exact. Medians and IQR
+        bounds come from QuantileSketch and are exact while a column has at
+        most sketch_size values, otherwise within the sketch's rank error
+        (worst case log2(n/k)/k of n). Scaler means/stds are exact Welford
+        moments of the imputed data; for capped columns the capping
+        correction is exact except within the value bins holding the two
+        bounds (see RunningMoments.clipped), so their error is well below
+        the bounds' own. With the default sketch_size on 0.25M-16M rows
+        (benchmarks/bench_streaming_preprocessor.py) standardised outputs
+        stay within 2e-3 standard deviations of the in-memory path.
+        
+        Parameters:
+        -----------
+        source : path, DataFrame or iterable of DataFrames
+            Training data (see iter_chunks); an iterable can only be consumed once
+        outlier_columns : List[str]
+            Columns to cap at the IQR bounds
+        scale_columns : List[str]
+            Columns to standardise after imputation and capping
+        multiplier : float
+            Multiplier for IQR method
+        chunksize : int
+            Rows per chunk when reading a path
+        sketch_size : int
+            QuantileSketch capacity k per column
+        
+        Returns:
+        --------
+        DataPreprocessor : self, fitted
+        """
+        outlier_columns = outlier_columns or []
+        scale_columns = scale_columns or []
+        numerical_cols = categorical_cols = None
+        
+        for chunk in iter_chunks(source, chunksize):
+            if numerical_cols is None:
+                numerical_cols = list(chunk.select_dtypes(include=[np.number]).columns)
+                categorical_cols = list(chunk.select_dtypes(include=['object', 'category', 'string']).columns)
+                # handle_outliers only touches int64/float64 columns
+                outlier_columns = [c for c in outlier_columns if c in chunk.columns
+                                   and chunk[c].dtype in [np.int64, np.float64]]
+                sketches = {col: QuantileSketch(k=sketch_size) for col in numerical_cols}
+                moments = {col: RunningMoments() for col in scale_columns}
+                # Exact per-bin sums for scaled columns that are also capped (see RunningMoments.clipped)
+                bins = {col: BinnedSums.from_sample(chunk[col].to_numpy(dtype=np.float64, na_value=np.nan))
+                        for col in scale_columns if col in outlier_columns}
+                missing = Counter()
+                counts = {col: Counter() for col in categorical_cols}
+            
+            for col in numerical_cols:
+                values = chunk[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                sketches[col].update(values)
+                if col in moments:
+                    moments[col].update(values)
+                if col in bins:
+                    bins[col].update(values)
+                missing[col] += int(np.isnan(values).sum())
+            for col in categorical_cols:
+                counts[col].update(chunk[col].value_counts(dropna=True).to_dict())
+                missing[col] += int(chunk[col].isna().sum())
+        
+        if numerical_cols is None:
+            raise ValueError("fit_stream received no data")
+        
+        # Imputation values; imputed rows then take part in the IQR and scaler statistics
+        for col in numerical_cols:
+            if missing[col]:
+                median = float(sketches[col].quantile(0.5))
+                self.imputers[col] = median
+                sketches[col].add(median, missing[col])
+                if col in moments:
+                    moments[col].add(median, missing[col])
+                if col in bins:
+                    bins[col].add(median, missing[col])
+        for col in categorical_cols:
+            if missing[col]:
+                # Most frequent, smallest value on ties (as Series.mode()[0])
+                self.imputers[col] = min(counts[col].items(), key=lambda kv: (-kv[1], kv[0]))[0] \
+                    if counts[col] else 'Unknown'
+        
+        for col in outlier_columns:
+            q1, q3 = sketches[col].quantile([0.25, 0.75])
+            iqr = q3 - q1
+            self.outlier_bounds[col] = (q1 - multiplier * iqr, q3 + multiplier * iqr)
+            if col in moments:
+                moments[col] = moments[col].clipped(sketches[col], *self.outlier_bounds[col], bins=bins.get(col))
+        
+        if scale_columns:
+            self.scaler = StandardScaler()
+            var = np.array([moments[col].var for col in scale_columns])
+            self.scaler.mean_ = np.array([moments[col].mean for col in scale_columns])
+            self.scaler.var_ = var
+            self.scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+            self.scaler.n_samples_seen_ = moments[scale_columns[0]].n
+            self.scaler.n_features_in_ = len(scale_columns)
+            self.scaler.feature_names_in_ = np.array(scale_columns, dtype=object)
+        self.feature_names = scale_columns
+        
+        # The same state as a replayable artifact, so save_state() works after fit_stream too
+        steps = [{'step': 'handle_missing_values',
+                  'state': {'fill_values': {col: _plain(value) for col, value in self.imputers.items()}}}]
+        if self.outlier_bounds:
+            steps.append({'step': 'handle_outliers', 'state': {
+                'action': 'cap', 'bounds': {col: [float(lo), float(hi)] for col, (lo, hi) in self.outlier_bounds.items()}}})
+        if scale_columns:
+            steps.append({'step': 'scale_features', 'state': {
+                'method': 'standard', 'columns': list(scale_columns),
+                'mean': self.scaler.mean_.tolist(), 'scale': self.scaler.scale_.tolist()}})
+        self.artifact = PreprocessingArtifact(steps)
+        return self
+    
+    def transform_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Apply the state learned by fit_stream to one chunk"""
+        chunk = chunk.fillna({col: value for col, value in self.imputers.items() if col in chunk.columns})
+        for col, (lower, upper) in self.outlier_bounds.items():
+            chunk[col] = chunk[col].clip(lower=lower, upper=upper)
+        if self.scaler is not None and self.feature_names:
+            chunk[self.feature_names] = self.scaler.transform(chunk[self.feature_names])
+        return chunk
+    
+    def transform_stream(self, source, output_path: Union[str, Path],
+                         chunksize: int = STREAM_CHUNK_ROWS) -> Path:
+        """
+        Transform chunk by chunk, appending each to a CSV or Parquet file.
+        
+        Parameters:
+        -----------
+        source : path, DataFrame or iterable of DataFrames
+            Data to transform (see iter_chunks)
+        output_path : str or Path
+            Output file; '.parquet' writes Parquet (needs pyarrow), anything else CSV
+        chunksize : int
+            Rows per chunk when reading a path
+        
+        Returns:
+        --------
+        Path : output_path
+        """
+        output_path = Path(output_path)
+        writer = None
+        first = True
+        try:
+            for chunk in iter_chunks(source, chunksize):
+                chunk = self.transform_chunk(chunk)
+                if output_path.suffix == '.parquet':
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+                first = False
+        finally:
+            if writer is not None:
+                writer.close()
+        return output_path
 
 
-def anonymize_data(df: pd.DataFrame, sensitive_columns: List[str]) -> pd.DataFrame:
+def current_rss_mb() -> float:
+    """
+    Resident set size of this process in MB.
+    
+    Read from /proc on Linux, else from psutil when installed, else peak RSS
+    from the Unix-only resource module; NaN where none is available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024**2
+    except (OSError, AttributeError, ValueError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024**2
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024**2 if sys.platform == 'darwin' else maxrss / 1024
+
+
+class _PeakRSS:
+    """Context manager sampling RSS on a background thread to catch a step's peak"""
+    
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+    
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+    
+    def __enter__(self):
+        self.before = self.peak = current_rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.after = current_rss_mb()
+        self.peak = max(self.peak, self.after)
+
+
+class PreprocessingPipeline:
+    """
+    Chain of DataPreprocessor steps sharing one working DataFrame.
+    
+    Each step runs with inplace=True on a single buffer owned by the
+    pipeline, instead of every step copying the frame, so peak memory is
+    about one frame plus the step's own temporaries. The seconds and
+    RSS (before, peak, after) of every step are kept in step_stats.
+    
+    Parameters:
+    -----------
+    steps : List[Tuple[str, Dict[str, Any]]]
+        (DataPreprocessor method name, keyword arguments) pairs, e.g.
+        ('handle_outliers', {'columns': ['annual_income'], 'action': 'cap'})
+    preprocessor : DataPreprocessor
+        Preprocessor holding the fitted encoders/scaler (a new one by default)
+    copy : bool
+        Copy the input once before the first step. With copy=False the
+        caller's frame is modified in place (use when it is not needed later)
+    copy_on_write : bool
+        Run under pandas copy-on-write, so the initial copy is lazy and only
+        the columns a step writes are materialised (pandas >= 2.0; always on
+        from pandas 3)
+    """
+    
+    STEPS = ('handle_missing_values', 'handle_outliers', 'encode_categorical', 'scale_features',
+             'create_interaction_features', 'create_polynomial_features', 'create_binned_features',
+             'create_credit_features')
+    
+    def __init__(self, steps: List[Tuple[str, Dict[str, Any]]], preprocessor: DataPreprocessor = None,
+                 copy: bool = True, copy_on_write: bool = False):
+        unknown = [name for name, _ in steps if name not in self.STEPS]
+        if unknown:
+            raise ValueError(f"Unknown pipeline steps: {unknown}")
+        self.steps = steps
+        self.preprocessor = preprocessor or DataPreprocessor()
+        self.copy = copy
+        self.copy_on_write = copy_on_write
+        self.step_stats = []
+    
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Run all steps on one working copy of df (or on df itself with copy=False)"""
+        cow = self.copy_on_write and int(pd.__version__.split('.')[0]) < 3
+        with pd.option_context('mode.copy_on_write', True) if cow else nullcontext():
+            self.step_stats = []
+            with _PeakRSS() as rss:
+                start = time.perf_counter()
+                work = df.copy() if self.copy else df
+                seconds = time.perf_counter() - start
+            self._record('copy input' if self.copy else 'take input', seconds, rss)
+            
+            for name, kwargs in self.steps:
+                with _PeakRSS() as rss:
+                    start = time.perf_counter()
+                    work = getattr(self.preprocessor, name)(work, **kwargs, inplace=True)
+                    seconds = time.perf_counter() - start
+                self._record(name, seconds, rss)
+        return work
+    
+    def _record(self, step, seconds, rss):
+        self.step_stats.append({
+            'step': step,
+            'seconds': seconds,
+            'rss_before_mb': rss.before,
+            'peak_rss_mb': rss.peak,
+            'rss_after_mb': rss.after,
+        })
+    
+    def report(self) -> pd.DataFrame:
+        """Per-step timing and RSS of the last run"""
+        return pd.DataFrame(self.step_stats)
+
+
+def anonymize_data(df: pd.DataFrame, sensitive_columns: List[str], key: Union[str, bytes] = None) -> pd.DataFrame:
     """
     Anonymize sensitive data for privacy compliance.
     
+    Each sensitive column is replaced by keyed 64-bit pseudonyms (see
+    privacy.pseudonymize): with the same key, a value maps to the same
+    pseudonym in every run, process and chunk, so anonymised extracts can
+    still be joined on them. Missing values stay missing.
+    
     Parameters:
     -----------
     df : pd.DataFrame
         Input dataframe
     sensitive_columns : List[str]
         Columns containing sensitive information
+    key : str or bytes
+        Secret pseudonymisation key (default: the PSEUDONYMIZATION_KEY
+        environment variable; one of them is required)
     
     Returns:
     --------
     pd.DataFrame : Anonymized dataframe
     """
+    key = resolve_key(key)
     df_anon = df.copy()
     
     for col in sensitive_columns:
         if col in df_anon.columns:
-            # Hash sensitive data
-            df_anon[col] = df_anon[col].apply(lambda x: hash(str(x)) % 1000000)
+            df_anon[col] = pseudonymize(df_anon[col], key)
     
     return df_anon
 
 
-def create_privacy_report(df: pd.DataFrame) -> Dict[str, Any]:
+def create_privacy_report(df: pd.DataFrame, sample_rows: int = PII_SAMPLE_ROWS) -> Dict[str, Any]:
     """
     Create data privacy compliance report.
     
+    Columns are flagged by name (PII keywords) and by content: a bounded
+    sample of each column's values is matched against e-mail, phone and
+    national ID patterns (see privacy.PIISample).
+    
     Parameters:
     -----------
     df : pd.DataFrame
         Input dataframe
+    sample_rows : int
+        Values sampled per column for the content scan
     
     Returns:
     --------
@@ -327,4 +1090,11 @@ def create_privacy_report(df: pd.DataFrame) -> Dict[str, Any]:
             report['potential_pii_columns'].append(col)
             report['anonymization_required'].append(col)
     
+    # Values that look like PII, whatever the column is called
+    report['pii_content'] = pii_findings(PIISample(sample_rows).update(df).scan())
+    for col in report['pii_content']:
+        if col not in report['potential_pii_columns']:
+            report['potential_pii_columns'].append(col)
+            report['anonymization_required'].append(col)
+    
     return report
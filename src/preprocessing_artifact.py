@@ -0,0 +1,302 @@
+"""
+Fitted DataPreprocessor state as a compact, pandas-free artifact
+
+DataPreprocessor.fit learns one state dict per declared step (fill values,
+outlier bounds, encoder vocabularies, scaler parameters, ...) and stores them
+in a PreprocessingArtifact. The artifact is saved as a small JSON file next to
+the model and replays the same transform with NumPy only: transform_columns
+over columnar arrays (training data, batch requests) and transform_row over
+Python scalars (single requests), with identical arithmetic so both paths,
+and DataPreprocessor.transform, agree bit for bit.
+"""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Annual rate (%) assumed for monthly_payment when training data has no interest_rate column
+DEFAULT_INTEREST_RATE = 12.0
+
+CREDIT_FEATURES = ['debt_to_income_ratio', 'loan_to_income_ratio', 'interest_rate',
+                   'monthly_payment', 'payment_to_income_ratio']
+
+# The transform the API hard-coded before models shipped with preprocessor.json;
+# used for model directories that predate it and for rule-based serving
+LEGACY_STEPS = [
+    {'step': 'create_credit_features',
+     'state': {'interest_rate': DEFAULT_INTEREST_RATE, 'features': CREDIT_FEATURES}},
+    {'step': 'encode_categorical',
+     'state': {'method': 'label', 'suffix': '_encoded', 'unknown': 0,
+               'vocabularies': {'employment_status': ['Employed', 'Self-Employed', 'Unemployed']}}},
+]
+
+
+def _isna(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == 'f':
+        return np.isnan(values)
+    return np.equal(values, None) | (values != values)
+
+
+@lru_cache(maxsize=4096)
+def _scalar_power(base, exponent):
+    return float((np.array([base], dtype=np.float64) ** exponent)[0])
+
+
+def _power(base, exponent, row):
+    """
+    base ** exponent, for scalars through the same NumPy loop as for arrays.
+
+    NumPy's vectorised pow can differ from the C library's (used by Python's
+    float **) in the last bit, which would break row/array parity. Scalar
+    results are memoised: serving repeats a few (rate, term) pairs.
+    """
+    if row:
+        return _scalar_power(base, exponent)
+    return base ** exponent
+
+
+def _divide(numerator, denominator, row):
+    """
+    numerator / denominator with NumPy's IEEE semantics for scalars too.
+
+    Python floats raise ZeroDivisionError where arrays give inf/NaN; a single
+    request must produce the same non-finite feature as its batch row so both
+    endpoints take the same fallback.
+    """
+    if row and denominator == 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(np.float64(numerator) / np.float64(denominator))
+    return numerator / denominator
+
+
+def _credit_features(columns, state, row):
+    """Ratios and amortised monthly payment; the same expressions serve arrays, Series and scalars"""
+    features = state['features']
+    income = columns['annual_income'] + 1 if 'annual_income' in columns else None
+    if 'debt_to_income_ratio' in features:
+        columns['debt_to_income_ratio'] = _divide(columns['existing_debt'], income, row)
+    if 'loan_to_income_ratio' in features:
+        columns['loan_to_income_ratio'] = _divide(columns['loan_amount'], income, row)
+    if 'interest_rate' in features:
+        rate = columns.get('interest_rate')
+        if rate is None:
+            rate = state['interest_rate'] if row else np.full(len(columns['loan_amount']), state['interest_rate'])
+        elif row:
+            rate = state['interest_rate'] if rate != rate else rate
+        else:
+            rate = np.where(np.isnan(rate), state['interest_rate'], rate)
+        columns['interest_rate'] = rate
+    if 'monthly_payment' in features:
+        monthly_rate = columns['interest_rate'] / 100 / 12
+        columns['monthly_payment'] = _divide(columns['loan_amount'] * monthly_rate,
+                                             1 - _power(1 + monthly_rate, -columns['loan_term_months'], row), row)
+    if 'payment_to_income_ratio' in features:
+        columns['payment_to_income_ratio'] = _divide(columns['monthly_payment'] * 12, income, row)
+
+
+def _fill_missing(columns, state, row):
+    for col, value in state['fill_values'].items():
+        if col not in columns:
+            continue
+        current = columns[col]
+        if row:
+            if current is None or current != current:
+                columns[col] = value
+        else:
+            columns[col] = np.where(_isna(current), value, current)
+
+
+def _outliers(columns, state, row):
+    for col, (lower, upper) in state['bounds'].items():
+        if col not in columns:
+            continue
+        value = columns[col]
+        if state['action'] == 'flag':
+            columns[f'{col}_is_outlier'] = (float(value < lower or value > upper) if row else
+                                           ((value < lower) | (value > upper)).astype(np.float64))
+        else:
+            columns[col] = min(max(value, lower), upper) if row else np.clip(value, lower, upper)
+
+
+def _encode(columns, state, row):
+    if state['method'] == 'label':
+        unknown = state['unknown']
+        for col, index in state['index'].items():
+            if col not in columns:
+                continue
+            values = columns[col]
+            if row:
+                code = float(index.get(values, unknown))
+            else:
+                code = np.fromiter((index.get(v, unknown) for v in values), dtype=np.float64, count=len(values))
+            columns[col + state['suffix']] = code
+    else:
+        for col, categories in state['categories'].items():
+            if col not in columns:
+                continue
+            values = columns.pop(col)
+            for category in categories[1:] if state['drop_first'] else categories:
+                columns[f'{col}_{category}'] = (float(values == category) if row else
+                                                (values == category).astype(np.float64))
+
+
+def _scale(columns, state, row):
+    standard = state['method'] == 'standard'
+    offsets = state['mean'] if standard else state['min']
+    for col, offset, scale in zip(state['columns'], offsets, state['scale']):
+        if col not in columns:
+            continue
+        # Same operation order as StandardScaler/MinMaxScaler.transform
+        columns[col] = (columns[col] - offset) / scale if standard else columns[col] * scale + offset
+
+
+def _interactions(columns, state, row):
+    for col1, col2 in state['pairs']:
+        columns[f'{col1}_x_{col2}'] = columns[col1] * columns[col2]
+        columns[f'{col1}_div_{col2}'] = _divide(columns[col1], columns[col2] + 1e-8, row)
+
+
+def _polynomials(columns, state, row):
+    for col in state['columns']:
+        for d in range(2, state['degree'] + 1):
+            columns[f'{col}_pow_{d}'] = _power(columns[col], d, row)
+
+
+def _bins(columns, state, row):
+    """Right-closed bins as pd.cut; values outside the fitted edges get no label"""
+    edges = np.asarray(state['edges'], dtype=np.float64)
+    labels = np.array(list(state['labels']) + [None], dtype=object)
+    values = np.atleast_1d(np.asarray(columns[state['column']], dtype=np.float64))
+    idx = np.searchsorted(edges, values, side='left') - 1
+    valid = (idx >= 0) & (idx < len(edges) - 1) & ~np.isnan(values)
+    binned = labels[np.where(valid, idx, len(labels) - 1)]
+    columns[f"{state['column']}_binned"] = binned[0] if row else binned
+
+
+STEP_TRANSFORMS = {
+    'create_credit_features': _credit_features,
+    'handle_missing_values': _fill_missing,
+    'handle_outliers': _outliers,
+    'encode_categorical': _encode,
+    'scale_features': _scale,
+    'create_interaction_features': _interactions,
+    'create_polynomial_features': _polynomials,
+    'create_binned_features': _bins,
+}
+
+
+def step_columns(step: str, state: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """(added, removed) column names of one fitted step"""
+    if step == 'create_credit_features':
+        return list(state['features']), []
+    if step == 'handle_outliers' and state['action'] == 'flag':
+        return [f'{col}_is_outlier' for col in state['bounds']], []
+    if step == 'encode_categorical':
+        if state['method'] == 'label':
+            return [col + state['suffix'] for col in state['vocabularies'] if state['suffix']], []
+        start = 1 if state['drop_first'] else 0
+        return ([f'{col}_{c}' for col, cats in state['categories'].items() for c in cats[start:]],
+                list(state['categories']))
+    if step == 'create_interaction_features':
+        return [f'{a}_{op}_{b}' for a, b in state['pairs'] for op in ('x', 'div')], []
+    if step == 'create_polynomial_features':
+        return [f'{col}_pow_{d}' for col in state['columns'] for d in range(2, state['degree'] + 1)], []
+    if step == 'create_binned_features':
+        return [f"{state['column']}_binned"], []
+    return [], []
+
+
+def prepare_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one fitted step and precompute its value -> code lookups"""
+    if step['step'] not in STEP_TRANSFORMS:
+        raise ValueError(f"Unknown preprocessing step: {step['step']}")
+    state = step['state']
+    if step['step'] == 'encode_categorical' and state['method'] == 'label':
+        state['index'] = {col: {v: i for i, v in enumerate(vocab)} for col, vocab in state['vocabularies'].items()}
+    return step
+
+
+class PreprocessingArtifact:
+    """
+    Ordered fitted steps of a DataPreprocessor, replayable with NumPy only.
+
+    Parameters:
+    -----------
+    steps : List[Dict[str, Any]]
+        {'step': DataPreprocessor method name, 'state': learned state} in
+        the order they were fitted
+    """
+
+    def __init__(self, steps: List[Dict[str, Any]]):
+        self.steps = [prepare_step(s) for s in steps]
+
+    @classmethod
+    def legacy(cls) -> 'PreprocessingArtifact':
+        return cls([{'step': s['step'], 'state': dict(s['state'])} for s in LEGACY_STEPS])
+
+    def transform_columns(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Apply all steps to columnar data.
+
+        Numeric columns are float64 arrays (NaN for missing), others object
+        arrays (None for missing). Returns a new dict: input columns first,
+        then the features each step adds, in step order.
+        """
+        columns = dict(columns)
+        for s in self.steps:
+            STEP_TRANSFORMS[s['step']](columns, s['state'], False)
+        return columns
+
+    def transform_row(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """transform_columns for one record of Python scalars (floats for numeric fields)"""
+        values = dict(values)
+        for s in self.steps:
+            STEP_TRANSFORMS[s['step']](values, s['state'], True)
+        return values
+
+    def output_columns(self, input_columns: List[str]) -> List[str]:
+        """Columns transform_columns returns for the given input columns"""
+        columns = list(input_columns)
+        for s in self.steps:
+            added, removed = step_columns(s['step'], s['state'])
+            columns = [c for c in columns if c not in removed] + [c for c in added if c not in columns]
+        return columns
+
+    def vocabulary(self, column: str) -> List[Any]:
+        """Categories the encoders learned for column (empty if it is not encoded)"""
+        for s in self.steps:
+            state = s['state']
+            if s['step'] == 'encode_categorical':
+                if state['method'] == 'label' and column in state['vocabularies']:
+                    return list(state['vocabularies'][column])
+                if state['method'] == 'onehot' and column in state['categories']:
+                    return list(state['categories'][column])
+        return []
+
+    def to_dict(self) -> Dict[str, Any]:
+        steps = [{'step': s['step'], 'state': {k: v for k, v in s['state'].items() if k != 'index'}}
+                 for s in self.steps]
+        return {'format': FORMAT_VERSION, 'steps': steps}
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Write compact JSON via a temporary file, so a reloading API never reads a partial file"""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'PreprocessingArtifact':
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported preprocessing artifact format: {data.get('format')}")
+        return cls(data['steps'])
@@ -0,0 +1,246 @@
+"""
+Keyed, deterministic pseudonymisation for anonymize_data, and PII content scanning
+
+Each value is replaced by the 64-bit SipHash-2-4 of the value under a
+secret key. Unlike the salted built-in hash(), the same value and key give
+the same pseudonym in every process, run and chunk, so anonymised extracts
+stay joinable and chunks can be hashed by any worker; without the key,
+pseudonyms cannot be recomputed from guessed identifiers. At 64 bits,
+collisions among tens of millions of ids are unlikely (about 7e-5 for 50M).
+
+Strings are hashed over their UTF-8 bytes by pandas.util.hash_array (C
+SipHash, then a bijective bit mix). Integers, booleans and integral floats
+are hashed as their int64 value's 8 little-endian bytes through the same
+SipHash and mix, vectorized in NumPy, so an id gets the same pseudonym
+whether it was loaded as int32, int64 or float64. Other floats are hashed
+by their float64 bits. Missing values stay missing.
+
+PIISample keeps a bounded uniform sample of each column's values across
+chunks and matches it against e-mail, phone and national ID patterns, so
+PII is found by content rather than by column name.
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype
+
+PSEUDONYM_KEY_ENV = 'PSEUDONYMIZATION_KEY'
+# Rows per SipHash block: the four state vectors stay cache-resident
+HASH_CHUNK_ROWS = 1 << 16
+
+# Values sampled per column for the PII scan, and the share of them that must
+# match a pattern for the column to be reported
+PII_SAMPLE_ROWS = 1_000
+PII_MIN_MATCH_RATE = 0.1
+PII_PATTERNS = {
+    'email': re.compile(r'[\w.%+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}'),
+    # Ugandan mobile numbers (+256 / 256 / 0 then 7XX XXX XXX) and other E.164 numbers
+    'phone': re.compile(r'(?<![\w+])(?:(?:\+?256|0)[\s-]?7\d{2}[\s-]?\d{3}[\s-]?\d{3}|\+[1-9]\d{7,14})(?!\w)'),
+    # Ugandan NIN: C, sex (M/F), 12 upper-case alphanumerics
+    'national_id': re.compile(r'(?<!\w)C[MF][0-9A-Z]{12}(?!\w)'),
+}
+
+# SipHash initialisation constants ("somepseudorandomlygeneratedbytes")
+_SIP_INIT = (0x736f6d6570736575, 0x646f72616e646f6d, 0x6c7967656e657261, 0x7465646279746573)
+# Final block of an 8-byte message: its length in the top byte
+_SIP_LENGTH_BLOCK = 8 << 56
+
+
+def resolve_key(key: Union[str, bytes, None]) -> Union[str, bytes]:
+    """key, or the PSEUDONYMIZATION_KEY environment variable; a key is required"""
+    if key is None:
+        key = os.environ.get(PSEUDONYM_KEY_ENV)
+    if not key:
+        raise ValueError(f"Pseudonymisation needs a secret key: pass key= or set {PSEUDONYM_KEY_ENV}")
+    return key
+
+
+@lru_cache(maxsize=8)
+def derive_key(key: Union[str, bytes]) -> Tuple[str, int, int]:
+    """
+    128-bit SipHash key derived from a secret of any length.
+
+    pandas takes the key as a 16-character string encoded with the value
+    encoding, so the derived bytes are kept ASCII (112 key bits) and the
+    NumPy path uses the same 16 bytes. Returns (pandas key, k0, k1).
+    """
+    secret = key.encode('utf8') if isinstance(key, str) else bytes(key)
+    digest = hashlib.blake2b(secret, digest_size=16, person=b'anonymize_data').digest()
+    ascii_key = bytes(b & 0x7F for b in digest)
+    k0, k1 = np.frombuffer(ascii_key, dtype='<u8')
+    return ascii_key.decode('ascii'), int(k0), int(k1)
+
+
+def _rotl(x: np.ndarray, bits: int, tmp: np.ndarray) -> None:
+    np.left_shift(x, bits, out=tmp)
+    np.right_shift(x, 64 - bits, out=x)
+    np.bitwise_or(x, tmp, out=x)
+
+
+def _sipround(v0, v1, v2, v3, tmp):
+    v0 += v1
+    _rotl(v1, 13, tmp)
+    v1 ^= v0
+    _rotl(v0, 32, tmp)
+    v2 += v3
+    _rotl(v3, 16, tmp)
+    v3 ^= v2
+    v0 += v3
+    _rotl(v3, 21, tmp)
+    v3 ^= v0
+    v2 += v1
+    _rotl(v1, 17, tmp)
+    v1 ^= v2
+    _rotl(v2, 32, tmp)
+
+
+def siphash_u64(words: np.ndarray, k0: int, k1: int) -> np.ndarray:
+    """SipHash-2-4 of each uint64 as an 8-byte little-endian message, block by block with in-place ops"""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    out = np.empty(len(words), dtype=np.uint64)
+    for start in range(0, len(words), HASH_CHUNK_ROWS):
+        m = words[start:start + HASH_CHUNK_ROWS]
+        v0, v1, v2, v3 = (np.full(len(m), k ^ c, dtype=np.uint64)
+                          for k, c in zip((k0, k1, k0, k1), _SIP_INIT))
+        tmp = np.empty(len(m), dtype=np.uint64)
+        for block in (m, _SIP_LENGTH_BLOCK):
+            v3 ^= block
+            _sipround(v0, v1, v2, v3, tmp)
+            _sipround(v0, v1, v2, v3, tmp)
+            v0 ^= block
+        v2 ^= 0xFF
+        for _ in range(4):
+            _sipround(v0, v1, v2, v3, tmp)
+        chunk = out[start:start + HASH_CHUNK_ROWS]
+        np.bitwise_xor(v0, v1, out=chunk)
+        chunk ^= v2
+        chunk ^= v3
+    return out
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """The bit mix pandas.util.hash_array applies after SipHash, in place"""
+    h ^= h >> 30
+    h *= 0xBF58476D1CE4E5B9
+    h ^= h >> 27
+    h *= 0x94D049BB133111EB
+    h ^= h >> 31
+    return h
+
+
+def _hash_values(values: pd.Series, key: Union[str, bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """(pseudonyms, missing mask) of one column; pseudonyms at missing positions are arbitrary"""
+    str_key, k0, k1 = derive_key(key)
+    missing = values.isna().to_numpy()
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Hash each category once, then gather by code
+        hashed, _ = _hash_values(pd.Series(dtype.categories), key)
+        codes = values.cat.codes.to_numpy()
+        return hashed[np.where(codes >= 0, codes, 0)], missing
+    if is_bool_dtype(dtype) or is_integer_dtype(dtype):
+        words = values.to_numpy(dtype=np.int64, na_value=0).view(np.uint64)
+    elif is_float_dtype(dtype):
+        x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        integral = np.isfinite(x) & (x == np.round(x)) & (np.abs(x) < 2**63)
+        as_int = np.where(integral, x, 0).astype(np.int64).view(np.uint64)
+        words = np.where(integral, as_int, x.view(np.uint64))
+    else:
+        objects = values.to_numpy(dtype=object, na_value=None)
+        hashed = np.zeros(len(objects), dtype=np.uint64)
+        hashed[~missing] = pd.util.hash_array(objects[~missing], encoding='utf8', hash_key=str_key,
+                                              categorize=False)
+        return hashed, missing
+    return _mix(siphash_u64(words, k0, k1)), missing
+
+
+def pseudonymize(values: pd.Series, key: Union[str, bytes, None] = None) -> pd.Series:
+    """
+    Keyed 64-bit pseudonyms of a column.
+
+    Parameters:
+    -----------
+    values : pd.Series
+        Column to pseudonymise (numeric, boolean, string/object or categorical)
+    key : str or bytes
+        Secret key (default: the PSEUDONYMIZATION_KEY environment variable)
+
+    Returns:
+    --------
+    pd.Series : uint64 pseudonyms with values' index and name (nullable UInt64 if values has missing entries)
+    """
+    hashed, missing = _hash_values(values, resolve_key(key))
+    if missing.any():
+        return pd.Series(pd.arrays.IntegerArray(hashed, missing), index=values.index, name=values.name)
+    return pd.Series(hashed, index=values.index, name=values.name)
+
+
+class PIISample:
+    """
+    Bounded uniform sample of each column's values, scanned for PII patterns.
+    
+    Every non-missing value draws a random priority and each column keeps
+    the sample_rows values with the smallest priorities seen so far
+    (bottom-k sampling), so update() can be fed chunk after chunk and the
+    sample stays uniform over everything seen while its size stays fixed.
+    Float and boolean columns are skipped (amounts and flags); integers
+    are scanned as their decimal strings.
+    
+    Parameters:
+    -----------
+    sample_rows : int
+        Values kept per column
+    seed : int
+        Seed for the priorities
+    """
+    
+    def __init__(self, sample_rows: int = PII_SAMPLE_ROWS, seed: int = 0):
+        self.sample_rows = sample_rows
+        self._rng = np.random.default_rng(seed)
+        self._samples = {}
+    
+    def update(self, chunk: pd.DataFrame) -> 'PIISample':
+        for col in chunk.columns:
+            values = chunk[col]
+            if is_float_dtype(values.dtype) or is_bool_dtype(values.dtype):
+                continue
+            present = np.flatnonzero(values.notna().to_numpy())
+            priority = self._rng.random(len(present))
+            if len(present) > self.sample_rows:
+                keep = np.argpartition(priority, self.sample_rows)[:self.sample_rows]
+                present, priority = present[keep], priority[keep]
+            sampled = values.iloc[present].astype(str).to_numpy(dtype=object)
+            if col in self._samples:
+                old_priority, old_sampled = self._samples[col]
+                priority = np.concatenate([old_priority, priority])
+                sampled = np.concatenate([old_sampled, sampled])
+                if len(priority) > self.sample_rows:
+                    keep = np.argpartition(priority, self.sample_rows)[:self.sample_rows]
+                    priority, sampled = priority[keep], sampled[keep]
+            self._samples[col] = (priority, sampled)
+        return self
+    
+    def scan(self) -> Dict[str, Dict[str, int]]:
+        """{column: {'sampled': n, pattern name: sampled values matching it}}"""
+        counts = {}
+        for col, (_, sampled) in self._samples.items():
+            values = pd.Series(sampled, dtype=object)
+            counts[col] = {'sampled': len(values),
+                           **{name: int(values.str.contains(pattern).sum()) for name, pattern in PII_PATTERNS.items()}}
+        return counts
+
+
+def pii_findings(counts: Dict[str, Dict[str, int]], min_match_rate: float = PII_MIN_MATCH_RATE) -> Dict[str, List[str]]:
+    """{column: PII types matched by at least min_match_rate of its sampled values} from (merged) scan counts"""
+    findings = {}
+    for col, c in counts.items():
+        found = [name for name in PII_PATTERNS if c['sampled'] and c[name] / c['sampled'] >= min_match_rate]
+        if found:
+            findings[col] = found
+    return findings
@@ -0,0 +1,302 @@
+"""
+Single-pass, mergeable dataset profiling
+
+profile_dataset reads a DataFrame, a CSV/Parquet path or an iterable of
+chunks once, chunk by chunk, and keeps for every column its count, nulls,
+memory, approximate distinct count (HyperLogLog) and, for numeric columns,
+min/max, mean/variance (RunningMoments) and approximate quantiles
+(QuantileSketch). Each column is hashed once per chunk; the same hashes
+feed the distinct counts and are combined into one 64-bit hash per row, from
+which duplicate rows are counted: exactly (up to 64-bit hash collisions)
+while at most max_row_hashes rows have been seen, and from a HyperLogLog of
+the row hashes beyond that. Profiles of partitions merge into the profile
+of their union, so partitions can be profiled by separate workers.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+try:
+    from ingestion import iter_chunks, STREAM_CHUNK_ROWS
+    from sketches import HyperLogLog, QuantileSketch, RunningMoments
+except ImportError:
+    from src.ingestion import iter_chunks, STREAM_CHUNK_ROWS
+    from src.sketches import HyperLogLog, QuantileSketch, RunningMoments
+
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+# Row hashes kept for the exact duplicate count (8 bytes each)
+MAX_ROW_HASHES = 1 << 24
+# Hash of a missing value, so missing values compare equal in row hashes as in duplicated()
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _is_numeric(dtype) -> bool:
+    """Columns summarised with moments and quantiles (describe()'s numeric columns)"""
+    return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+
+def column_hashes(values: pd.Series, missing: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    uint64 hash of each value, independent of the chunk it is in, and the
+    hashes of the distinct non-missing values (for the distinct count).
+
+    Numeric columns are hashed as float64, so a column read as int64 in one
+    chunk and as float64 (because of a missing value) in another gives the
+    same hashes; missing values all get one fixed hash. Other columns are
+    factorized first, so each distinct string is hashed once per chunk.
+    """
+    dtype = values.dtype
+    if _is_numeric(dtype) or is_bool_dtype(dtype) or is_datetime64_any_dtype(dtype):
+        if is_datetime64_any_dtype(dtype):
+            x = values.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        else:
+            x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        hashed = pd.util.hash_array(x)
+        hashed = np.where(missing, _NULL_HASH, hashed) if missing.any() else hashed
+        return hashed, hashed[~missing]
+    codes, uniques = pd.factorize(values)
+    unique_hashes = pd.util.hash_array(np.asarray(uniques, dtype=object))
+    # Code -1 (missing) picks the appended null hash
+    return np.append(unique_hashes, _NULL_HASH)[codes], unique_hashes
+
+
+def _combine_row_hash(row: np.ndarray, hashed: np.ndarray) -> None:
+    """Fold a column's hashes into the row hashes, in place (order-dependent, bijective per column)"""
+    row ^= hashed
+    row *= np.uint64(0xBF58476D1CE4E5B9)
+    row ^= row >> np.uint64(31)
+
+
+class ColumnProfile:
+    """
+    Streaming summary of one column: dtype, count, nulls, memory and distinct
+    count, plus min/max, moments and a quantile sketch for numeric columns.
+    """
+
+    def __init__(self, name: str, dtype, hll_precision: int = 14, sketch_k: int = 4096):
+        self.name = name
+        self.dtype = str(dtype)
+        self.numeric = _is_numeric(dtype)
+        self.count = 0
+        self.nulls = 0
+        self.memory_bytes = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(k=sketch_k) if self.numeric else None
+        self.distinct = HyperLogLog(hll_precision)
+
+    def _widen(self, dtype) -> None:
+        """Chunks disagree on the dtype: numeric ones widen to float64, anything else becomes object"""
+        if str(dtype) == self.dtype:
+            return
+        if self.numeric and _is_numeric(dtype):
+            self.dtype = 'float64'
+        else:
+            self.dtype = 'object'
+            self.numeric = False
+            self.sketch = None
+
+    def update(self, values: pd.Series, missing: np.ndarray, distinct_hashes: np.ndarray,
+               memory_bytes: int) -> 'ColumnProfile':
+        self._widen(values.dtype)
+        n_missing = int(missing.sum())
+        self.nulls += n_missing
+        self.count += len(values) - n_missing
+        self.memory_bytes += int(memory_bytes)
+        self.distinct.update(distinct_hashes)
+        if self.sketch is not None and _is_numeric(values.dtype) and n_missing < len(values):
+            x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            self.min = np.fmin(self.min, np.nanmin(x))
+            self.max = np.fmax(self.max, np.nanmax(x))
+            self.moments.update(x)
+            self.sketch.update(x)
+        return self
+
+    def merge(self, other: 'ColumnProfile') -> 'ColumnProfile':
+        self._widen(other.dtype)
+        self.count += other.count
+        self.nulls += other.nulls
+        self.memory_bytes += other.memory_bytes
+        self.distinct.merge(other.distinct)
+        if self.sketch is not None and other.sketch is not None:
+            self.min = np.fmin(self.min, other.min)
+            self.max = np.fmax(self.max, other.max)
+            self.moments.merge(other.moments)
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), as describe() reports"""
+        n = self.moments.n
+        return float(np.sqrt(self.moments.m2 / (n - 1))) if n > 1 else np.nan
+
+    def quantiles(self, q=PROFILE_QUANTILES) -> Dict[float, float]:
+        if self.sketch is None:
+            return {p: np.nan for p in q}
+        return dict(zip(q, (float(v) for v in self.sketch.quantile(q))))
+
+    def to_dict(self, q=PROFILE_QUANTILES) -> Dict[str, Any]:
+        total = self.count + self.nulls
+        summary = {
+            'dtype': self.dtype,
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_pct': 100 * self.nulls / total if total else 0.0,
+            'distinct': int(round(self.distinct.count())),
+            'memory_bytes': self.memory_bytes,
+        }
+        if self.sketch is not None:
+            summary.update({'mean': self.moments.mean if self.moments.n else np.nan, 'std': self.std,
+                            'min': float(self.min), 'max': float(self.max)})
+            summary.update({f"{p:.0%}": v for p, v in self.quantiles(q).items()})
+        return summary
+
+
+class DatasetProfile:
+    """
+    Profile of a dataset built chunk by chunk: row count, duplicate rows and a ColumnProfile per column.
+
+    Parameters:
+    -----------
+    max_row_hashes : int
+        Row hashes kept for the exact duplicate count; beyond this the count
+        comes from a HyperLogLog of the row hashes (relative error of the
+        distinct-row estimate about 1.04 / sqrt(2**hll_precision))
+    hll_precision : int
+        HyperLogLog register bits for distinct counts
+    sketch_k : int
+        QuantileSketch capacity for numeric columns
+    """
+
+    def __init__(self, max_row_hashes: int = MAX_ROW_HASHES, hll_precision: int = 14, sketch_k: int = 4096):
+        self.max_row_hashes = max_row_hashes
+        self.hll_precision = hll_precision
+        self.sketch_k = sketch_k
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.distinct_rows = HyperLogLog(hll_precision)
+        # Row hashes per chunk, or None once there are too many to keep
+        self._row_hashes = []
+        self._n_row_hashes = 0
+
+    def update(self, chunk: pd.DataFrame) -> 'DatasetProfile':
+        """Add one chunk (one pass over its columns)"""
+        row = np.zeros(len(chunk), dtype=np.uint64)
+        memory = chunk.memory_usage(deep=True, index=False)
+        for col in chunk.columns:
+            values = chunk[col]
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(col, values.dtype, self.hll_precision, self.sketch_k)
+            missing = values.isna().to_numpy()
+            hashed, distinct_hashes = column_hashes(values, missing)
+            self.columns[col].update(values, missing, distinct_hashes, memory[col])
+            _combine_row_hash(row, hashed)
+        self.rows += len(chunk)
+        self.distinct_rows.update(row)
+        self._add_row_hashes([row])
+        return self
+
+    def _add_row_hashes(self, row_hashes: List[np.ndarray]) -> None:
+        if self._row_hashes is None:
+            return
+        self._row_hashes.extend(row_hashes)
+        self._n_row_hashes += sum(len(row) for row in row_hashes)
+        if self._n_row_hashes > self.max_row_hashes:
+            self._row_hashes = None
+
+    def merge(self, other: 'DatasetProfile') -> 'DatasetProfile':
+        """Combine with the profile of another partition (columns are matched by name)"""
+        self.rows += other.rows
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = profile
+        self.distinct_rows.merge(other.distinct_rows)
+        if other._row_hashes is None:
+            self._row_hashes = None
+        else:
+            self._add_row_hashes(other._row_hashes)
+        return self
+
+    @property
+    def duplicates_exact(self) -> bool:
+        """Whether duplicate_rows is counted from all row hashes rather than estimated"""
+        return self._row_hashes is not None
+
+    @property
+    def duplicate_rows(self) -> int:
+        """Rows equal to an earlier row (as df.duplicated().sum())"""
+        if self.duplicates_exact:
+            distinct = len(np.unique(np.concatenate(self._row_hashes))) if self._row_hashes else 0
+        else:
+            distinct = self.distinct_rows.count()
+        return max(int(round(self.rows - distinct)), 0)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(c.memory_bytes for c in self.columns.values())
+
+    @property
+    def shape(self):
+        return self.rows, len(self.columns)
+
+    def dtype_counts(self) -> pd.Series:
+        return pd.Series([c.dtype for c in self.columns.values()], dtype=object).value_counts()
+
+    def to_frame(self, q=PROFILE_QUANTILES) -> pd.DataFrame:
+        """One row per column: dtype, count, nulls, distinct, memory and numeric statistics"""
+        return pd.DataFrame.from_dict({col: c.to_dict(q) for col, c in self.columns.items()}, orient='index')
+
+    def missing(self) -> pd.DataFrame:
+        """Columns with missing values: count and percentage, most missing first"""
+        frame = self.to_frame()
+        frame = frame[frame['nulls'] > 0]
+        return pd.DataFrame({'Missing Count': frame['nulls'], 'Percentage': frame['null_pct']}
+                            ).sort_values('Percentage', ascending=False)
+
+    def describe(self, q=PROFILE_QUANTILES) -> pd.DataFrame:
+        """df.describe().T for the numeric columns, with approximate quantiles"""
+        numeric = {col: c for col, c in self.columns.items() if c.sketch is not None}
+        stats = ['count', 'mean', 'std', 'min'] + [f"{p:.0%}" for p in q] + ['max']
+        return pd.DataFrame.from_dict({col: c.to_dict(q) for col, c in numeric.items()},
+                                      orient='index', columns=stats).astype(float)
+
+    def to_dict(self, q=PROFILE_QUANTILES) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'memory_bytes': self.memory_bytes,
+            'duplicate_rows': self.duplicate_rows,
+            'duplicates_exact': self.duplicates_exact,
+            'columns': {col: c.to_dict(q) for col, c in self.columns.items()},
+        }
+
+
+def profile_dataset(source: Union[str, Path, pd.DataFrame, Iterable[pd.DataFrame]],
+                    chunksize: int = STREAM_CHUNK_ROWS, **kwargs) -> DatasetProfile:
+    """
+    Profile a dataset in one pass over its chunks.
+
+    Parameters:
+    -----------
+    source : str, Path, pd.DataFrame or iterable of DataFrames
+        Data to profile; paths are read chunk by chunk (see iter_chunks)
+    chunksize : int
+        Rows per chunk
+    **kwargs :
+        DatasetProfile options (max_row_hashes, hll_precision, sketch_k)
+
+    Returns:
+    --------
+    DatasetProfile : Mergeable profile (see DatasetProfile.merge)
+    """
+    profile = DatasetProfile(**kwargs)
+    for chunk in iter_chunks(source, chunksize):
+        profile.update(chunk)
+    return profile
@@ -0,0 +1,309 @@
+"""
+Mergeable streaming summaries for data that does not fit in memory
+
+QuantileSketch, RunningMoments and HyperLogLog are updated one chunk at a
+time, use memory independent of the number of rows, and can be merged, so
+per-chunk or per-worker summaries combine into one.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def _lerp(a, b, t):
+    """Linear interpolation exactly as numpy.quantile/pandas compute it"""
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch built from a hierarchy of compactors (as in KLL/MRL).
+
+    Level h holds values that each stand for 2**h input values. When a level
+    grows past k values it is sorted and every other value (random offset) is
+    promoted to the next level. Memory is O(k log2(n/k)) values. Until the
+    first compaction (n <= k) quantiles are exact and match pandas' linear
+    interpolation; after that the rank error is at most log2(n/k)/k of n in
+    the worst case and, because compaction offsets are random, usually an
+    order of magnitude less (~0.01% of n for k=4096, n=10^7).
+
+    Parameters:
+    -----------
+    k : int
+        Compactor capacity; larger is more accurate
+    seed : int
+        Seed for the compaction offsets (results are reproducible)
+    """
+
+    def __init__(self, k: int = 4096, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> 'QuantileSketch':
+        """Add an array of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self._insert(0, values)
+        return self
+
+    def add(self, value: float, count: int) -> 'QuantileSketch':
+        """Add one value `count` times (e.g. imputed fills) without materialising them"""
+        self.n += count
+        h = 0
+        while count:
+            if count & 1:
+                self._insert(h, np.array([value], dtype=np.float64))
+            count >>= 1
+            h += 1
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        self.n += other.n
+        for h, values in enumerate(other.levels):
+            self._insert(h, values)
+        return self
+
+    def _insert(self, h, values):
+        while True:
+            while len(self.levels) <= h:
+                self.levels.append(np.empty(0))
+            buf = np.concatenate([self.levels[h], values])
+            if len(buf) <= self.k:
+                self.levels[h] = buf
+                return
+            buf.sort()
+            # An odd leftover stays at this level
+            even = len(buf) - len(buf) % 2
+            # Copy so the level does not keep the whole buffer alive
+            self.levels[h] = buf[even:].copy()
+            values = buf[self._rng.integers(2):even:2]
+            h += 1
+
+    def weighted_values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted retained values and the number of inputs each stands for"""
+        if not self.levels:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantile(self, q):
+        """Approximate quantile(s) with pandas' default (linear) interpolation"""
+        values, weights = self.weighted_values()
+        q = np.asarray(q, dtype=np.float64)
+        if len(values) == 0:
+            return np.full(q.shape, np.nan)
+        cum = np.cumsum(weights)
+        rank = q * (cum[-1] - 1)
+        below = np.floor(rank)
+        lower = values[np.searchsorted(cum, below, side='right')]
+        upper = values[np.searchsorted(cum, np.minimum(below + 1, cum[-1] - 1), side='right')]
+        return _lerp(lower, upper, rank - below)
+
+
+class RunningMoments:
+    """
+    Count, mean and sum of squared deviations, merged chunk by chunk (Welford/Chan).
+
+    var is the population variance (ddof=0), as StandardScaler uses.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _combine(self, n, mean, m2):
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def update(self, values) -> 'RunningMoments':
+        """Add an array of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), mean, float(((values - mean) ** 2).sum()))
+        return self
+
+    def add(self, value: float, count: int) -> 'RunningMoments':
+        """Add one value `count` times"""
+        self._combine(count, float(value), 0.0)
+        return self
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        self._combine(other.n, other.mean, other.m2)
+        return self
+
+    @property
+    def var(self) -> float:
+        return self.m2 / self.n if self.n else np.nan
+
+    def clipped(self, sketch: QuantileSketch, lower: float, upper: float,
+                bins: 'BinnedSums' = None) -> 'RunningMoments':
+        """
+        Moments after clipping to [lower, upper], for when the bounds are only known after the pass.
+
+        With bins (exact per-bin sums of the same data) only the one or two
+        bins that contain a bound are estimated, from the sketch's values in
+        those bins scaled to the bins' exact counts; without bins the whole
+        tail comes from the sketch. Either way the result is exact while the
+        sketch has not compacted.
+        """
+        values, weights = sketch.weighted_values()
+        if bins is None or sketch.n <= sketch.k:
+            shift, sq_shift = _clip_shift(self.mean, values, weights, lower, upper)
+        else:
+            shift, sq_shift = bins.clip_shift(self.mean, lower, upper, values, weights)
+        result = RunningMoments()
+        result.n = self.n
+        if self.n:
+            result.mean = self.mean + shift / self.n
+            # Sum of squares about the new mean from the one about the old mean
+            result.m2 = max(self.m2 + sq_shift - shift ** 2 / self.n, 0.0)
+        return result
+
+
+def _clip_shift(mean, values, weights, lower, upper):
+    """Change in the sum, and in the sum of squares about mean, when values are clipped"""
+    clipped = np.clip(values, lower, upper)
+    return (float((weights * (clipped - values)).sum()),
+            float((weights * ((clipped - mean) ** 2 - (values - mean) ** 2)).sum()))
+
+
+class BinnedSums:
+    """
+    Exact count, sum and sum of squares of a column per value bin.
+
+    Bin edges are fixed up front (from_sample takes them from the first
+    chunk's quantiles); the outermost bins are open-ended, so later data
+    outside the sample's range is still counted.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        size = len(self.edges) + 1
+        self.count = np.zeros(size)
+        self.s1 = np.zeros(size)
+        self.s2 = np.zeros(size)
+
+    @classmethod
+    def from_sample(cls, values, n_bins: int = 1024) -> 'BinnedSums':
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return cls([])
+        return cls(np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1))))
+
+    def update(self, values) -> 'BinnedSums':
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        idx = np.searchsorted(self.edges, values, side='right')
+        size = len(self.count)
+        self.count += np.bincount(idx, minlength=size)
+        self.s1 += np.bincount(idx, weights=values, minlength=size)
+        self.s2 += np.bincount(idx, weights=values * values, minlength=size)
+        return self
+
+    def add(self, value: float, count: int) -> 'BinnedSums':
+        idx = np.searchsorted(self.edges, value, side='right')
+        self.count[idx] += count
+        self.s1[idx] += value * count
+        self.s2[idx] += value * value * count
+        return self
+
+    def merge(self, other: 'BinnedSums') -> 'BinnedSums':
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("BinnedSums with different edges cannot be merged")
+        self.count += other.count
+        self.s1 += other.s1
+        self.s2 += other.s2
+        return self
+
+    def _bin_range(self, b):
+        low = self.edges[b - 1] if b > 0 else -np.inf
+        high = self.edges[b] if b < len(self.edges) else np.inf
+        return low, high
+
+    def clip_shift(self, mean, lower, upper, values, weights):
+        """_clip_shift over all data: exact for whole bins, sketch-estimated for the bins holding a bound"""
+        lower_bin = int(np.searchsorted(self.edges, lower, side='right'))
+        upper_bin = int(np.searchsorted(self.edges, upper, side='right'))
+        shift = sq_shift = 0.0
+        for bound, sl in ((lower, slice(None, lower_bin)), (upper, slice(upper_bin + 1, None))):
+            count, s1, s2 = self.count[sl].sum(), self.s1[sl].sum(), self.s2[sl].sum()
+            shift += count * bound - s1
+            sq_shift += count * (bound - mean) ** 2 - (s2 - 2 * mean * s1 + count * mean ** 2)
+        for b in {lower_bin, upper_bin}:
+            low, high = self._bin_range(b)
+            in_bin = (values >= low) & (values < high)
+            sketch_count = weights[in_bin].sum()
+            if sketch_count:
+                s, q = _clip_shift(mean, values[in_bin], weights[in_bin], lower, upper)
+                scale = self.count[b] / sketch_count
+                shift += s * scale
+                sq_shift += q * scale
+        return shift, sq_shift
+
+
+class HyperLogLog:
+    """
+    Approximate distinct count of 64-bit hashes (HyperLogLog, Flajolet et al.).
+
+    The top p bits of a hash pick one of 2**p registers, which keeps the
+    largest rank (position of the first 1-bit) of the remaining bits seen.
+    Memory is 2**p bytes whatever the number of values, the relative error
+    is about 1.04 / sqrt(2**p) (0.8% for p=14), and merging two sketches is
+    an element-wise max of their registers. Small counts use linear
+    counting, which is close to exact while most registers are empty.
+
+    Parameters:
+    -----------
+    p : int
+        Register index bits (4..18)
+    """
+
+    def __init__(self, p: int = 14):
+        if not 4 <= p <= 18:
+            raise ValueError(f"HyperLogLog precision must be in 4..18, got {p}")
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, hashes) -> 'HyperLogLog':
+        """Add an array of uint64 hashes"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        bits = 64 - self.p
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # rest < 2**53 converts to float exactly and frexp gives floor(log2(rest)) + 1
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest > 0, bits + 1 - exponent, bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.p != self.p:
+            raise ValueError("HyperLogLog sketches with different precision cannot be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return float(estimate)
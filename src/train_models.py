@@ -10,23 +10,37 @@ Usage:
 import pandas as pd
 import numpy as np
 import warnings
-import sys
 import joblib
 from pathlib import Path
 from datetime import datetime
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
 
 # ML Libraries
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.base import clone
+from joblib import Parallel, delayed
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import NearestNeighbors
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score, 
-    roc_auc_score, confusion_matrix, classification_report
+    roc_auc_score
 )
 
-from imblearn.over_sampling import SMOTE
+try:
+    from tree_engine import CompiledTreeEnsemble
+    from ensemble import FoldEnsemble
+    from ingestion import load_csv, load_sparse_dataset
+    from preprocessing import DataPreprocessor, CREDIT_FEATURE_INPUTS
+except ImportError:
+    from src.tree_engine import CompiledTreeEnsemble
+    from src.ensemble import FoldEnsemble
+    from src.ingestion import load_csv, load_sparse_dataset
+    from src.preprocessing import DataPreprocessor, CREDIT_FEATURE_INPUTS
 
 try:
     from xgboost import XGBClassifier
@@ -52,15 +66,242 @@ except:
 
 warnings.filterwarnings('ignore')
 
+# Fitted on the training split and shipped as models/preprocessor.json, so the
+# API derives its features with exactly this transform
+PREPROCESSING_STEPS = [
+    ('handle_missing_values', {}),
+    ('create_credit_features', {}),
+    ('encode_categorical', {'columns': ['employment_status'], 'method': 'label', 'suffix': '_encoded'}),
+]
+# Steps that derive features; skipped for data that already went through them
+FEATURE_ENGINEERING_STEPS = ('create_credit_features', 'encode_categorical')
+
+
+def applicable_steps(steps, columns):
+    """
+    The preprocessing steps to fit on data with these columns.
+    
+    The notebook's cleaned CSV already holds the credit features, computed
+    from raw values before its columns were scaled and one-hot encoded.
+    Deriving them again would recompute them from scaled inputs, so for
+    such data only the remaining steps (imputation) are fitted.
+    """
+    engineered = [f for f in CREDIT_FEATURE_INPUTS if f != 'interest_rate' and f in columns]
+    if not engineered:
+        return list(steps)
+    print(f"⚠️ Data already has engineered features ({', '.join(engineered)}); "
+          f"skipping {', '.join(FEATURE_ENGINEERING_STEPS)}. The API derives features from raw "
+          f"application fields, so it only serves this model if preprocessor.json produces all its columns.")
+    return [(step, params) for step, params in steps if step not in FEATURE_ENGINEERING_STEPS]
+
+
+def _rows(X, idx):
+    """Rows idx of a DataFrame or a SciPy sparse feature matrix"""
+    return X[idx] if sparse.issparse(X) else X.iloc[idx]
+
+
+class FoldSMOTE:
+    """
+    SMOTE applied inside each CV fold, with the minority-class k-NN graph cached per fold.
+    
+    Oversampling only the training part of a fold keeps synthetic rows out of
+    the validation rows. The neighbour search dominates SMOTE's cost, so it is
+    done once per fold (see prepare) and every candidate model reuses it; the
+    synthetic rows themselves are regenerated from a fixed seed, so all
+    candidates see the same resampled fold.
+    
+    Parameters:
+    -----------
+    sampling_strategy : float
+        Desired minority/majority ratio after resampling (as in imblearn's SMOTE)
+    k_neighbors : int
+        Number of minority neighbours to interpolate towards
+    random_state : int
+        Seed for the synthetic samples
+    """
+    
+    def __init__(self, sampling_strategy=0.7, k_neighbors=5, random_state=42, n_jobs=-1):
+        self.sampling_strategy = sampling_strategy
+        self.k_neighbors = k_neighbors
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.graphs = {}
+        self.graph_seconds = {}
+    
+    def prepare(self, X, y, folds):
+        """Build the minority k-NN graph for every fold and for the full training set"""
+        for key, idx in [*((i, train_idx) for i, (train_idx, _) in enumerate(folds)),
+                         ('full', np.arange(len(y)))]:
+            self._graph(key, X, y, idx)
+        return self
+    
+    def _graph(self, key, X, y, idx):
+        if key not in self.graphs:
+            start = time.perf_counter()
+            y_idx = np.asarray(y)[idx]
+            minority = idx[y_idx == 1]
+            X_min = self._minority_rows(X, minority)
+            nn = NearestNeighbors(n_neighbors=self.k_neighbors + 1, n_jobs=self.n_jobs).fit(X_min)
+            # Column 0 is each point itself
+            neighbours = nn.kneighbors(X_min, return_distance=False)[:, 1:]
+            self.graphs[key] = (minority, neighbours.astype(np.int32), int((y_idx == 0).sum()))
+            self.graph_seconds[key] = time.perf_counter() - start
+        return self.graphs[key]
+    
+    @staticmethod
+    def _minority_rows(X, minority):
+        # Sparse rows stay CSR: NearestNeighbors searches them by brute force
+        X_min = _rows(X, minority)
+        return X_min if sparse.issparse(X_min) else X_min.to_numpy(dtype=np.float64)
+    
+    def resample(self, X, y, key, idx):
+        """Rows idx of (X, y) plus the synthetic minority rows for fold key"""
+        minority, neighbours, n_majority = self._graph(key, X, y, idx)
+        n_new = int(n_majority * self.sampling_strategy - len(minority))
+        X_fold, y_fold = _rows(X, idx), y.iloc[idx]
+        if n_new <= 0:
+            return X_fold, y_fold
+        
+        rng = np.random.default_rng(self.random_state)
+        rows = rng.integers(0, len(minority), n_new)
+        cols = rng.integers(0, neighbours.shape[1], n_new)
+        gaps = rng.random(n_new)
+        X_min = self._minority_rows(X, minority)
+        base = X_min[rows]
+        if sparse.issparse(X_min):
+            synthetic = base + sparse.diags(gaps) @ (X_min[neighbours[rows, cols]] - base)
+            X_res = sparse.vstack([X_fold, synthetic], format='csr')
+        else:
+            synthetic = base + gaps[:, None] * (X_min[neighbours[rows, cols]] - base)
+            X_res = pd.concat([X_fold, pd.DataFrame(synthetic, columns=X.columns)], ignore_index=True)
+        y_res = pd.concat([y_fold, pd.Series(np.ones(n_new, dtype=y.dtype), name=y.name)],
+                          ignore_index=True)
+        return X_res, y_res
+
+
+def _fit_fold(model, X, y, train_idx, val_idx, resampler=None, fold=None):
+    """Fit a clone of model on one (optionally oversampled) fold and score its validation rows"""
+    start = time.perf_counter()
+    if resampler is None:
+        X_fit, y_fit = _rows(X, train_idx), y.iloc[train_idx]
+    else:
+        X_fit, y_fit = resampler.resample(X, y, fold, train_idx)
+    resample_seconds = time.perf_counter() - start
+    fold_model = clone(model).fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - start - resample_seconds
+    val_prob = fold_model.predict_proba(_rows(X, val_idx))[:, 1]
+    return (fold_model, val_prob, fit_seconds,
+            time.perf_counter() - start - resample_seconds - fit_seconds, resample_seconds)
+
+
+def cross_validate_folds(model, X, y, folds, n_jobs=1, resampler=None):
+    """
+    Fit model once per precomputed fold.
+    
+    Returns the fold models, the out-of-fold probability for every training
+    row, per-fold AUC and per-fold fit/predict seconds.
+    """
+    fitted = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(model, X, y, train_idx, val_idx, resampler, i)
+        for i, (train_idx, val_idx) in enumerate(folds)
+    )
+    oof = np.empty(len(y))
+    fold_auc = []
+    for (_, val_idx), (_, val_prob, *_) in zip(folds, fitted):
+        oof[val_idx] = val_prob
+        fold_auc.append(roc_auc_score(y.iloc[val_idx], val_prob))
+    return {
+        'models': [f[0] for f in fitted],
+        'oof': oof,
+        'fold_auc': fold_auc,
+        'fold_fit_seconds': [f[2] for f in fitted],
+        'fold_predict_seconds': [f[3] for f in fitted],
+        'fold_resample_seconds': [f[4] for f in fitted],
+    }
+
+
+def evaluate_classifier(model, model_name, X_test, y_test):
+    """Test-set metrics"""
+    # Predictions
+    y_pred = model.predict(X_test)
+    y_prob = model.predict_proba(X_test)[:, 1]
+    
+    # Metrics
+    return {
+        'model_name': model_name,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, zero_division=0),
+        'recall': recall_score(y_test, y_pred, zero_division=0),
+        'f1_score': f1_score(y_test, y_pred, zero_division=0),
+        'roc_auc': roc_auc_score(y_test, y_prob)
+    }
+
+
+def fit_and_evaluate(model, model_name, X_train, y_train, X_test, y_test, folds,
+                     refit_full=True, cv_n_jobs=1, cores=None, resampler=None):
+    """
+    Cross-validate on the cached folds, then produce the final model.
+    
+    The final model is a refit on the full training set, or (refit_full=False)
+    a FoldEnsemble of the fold models, which saves one full fit per candidate.
+    Runs in the parent for the sequential train_* methods and as a
+    process-pool job for train_all.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    
+    # Cross-validation on training set
+    cv = cross_validate_folds(model, X_train, y_train, folds, n_jobs=cv_n_jobs, resampler=resampler)
+    
+    refit_start = time.perf_counter()
+    if refit_full:
+        if resampler is not None:
+            model.fit(*resampler.resample(X_train, y_train, 'full', np.arange(len(y_train))))
+        else:
+            model.fit(X_train, y_train)
+    else:
+        model = FoldEnsemble(cv['models'])
+    refit_seconds = time.perf_counter() - refit_start if refit_full else 0.0
+    
+    metrics = evaluate_classifier(model, model_name, X_test, y_test)
+    metrics['cv_auc_mean'] = float(np.mean(cv['fold_auc']))
+    metrics['cv_auc_std'] = float(np.std(cv['fold_auc']))
+    metrics['oof_auc'] = roc_auc_score(y_train, cv['oof'])
+    metrics['cv_fold_fit_seconds'] = cv['fold_fit_seconds']
+    metrics['cv_fold_predict_seconds'] = cv['fold_predict_seconds']
+    metrics['cv_fold_resample_seconds'] = cv['fold_resample_seconds']
+    metrics['refit_seconds'] = refit_seconds
+    metrics['cores'] = cores
+    metrics['train_wall_seconds'] = time.perf_counter() - wall_start
+    metrics['train_cpu_seconds'] = time.process_time() - cpu_start
+    return model, metrics, cv['oof']
+
+
 class CreditScoringTrainer:
-    """Automated trainer for credit scoring models"""
+    """
+    Automated trainer for credit scoring models
     
-    def __init__(self, data_path):
+    data_path is the cleaned CSV, or a model-ready sparse dataset (.npz
+    written by ingestion.save_sparse_dataset) that is split and trained on
+    as is. With onehot_columns, the CSV path is preprocessed into a CSR
+    matrix (DataPreprocessor.fit_transform_sparse) instead of a DataFrame;
+    every candidate trains on the sparse matrix directly.
+    """
+    
+    def __init__(self, data_path, refit_full=True, n_folds=5, sampling_strategy=0.7,
+                 preprocessing_steps=PREPROCESSING_STEPS, onehot_columns=None):
         self.data_path = data_path
+        self.preprocessing_steps = preprocessing_steps
+        self.onehot_columns = onehot_columns
+        self.preprocessor = DataPreprocessor()
         self.models = {}
         self.results = {}
+        self.oof_predictions = {}
         self.best_model = None
         self.best_score = 0
+        self.refit_full = refit_full
+        self.n_folds = n_folds
+        self._folds = None
+        self.resampler = FoldSMOTE(sampling_strategy=sampling_strategy) if sampling_strategy else None
         
     def load_data(self):
         """Load and prepare data"""
@@ -68,8 +309,12 @@ class CreditScoringTrainer:
         print("LOADING DATA".center(80))
         print("="*80)
         
-        df = pd.read_csv(self.data_path)
-        print(f"\n✅ Loaded dataset: {df.shape}")
+        if str(self.data_path).endswith('.npz'):
+            return self._load_sparse_dataset()
+        
+        # Typed parse on the first run, columnar cache afterwards
+        df, report = load_csv(self.data_path)
+        print(f"\n✅ Loaded dataset: {df.shape} ({report.summary()})")
         
         # Identify target and features
         target_col = 'default_status'
@@ -82,54 +327,155 @@ class CreditScoringTrainer:
         print(f"Features: {len(feature_cols)}")
         print(f"Target: {target_col}")
         
-        X = df[feature_cols].copy()
+        X = df[feature_cols]
         y = df[target_col].copy()
         
-        # Handle any remaining missing values
-        X = X.fillna(X.median())
-        
         # Train-test split
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.20, random_state=42, stratify=y
         )
         
+        # Derived features, encodings and imputation learned on the training split only
+        steps = applicable_steps(self.preprocessing_steps, X_train.columns)
+        if self.onehot_columns:
+            X_train, feature_cols = self.preprocessor.fit_transform_sparse(
+                X_train, steps, self.onehot_columns)
+            X_test = self.preprocessor.transform_sparse(X_test)
+            print(f"Features after preprocessing: {len(feature_cols)} "
+                  f"(CSR, {X_train.nnz / max(np.prod(X_train.shape), 1):.1%} non-zero)")
+        else:
+            X_train = self.preprocessor.fit_transform(X_train, steps)
+            X_test = self.preprocessor.transform(X_test)
+            # Raw categorical columns are replaced by their encodings
+            feature_cols = [col for col in X_train.columns if X_train[col].dtype == np.float64]
+            X_train, X_test = X_train[feature_cols].reset_index(drop=True), X_test[feature_cols]
+            print(f"Features after preprocessing: {len(feature_cols)}")
+        
+        return self._set_split(X_train, X_test, y_train, y_test, feature_cols)
+    
+    def _load_sparse_dataset(self):
+        """Split a saved CSR dataset; its features are used as is, so no preprocessing state is fitted"""
+        X, feature_cols, y = load_sparse_dataset(self.data_path)
+        if y is None:
+            raise ValueError(f"{self.data_path} has no target saved")
+        print(f"\n✅ Loaded sparse dataset: {X.shape} ({X.nnz:,} non-zeros)")
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, pd.Series(y, name='default_status'), test_size=0.20, random_state=42, stratify=y
+        )
+        return self._set_split(X_train, X_test, y_train, y_test, feature_cols)
+    
+    def _set_split(self, X_train, X_test, y_train, y_test, feature_cols):
         print(f"\nTrain: {X_train.shape[0]:,} | Test: {X_test.shape[0]:,}")
         print(f"Default rate - Train: {y_train.mean():.2%} | Test: {y_test.mean():.2%}")
         
-        # Apply SMOTE
-        print("\n🔄 Applying SMOTE...")
-        smote = SMOTE(random_state=42, sampling_strategy=0.7)
-        X_train_balanced, y_train_balanced = smote.fit_resample(X_train, y_train)
-        
-        print(f"After SMOTE: {X_train_balanced.shape[0]:,} samples")
-        print(f"New default rate: {y_train_balanced.mean():.2%}")
-        
-        self.X_train = X_train_balanced
-        self.y_train = y_train_balanced
+        # SMOTE is applied per CV fold (see FoldSMOTE), not to the whole training split
+        self.X_train = X_train
+        self.y_train = y_train.reset_index(drop=True)
         self.X_test = X_test
         self.y_test = y_test
         self.feature_cols = feature_cols
         
         return self
     
-    def train_logistic_regression(self):
-        """Train Logistic Regression"""
-        print("\n" + "="*80)
-        print("1. TRAINING LOGISTIC REGRESSION".center(80))
-        print("="*80)
-        
-        model = LogisticRegression(
+    def _build_logistic_regression(self, n_jobs=None):
+        return LogisticRegression(
             max_iter=1000,
             class_weight='balanced',
             random_state=42,
             solver='liblinear'
         )
+    
+    def _build_random_forest(self, n_jobs=-1):
+        return RandomForestClassifier(
+            n_estimators=100,
+            max_depth=15,
+            min_samples_split=10,
+            class_weight='balanced',
+            random_state=42,
+            n_jobs=n_jobs
+        )
+    
+    def _build_xgboost(self, n_jobs=None):
+        # Calculate scale_pos_weight on the class ratio the model is fitted on:
+        # folds and refit are first oversampled to sampling_strategy positives per negative
+        n_negative, n_positive = (self.y_train == 0).sum(), (self.y_train == 1).sum()
+        if self.resampler is not None:
+            n_positive = max(n_positive, int(n_negative * self.resampler.sampling_strategy))
+        scale_pos_weight = n_negative / n_positive
+        # XGBoost treats entries absent from a sparse matrix as missing; missing=0.0
+        # makes explicit zeros in dense input (the API) score the same way
+        missing = 0.0 if sparse.issparse(self.X_train) else np.nan
+        
+        return XGBClassifier(
+            n_estimators=100,
+            max_depth=6,
+            learning_rate=0.1,
+            scale_pos_weight=scale_pos_weight,
+            random_state=42,
+            use_label_encoder=False,
+            eval_metric='logloss',
+            missing=missing,
+            n_jobs=n_jobs
+        )
+    
+    def _build_lightgbm(self, n_jobs=None):
+        return LGBMClassifier(
+            n_estimators=100,
+            max_depth=6,
+            learning_rate=0.1,
+            class_weight='balanced',
+            random_state=42,
+            verbose=-1,
+            n_jobs=n_jobs
+        )
+    
+    def cv_folds(self):
+        """Stratified fold index arrays over the training set, computed once and shared by all models"""
+        if self._folds is None:
+            # Same splits as cross_val_score(cv=n_folds) for a classifier
+            splitter = StratifiedKFold(n_splits=self.n_folds)
+            self._folds = list(splitter.split(self.X_train, self.y_train))
+            if self.resampler is not None:
+                print("\n🔄 Building per-fold SMOTE neighbour graphs...")
+                self.resampler.prepare(self.X_train, self.y_train, self._folds)
+                graph_times = " ".join(f"{t:.2f}s" for t in self.resampler.graph_seconds.values())
+                print(f"k-NN graphs (folds + full): {graph_times}")
+        return self._folds
+    
+    def _train_candidate(self, key, model_name, model):
+        """Cross-validate, fit and record one candidate in this process"""
+        model, metrics, oof = fit_and_evaluate(
+            model, model_name, self.X_train, self.y_train, self.X_test, self.y_test,
+            self.cv_folds(), refit_full=self.refit_full, cv_n_jobs=-1, resampler=self.resampler,
+            cores=os.cpu_count() or 1
+        )
+        self._record(key, model_name, model, metrics, oof)
+    
+    def _record(self, key, model_name, model, metrics, oof):
+        self._log_metrics(model, model_name, metrics)
+        self.models[key] = model
+        self.results[key] = metrics
+        self.oof_predictions[key] = oof
+    
+    def _candidates(self):
+        """(key, display name, builder) for every model that can be trained here"""
+        candidates = [
+            ('logistic_regression', "Logistic Regression", self._build_logistic_regression),
+            ('random_forest', "Random Forest", self._build_random_forest),
+        ]
+        if XGBOOST_AVAILABLE:
+            candidates.append(('xgboost', "XGBoost", self._build_xgboost))
+        if LIGHTGBM_AVAILABLE:
+            candidates.append(('lightgbm', "LightGBM", self._build_lightgbm))
+        return candidates
+    
+    def train_logistic_regression(self):
+        """Train Logistic Regression"""
+        print("\n" + "="*80)
+        print("1. TRAINING LOGISTIC REGRESSION".center(80))
+        print("="*80)
         
-        model.fit(self.X_train, self.y_train)
-        
-        metrics = self._evaluate_model(model, "Logistic Regression")
-        self.models['logistic_regression'] = model
-        self.results['logistic_regression'] = metrics
+        self._train_candidate('logistic_regression', "Logistic Regression", self._build_logistic_regression())
         
         return self
     
@@ -139,20 +485,7 @@ class CreditScoringTrainer:
         print("2. TRAINING RANDOM FOREST".center(80))
         print("="*80)
         
-        model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=15,
-            min_samples_split=10,
-            class_weight='balanced',
-            random_state=42,
-            n_jobs=-1
-        )
-        
-        model.fit(self.X_train, self.y_train)
-        
-        metrics = self._evaluate_model(model, "Random Forest")
-        self.models['random_forest'] = model
-        self.results['random_forest'] = metrics
+        self._train_candidate('random_forest', "Random Forest", self._build_random_forest())
         
         return self
     
@@ -166,24 +499,7 @@ class CreditScoringTrainer:
         print("3. TRAINING XGBOOST".center(80))
         print("="*80)
         
-        # Calculate scale_pos_weight
-        scale_pos_weight = (self.y_train == 0).sum() / (self.y_train == 1).sum()
-        
-        model = XGBClassifier(
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1,
-            scale_pos_weight=scale_pos_weight,
-            random_state=42,
-            use_label_encoder=False,
-            eval_metric='logloss'
-        )
-        
-        model.fit(self.X_train, self.y_train)
-        
-        metrics = self._evaluate_model(model, "XGBoost")
-        self.models['xgboost'] = model
-        self.results['xgboost'] = metrics
+        self._train_candidate('xgboost', "XGBoost", self._build_xgboost())
         
         return self
     
@@ -197,47 +513,56 @@ class CreditScoringTrainer:
         print("4. TRAINING LIGHTGBM".center(80))
         print("="*80)
         
-        model = LGBMClassifier(
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1,
-            class_weight='balanced',
-            random_state=42,
-            verbose=-1
-        )
+        self._train_candidate('lightgbm', "LightGBM", self._build_lightgbm())
         
-        model.fit(self.X_train, self.y_train)
+        return self
+    
+    def train_all(self, total_cores=None):
+        """
+        Train every candidate concurrently in a process pool.
+        
+        Each job gets an explicit share of the cores, passed to the
+        estimator's n_jobs (nthread for XGBoost), and cross-validates its
+        folds sequentially within that budget, so the machine is neither
+        idle nor oversubscribed. Wall-clock and CPU time are recorded per model.
+        """
+        candidates = self._candidates()
+        folds = self.cv_folds()
+        total_cores = total_cores or os.cpu_count() or 1
+        cores_per_job = max(1, total_cores // len(candidates))
+        
+        print("\n" + "="*80)
+        print(f"TRAINING {len(candidates)} MODELS IN PARALLEL ({cores_per_job} core(s) each)".center(80))
+        print("="*80)
         
-        metrics = self._evaluate_model(model, "LightGBM")
-        self.models['lightgbm'] = model
-        self.results['lightgbm'] = metrics
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(len(candidates), total_cores)) as pool:
+            futures = [
+                # Folds run one after another; the estimator's own threads use the budget
+                (key, name, pool.submit(fit_and_evaluate, builder(n_jobs=cores_per_job), name,
+                                        self.X_train, self.y_train, self.X_test, self.y_test, folds,
+                                        self.refit_full, 1, cores_per_job, self.resampler))
+                for key, name, builder in candidates
+            ]
+            for key, name, future in futures:
+                self._record(key, name, *future.result())
+        total_wall = time.perf_counter() - start
+        
+        print("\n" + "-"*80)
+        print(f"{'Model':<22} {'Cores':>6} {'Wall (s)':>10} {'CPU (s)':>10} {'CPU/Wall':>10}")
+        print("-"*80)
+        for key, name, _ in candidates:
+            metrics = self.results[key]
+            print(f"{name:<22} {metrics['cores']:>6} {metrics['train_wall_seconds']:>10.2f} "
+                  f"{metrics['train_cpu_seconds']:>10.2f} "
+                  f"{metrics['train_cpu_seconds'] / max(metrics['train_wall_seconds'], 1e-9):>10.2f}")
+        serial_wall = sum(self.results[key]['train_wall_seconds'] for key, _, _ in candidates)
+        print(f"\n⏱️ Total wall-clock: {total_wall:.2f}s (sum of per-model wall-clock: {serial_wall:.2f}s)")
         
         return self
     
-    def _evaluate_model(self, model, model_name):
-        """Evaluate model performance"""
-        # Predictions
-        y_pred = model.predict(self.X_test)
-        y_prob = model.predict_proba(self.X_test)[:, 1]
-        
-        # Metrics
-        metrics = {
-            'model_name': model_name,
-            'accuracy': accuracy_score(self.y_test, y_pred),
-            'precision': precision_score(self.y_test, y_pred, zero_division=0),
-            'recall': recall_score(self.y_test, y_pred, zero_division=0),
-            'f1_score': f1_score(self.y_test, y_pred, zero_division=0),
-            'roc_auc': roc_auc_score(self.y_test, y_prob)
-        }
-        
-        # Cross-validation on training set
-        cv_scores = cross_val_score(
-            model, self.X_train, self.y_train, 
-            cv=5, scoring='roc_auc', n_jobs=-1
-        )
-        metrics['cv_auc_mean'] = cv_scores.mean()
-        metrics['cv_auc_std'] = cv_scores.std()
-        
+    def _log_metrics(self, model, model_name, metrics):
+        """Print results, track the best model and log to MLflow"""
         # Print results
         print(f"\n✅ {model_name} Results:")
         print(f"   Accuracy:  {metrics['accuracy']:.4f}")
@@ -246,6 +571,13 @@ class CreditScoringTrainer:
         print(f"   F1-Score:  {metrics['f1_score']:.4f}")
         print(f"   ROC-AUC:   {metrics['roc_auc']:.4f}")
         print(f"   CV AUC:    {metrics['cv_auc_mean']:.4f} (±{metrics['cv_auc_std']:.4f})")
+        print(f"   OOF AUC:   {metrics['oof_auc']:.4f}")
+        fold_times = " ".join(f"{t:.2f}s" for t in metrics['cv_fold_fit_seconds'])
+        final = f"refit {metrics['refit_seconds']:.2f}s" if self.refit_full else "fold ensemble"
+        print(f"   Fit time:  folds {fold_times} | {final}")
+        if self.resampler is not None:
+            resample_times = " ".join(f"{t:.2f}s" for t in metrics['cv_fold_resample_seconds'])
+            print(f"   SMOTE:     folds {resample_times}")
         
         # Track best model
         if metrics['roc_auc'] > self.best_score:
@@ -272,8 +604,6 @@ class CreditScoringTrainer:
                     mlflow.sklearn.log_model(model, "model")
             except Exception as e:
                 print(f"   ⚠️ MLflow logging failed: {e}")
-        
-        return metrics
     
     def save_results(self):
         """Save models and results"""
@@ -289,13 +619,21 @@ class CreditScoringTrainer:
         if self.best_model:
             model_name, model = self.best_model
             model_path = models_dir / "best_model.pkl"
-            joblib.dump(model, model_path)
+            self._atomic_dump(model, model_path)
             print(f"\n✅ Best model ({model_name}) saved: {model_path}")
             
             # Save feature columns
             features_path = models_dir / "feature_columns.pkl"
-            joblib.dump(self.feature_cols, features_path)
+            self._atomic_dump(self.feature_cols, features_path)
             print(f"✅ Feature columns saved: {features_path}")
+            
+            if self.preprocessor.artifact is not None:
+                preprocessor_path = self.preprocessor.save_state(models_dir / "preprocessor.json")
+                print(f"✅ Preprocessing state saved: {preprocessor_path}")
+            else:
+                print("⚠️ No preprocessing state fitted (pre-built feature matrix); none saved")
+            
+            self._export_compiled_model(model, models_dir / "best_model_compiled")
         
         # Save all models
         for name, model in self.models.items():
@@ -303,6 +641,12 @@ class CreditScoringTrainer:
             joblib.dump(model, path)
             print(f"✅ {name} saved: {path}")
         
+        # Save out-of-fold training predictions (e.g. for stacking or calibration)
+        if self.oof_predictions:
+            oof_path = models_dir / "oof_predictions.csv"
+            pd.DataFrame(self.oof_predictions).assign(y_true=np.asarray(self.y_train)).to_csv(oof_path, index=False)
+            print(f"✅ Out-of-fold predictions saved: {oof_path}")
+        
         # Save metrics to JSON
         results_path = models_dir / "model_results.json"
         with open(results_path, 'w') as f:
@@ -314,6 +658,38 @@ class CreditScoringTrainer:
         
         return self
     
+    @staticmethod
+    def _atomic_dump(obj, path):
+        """joblib.dump via a temporary file so a serving API reading/mmapping path never sees a partial write"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    
+    def _export_compiled_model(self, model, path, tolerance=1e-6):
+        """Compile the best tree ensemble to NumPy node tables for the API"""
+        try:
+            compiled = CompiledTreeEnsemble.from_model(model, self.feature_cols)
+        except ValueError as e:
+            print(f"⚠️ Compiled model not exported: {e}")
+            return
+        
+        # Parity check against the original model on the held-out test set
+        expected = model.predict_proba(self.X_test)[:, 1]
+        if sparse.issparse(self.X_test):
+            # The API scores dense rows; densify in slices to bound memory
+            actual = np.concatenate([compiled.predict_proba(self.X_test[start:start + 10_000].toarray())[:, 1]
+                                     for start in range(0, self.X_test.shape[0], 10_000)])
+        else:
+            actual = compiled.predict_proba(self.X_test[self.feature_cols].to_numpy())[:, 1]
+        max_diff = float(np.abs(expected - actual).max())
+        if max_diff > tolerance:
+            print(f"⚠️ Compiled model not exported: max |Δp| = {max_diff:.2e} exceeds {tolerance:.0e}")
+            return
+        
+        compiled.save(path)
+        print(f"✅ Compiled model saved: {path} "
+              f"({compiled.meta['n_trees']} trees, {compiled.meta['n_nodes']:,} nodes, max |Δp| = {max_diff:.2e})")
+    
     def _create_summary_report(self):
         """Create summary report"""
         report_path = Path("models") / "training_summary.txt"
@@ -324,8 +700,8 @@ class CreditScoringTrainer:
             f.write("="*80 + "\n\n")
             f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Dataset: {self.data_path}\n")
-            f.write(f"Training samples: {len(self.X_train):,}\n")
-            f.write(f"Test samples: {len(self.X_test):,}\n")
+            f.write(f"Training samples: {self.X_train.shape[0]:,}\n")
+            f.write(f"Test samples: {self.X_test.shape[0]:,}\n")
             f.write(f"Features: {len(self.feature_cols)}\n\n")
             
             f.write("="*80 + "\n")
@@ -350,6 +726,17 @@ class CreditScoringTrainer:
                 f.write(f"{metrics['f1_score']:<12.4f} ")
                 f.write(f"{metrics['roc_auc']:<12.4f}\n")
             
+            timed = [(name, m) for name, m in sorted_results if 'train_wall_seconds' in m]
+            if timed:
+                f.write("\n" + "="*80 + "\n")
+                f.write("TRAINING COST\n")
+                f.write("="*80 + "\n\n")
+                f.write(f"{'Model':<20} {'Cores':<8} {'Wall (s)':<12} {'CPU (s)':<12}\n")
+                f.write("-"*80 + "\n")
+                for name, metrics in timed:
+                    f.write(f"{metrics['model_name']:<20} {metrics['cores']:<8} ")
+                    f.write(f"{metrics['train_wall_seconds']:<12.2f} {metrics['train_cpu_seconds']:<12.2f}\n")
+            
             f.write("\n" + "="*80 + "\n")
             f.write(f"BEST MODEL: {self.best_model[0] if self.best_model else 'N/A'}\n")
             f.write(f"BEST ROC-AUC: {self.best_score:.4f}\n")
@@ -400,10 +787,7 @@ def main():
     try:
         # Execute training pipeline
         trainer.load_data() \
-               .train_logistic_regression() \
-               .train_random_forest() \
-               .train_xgboost() \
-               .train_lightgbm() \
+               .train_all() \
                .save_results()
         
         print("\n" + "="*80)
@@ -0,0 +1,327 @@
+"""
+Compiled tree-ensemble inference for the Credit Scoring API
+
+Flattens a trained RandomForest, GradientBoosting, XGBoost or LightGBM
+classifier into array-backed node tables (feature index, threshold,
+children, leaf value) and evaluates them with vectorized NumPy, so serving
+does not need scikit-learn/XGBoost/LightGBM at all.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+
+
+NODE_ARRAYS = ['feature', 'threshold', 'left', 'right', 'value', 'default_left', 'roots']
+ROW_CHUNK = 1024
+
+
+class CompiledTreeEnsemble:
+    """
+    Array-backed binary classification tree ensemble.
+
+    Nodes of all trees are concatenated into flat arrays. Leaves point to
+    themselves as both children, so every row can be advanced through all
+    trees for max_depth steps without branching on leaf status.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.default_left = arrays['default_left']
+        self.roots = arrays['roots']
+        self.meta = meta
+        self.kind = meta['kind']
+        self.feature_names = meta['feature_names']
+        self.n_features = len(self.feature_names)
+        self.max_depth = meta['max_depth']
+        self.classes_ = np.array([0, 1])
+        # Interleaved (left, right) children so one gather advances every row
+        self._children = np.column_stack([self.left, self.right]).ravel()
+
+    @classmethod
+    def from_model(cls, model, feature_names: List[str]) -> 'CompiledTreeEnsemble':
+        """
+        Compile a fitted classifier.
+
+        Parameters:
+        -----------
+        model : estimator
+            Fitted RandomForestClassifier, GradientBoostingClassifier,
+            XGBClassifier or LGBMClassifier (binary)
+        feature_names : List[str]
+            Column order the model was trained on
+
+        Returns:
+        --------
+        CompiledTreeEnsemble : Compiled ensemble
+        """
+        name = type(model).__name__
+        if name == 'RandomForestClassifier':
+            trees, meta = _compile_random_forest(model)
+        elif name == 'GradientBoostingClassifier':
+            trees, meta = _compile_gradient_boosting(model)
+        elif name == 'XGBClassifier':
+            trees, meta = _compile_xgboost(model, feature_names)
+        elif name == 'LGBMClassifier':
+            trees, meta = _compile_lightgbm(model)
+        else:
+            raise ValueError(f"Cannot compile model of type {name}")
+
+        meta['source'] = name
+        meta['feature_names'] = list(feature_names)
+        return cls(*_flatten(trees, meta))
+
+    def decision_function(self, X) -> np.ndarray:
+        """Aggregate raw score per row (mean leaf probability or summed margin)"""
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_numpy()
+        X = np.asarray(X, dtype=self.meta['input_dtype'])
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        # Node tables index a flattened X, so a wrong width would read neighbouring rows
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has shape {X.shape}, but CompiledTreeEnsemble is expecting "
+                             f"{self.n_features} features as input")
+
+        # Row chunks keep the (rows x trees) working set cache-resident
+        scores = np.empty(X.shape[0])
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            scores[start:start + ROW_CHUNK] = self._score_chunk(np.ascontiguousarray(X[start:start + ROW_CHUNK]))
+        return scores
+
+    def _score_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat_x = X.ravel()
+        has_nan = np.isnan(flat_x).any()
+        # XGBoost models fitted with e.g. missing=0.0 (sparse training) treat that value as missing too
+        missing = self.meta.get('missing')
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            x = flat_x[row_offset + self.feature[node]]
+            threshold = self.threshold[node]
+            # XGBoost takes the left branch on x < t, sklearn/LightGBM on x <= t
+            go_right = x >= threshold if self.meta['strict'] else x > threshold
+            if has_nan or missing is not None:
+                absent = np.isnan(x) if missing is None else np.isnan(x) | (x == missing)
+                go_right = np.where(absent, ~self.default_left[node], go_right)
+            node = self._children[2 * node + go_right]
+
+        leaves = self.value[node]
+        if self.meta['aggregation'] == 'mean':
+            return leaves.mean(axis=1)
+        return self.meta['base_score'] + leaves.sum(axis=1)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, shape (n_rows, 2)"""
+        score = self.decision_function(X)
+        if self.meta['aggregation'] == 'mean':
+            p1 = score
+        else:
+            p1 = 1.0 / (1.0 + np.exp(-score))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+    def save(self, path) -> None:
+        """
+        Save as a directory of .npy node tables plus meta.json.
+
+        Files are written under a temporary name and renamed into place, so
+        a process that has the previous tables memory-mapped keeps reading
+        the old inodes instead of a truncated file.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in NODE_ARRAYS:
+            tmp = path / f"{name}.npy.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, getattr(self, name))
+            os.replace(tmp, path / f"{name}.npy")
+        tmp = path / "meta.json.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, path / "meta.json")
+
+    @classmethod
+    def load(cls, path, mmap_mode: str = None) -> 'CompiledTreeEnsemble':
+        """Load a saved ensemble; mmap_mode='r' shares node tables between processes"""
+        path = Path(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in NODE_ARRAYS}
+        return cls(arrays, meta)
+
+
+def _sklearn_tree(tree, leaf_values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Node table for a fitted sklearn Tree; leaf_values has one entry per node"""
+    missing_left = getattr(tree, 'missing_go_to_left', None)
+    return {
+        'feature': tree.feature,
+        'threshold': tree.threshold,
+        'left': tree.children_left,
+        'right': tree.children_right,
+        'value': leaf_values,
+        'default_left': missing_left.astype(bool) if missing_left is not None else np.zeros(tree.node_count, dtype=bool),
+    }
+
+
+def _compile_random_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        counts = estimator.tree_.value[:, 0, :]
+        totals = counts.sum(axis=1)
+        trees.append(_sklearn_tree(estimator.tree_, counts[:, 1] / np.where(totals == 0, 1, totals)))
+    # sklearn trees evaluate on float32 inputs against float64 thresholds
+    return trees, {'kind': 'random_forest', 'aggregation': 'mean', 'strict': False,
+                   'input_dtype': 'float32', 'base_score': 0.0}
+
+
+def _compile_gradient_boosting(model):
+    if model.estimators_.shape[1] != 1:
+        raise ValueError("Only binary GradientBoostingClassifier models can be compiled")
+    trees = [
+        _sklearn_tree(estimator.tree_, estimator.tree_.value[:, 0, 0] * model.learning_rate)
+        for estimator in model.estimators_[:, 0]
+    ]
+    probe = np.zeros((1, model.n_features_in_))
+    base_score = float(model._raw_predict_init(probe)[0, 0])
+    return trees, {'kind': 'gradient_boosting', 'aggregation': 'sum', 'strict': False,
+                   'input_dtype': 'float32', 'base_score': base_score}
+
+
+def _compile_xgboost(model, feature_names: List[str]):
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    objective = config['learner']['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Only binary:logistic XGBoost models can be compiled, got {objective}")
+    # Stored as e.g. "5E-1" (XGBoost 2.x) or "[5E-1]" (vector-leaf capable releases)
+    base_prob = float(config['learner']['learner_model_param']['base_score'].strip('[]'))
+    booster_features = booster.feature_names or [f"f{i}" for i in range(len(feature_names))]
+    feature_index = {name: i for i, name in enumerate(booster_features)}
+
+    trees = []
+    dump = booster.trees_to_dataframe()
+    for _, tree_df in dump.groupby('Tree', sort=True):
+        tree_df = tree_df.sort_values('Node')
+        n_nodes = int(tree_df['Node'].max()) + 1
+        tree = {
+            'feature': np.full(n_nodes, -2, dtype=np.int64),
+            'threshold': np.zeros(n_nodes),
+            'left': np.full(n_nodes, -1, dtype=np.int64),
+            'right': np.full(n_nodes, -1, dtype=np.int64),
+            'value': np.zeros(n_nodes),
+            'default_left': np.zeros(n_nodes, dtype=bool),
+        }
+        for row in tree_df.itertuples():
+            node = int(row.Node)
+            if row.Feature == 'Leaf':
+                tree['value'][node] = row.Gain
+                continue
+            yes = int(row.Yes.split('-')[1])
+            tree['feature'][node] = feature_index[row.Feature]
+            tree['threshold'][node] = np.float32(row.Split)
+            tree['left'][node] = yes
+            tree['right'][node] = int(row.No.split('-')[1])
+            tree['default_left'][node] = row.Missing == row.Yes
+        trees.append(tree)
+
+    # XGBoost takes the "yes" branch when x < split, comparing in float32
+    meta = {'kind': 'xgboost', 'aggregation': 'sum', 'strict': True, 'input_dtype': 'float32',
+            'base_score': float(np.log(base_prob / (1 - base_prob)))}
+    missing = model.get_params().get('missing')
+    if missing is not None and not np.isnan(missing):
+        meta['missing'] = float(missing)
+    return trees, meta
+
+
+def _compile_lightgbm(model):
+    dump = model.booster_.dump_model()
+    if dump.get('objective', 'binary').split()[0] != 'binary':
+        raise ValueError(f"Only binary LightGBM models can be compiled, got {dump.get('objective')}")
+
+    trees = []
+    for info in dump['tree_info']:
+        feature, threshold, left, right, value, default_left = [], [], [], [], [], []
+
+        def visit(node) -> int:
+            idx = len(feature)
+            for column in (feature, threshold, left, right, value, default_left):
+                column.append(None)
+            if 'leaf_value' in node:
+                feature[idx], threshold[idx], left[idx], right[idx] = -2, 0.0, -1, -1
+                value[idx], default_left[idx] = node['leaf_value'], False
+                return idx
+            if node['decision_type'] != '<=':
+                raise ValueError("Categorical LightGBM splits cannot be compiled")
+            feature[idx], threshold[idx], value[idx] = node['split_feature'], node['threshold'], 0.0
+            # With missing_type 'None' LightGBM scores NaN as 0.0
+            if node.get('missing_type') == 'None':
+                default_left[idx] = 0.0 <= node['threshold']
+            else:
+                default_left[idx] = node['default_left']
+            left[idx] = visit(node['left_child'])
+            right[idx] = visit(node['right_child'])
+            return idx
+
+        visit(info['tree_structure'])
+        trees.append({
+            'feature': np.array(feature, dtype=np.int64),
+            'threshold': np.array(threshold, dtype=np.float64),
+            'left': np.array(left, dtype=np.int64),
+            'right': np.array(right, dtype=np.int64),
+            'value': np.array(value, dtype=np.float64),
+            'default_left': np.array(default_left, dtype=bool),
+        })
+
+    return trees, {'kind': 'lightgbm', 'aggregation': 'sum', 'strict': False,
+                   'input_dtype': 'float64', 'base_score': 0.0}
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [child for node in frontier if left[node] != -1 for child in (left[node], right[node])]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+def _flatten(trees: List[Dict[str, np.ndarray]], meta: Dict[str, Any]):
+    """Concatenate per-tree node tables, offset child indices and make leaves self-loops"""
+    offsets = np.cumsum([0] + [len(t['left']) for t in trees])
+    columns = {name: [] for name in NODE_ARRAYS if name != 'roots'}
+    max_depth = 0
+    for tree, offset in zip(trees, offsets):
+        is_leaf = tree['left'] == -1
+        node_ids = np.arange(len(is_leaf)) + offset
+        columns['feature'].append(np.where(is_leaf, 0, tree['feature']))
+        columns['threshold'].append(np.where(is_leaf, 0.0, tree['threshold']))
+        columns['left'].append(np.where(is_leaf, node_ids, tree['left'] + offset))
+        columns['right'].append(np.where(is_leaf, node_ids, tree['right'] + offset))
+        columns['value'].append(np.where(is_leaf, tree['value'], 0.0))
+        columns['default_left'].append(tree['default_left'])
+        max_depth = max(max_depth, _tree_depth(tree['left'], tree['right']))
+
+    arrays = {
+        'feature': np.concatenate(columns['feature']).astype(np.int32),
+        'threshold': np.concatenate(columns['threshold']).astype(np.float32 if meta['strict'] else np.float64),
+        'left': np.concatenate(columns['left']).astype(np.int32),
+        'right': np.concatenate(columns['right']).astype(np.int32),
+        'value': np.concatenate(columns['value']).astype(np.float64),
+        'default_left': np.concatenate(columns['default_left']).astype(bool),
+        'roots': offsets[:-1].astype(np.int32),
+    }
+    meta['max_depth'] = int(max_depth)
+    meta['n_trees'] = len(trees)
+    meta['n_nodes'] = int(offsets[-1])
+    return arrays, meta
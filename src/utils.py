@@ -1,18 +1,107 @@
 """
 Utility functions for the Credit Scoring project
+
+matplotlib and seaborn are imported (and the plot style applied) by the
+first plot helper called, so importing this module for its data and
+metric helpers costs little more than pandas. In headless mode (see
+set_report_dir / report_figures, or the PLOT_REPORT_DIR environment
+variable) plot helpers save numbered PNGs to a report directory instead
+of calling plt.show().
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple, Any
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Iterable, Iterator, Optional, Union
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set visualization defaults
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+try:
+    from ingestion import STREAM_CHUNK_ROWS
+    from profiling import DatasetProfile, profile_dataset
+except ImportError:
+    from src.ingestion import STREAM_CHUNK_ROWS
+    from src.profiling import DatasetProfile, profile_dataset
+
+# Rows a plot helper draws from directly; larger frames are sampled or pre-aggregated
+PLOT_ROW_BUDGET = 100_000
+# Row bins of the missing-value heatmap when it is pre-aggregated
+HEATMAP_BINS = 500
+# Correlation heatmaps with more columns are drawn without cell annotations
+ANNOT_MAX_COLUMNS = 25
+
+# Figures are saved here instead of shown when set (headless mode)
+PLOT_REPORT_DIR_ENV = 'PLOT_REPORT_DIR'
+_figure_report = {'directory': os.environ.get(PLOT_REPORT_DIR_ENV) or None, 'count': 0, 'saved': []}
+
+
+@lru_cache(maxsize=None)
+def _plotting():
+    """(pyplot, seaborn), imported and styled on first use; headless mode without a GUI backend"""
+    import matplotlib
+    if _figure_report['directory'] is not None and 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    # Set visualization defaults
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    return plt, sns
+
+
+def set_plot_style() -> None:
+    """Import matplotlib/seaborn now and apply the project's plot style (e.g. for a notebook's own figures)"""
+    _plotting()
+
+
+def set_report_dir(directory: Optional[Union[str, Path]]) -> None:
+    """
+    Headless mode: plot helpers save each figure to directory as a numbered
+    PNG (01_missing_values.png, ...) and close it instead of calling
+    plt.show(). None switches back to showing figures.
+    """
+    _figure_report.update(directory=None if directory is None else str(directory), count=0, saved=[])
+
+
+@contextmanager
+def report_figures(directory: Union[str, Path]) -> Iterator[List[Path]]:
+    """
+    Headless mode for a block of plot calls; yields the list of figure files written in it.
+    
+    Example:
+    --------
+    with report_figures("reports/figures/eda") as figures:
+        plot_missing_values(df)
+        plot_correlation_matrix(df)
+    """
+    previous = _figure_report['directory']
+    set_report_dir(directory)
+    try:
+        yield _figure_report['saved']
+    finally:
+        set_report_dir(previous)
+
+
+def _finish_figure(name: str) -> Optional[Path]:
+    """Lay out the current figure, then show it or, in headless mode, save and close it"""
+    plt, _ = _plotting()
+    plt.tight_layout()
+    if _figure_report['directory'] is None:
+        plt.show()
+        return None
+    _figure_report['count'] += 1
+    path = Path(_figure_report['directory']) / f"{_figure_report['count']:02d}_{name}.png"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    plt.savefig(path, dpi=100, bbox_inches='tight')
+    plt.close()
+    _figure_report['saved'].append(path)
+    print(f"✅ Figure saved: {path}")
+    return path
 
 
 def print_section_header(title: str, char: str = "=") -> None:
@@ -22,53 +111,166 @@ def print_section_header(title: str, char: str = "=") -> None:
     print(f"{char * 80}\n")
 
 
-def dataset_overview(df: pd.DataFrame, name: str = "Dataset") -> None:
+def dataset_overview(df: Union[pd.DataFrame, str, Path, Iterable[pd.DataFrame]], name: str = None, *,
+                     chunksize: int = STREAM_CHUNK_ROWS) -> DatasetProfile:
     """
-    Print comprehensive dataset overview.
+    Profile a dataset for an overview (see print_overview).
+    
+    All figures come from one pass over the data (profile_dataset), so df
+    can also be a CSV/Parquet path or an iterable of chunks that does not
+    fit in memory. Quartiles and distinct counts are approximate (see
+    profiling.py); duplicate rows are exact up to 64-bit hash collisions
+    unless the profile says otherwise.
     
     Parameters:
     -----------
-    df : pd.DataFrame
+    df : pd.DataFrame, str, Path or iterable of DataFrames
         The dataset to analyze
+    name : str
+        Deprecated: when given, the overview is also printed under this
+        name, as dataset_overview(df, name) used to; call print_overview
+    chunksize : int
+        Rows profiled at a time
+    
+    Returns:
+    --------
+    DatasetProfile : Shape, memory, types, missing values, duplicates and numeric summary
+    """
+    profile = profile_dataset(df, chunksize)
+    if name is not None:
+        warnings.warn("dataset_overview(df, name) printing is deprecated; use "
+                      "print_overview(dataset_overview(df), name)", DeprecationWarning, stacklevel=2)
+        print_overview(profile, name)
+    return profile
+
+
+def print_overview(profile: DatasetProfile, name: str = "Dataset") -> None:
+    """
+    Print comprehensive dataset overview.
+    
+    Parameters:
+    -----------
+    profile : DatasetProfile
+        Profile from dataset_overview
     name : str
         Name of the dataset for display
     """
     print_section_header(f"{name} Overview")
     
-    print(f"Shape: {df.shape[0]:,} rows × {df.shape[1]:,} columns")
-    print(f"Memory Usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-    print(f"\nColumn Types:")
-    print(df.dtypes.value_counts())
+    print(f"Shape: {profile.rows:,} rows × {len(profile.columns):,} columns")
+    print(f"Memory Usage: {profile.memory_bytes / 1024**2:.2f} MB")
+    print("\nColumn Types:")
+    print(profile.dtype_counts())
     
-    print(f"\nMissing Values:")
-    missing = df.isnull().sum()
-    missing_pct = (missing / len(df)) * 100
-    missing_df = pd.DataFrame({
-        'Missing Count': missing[missing > 0],
-        'Percentage': missing_pct[missing > 0]
-    }).sort_values('Percentage', ascending=False)
+    print("\nMissing Values:")
+    missing_df = profile.missing()
     
     if len(missing_df) > 0:
         print(missing_df)
     else:
         print("No missing values found!")
     
-    print(f"\nDuplicate Rows: {df.duplicated().sum():,}")
+    approximate = "" if profile.duplicates_exact else " (estimated)"
+    print(f"\nDuplicate Rows: {profile.duplicate_rows:,}{approximate}")
+    
+    print("\nNumerical Columns Summary:")
+    print(profile.describe())
+
+
+def report_plot_strategy(plot: str, strategy: str, detail: str = "") -> str:
+    """Print how a plot helper reduced its input (nothing for 'full') and return the strategy"""
+    if strategy != 'full':
+        print(f"   {plot}: {strategy}" + (f" ({detail})" if detail else ""))
+    return strategy
+
+
+def sample_rows(df: pd.DataFrame, max_rows: int = PLOT_ROW_BUDGET, stratify: str = None,
+                seed: int = 42) -> pd.DataFrame:
+    """
+    Random sample of at most max_rows rows, in their original order.
+    
+    With stratify, each value of that column (missing values as one more
+    group) keeps its share of rows, and every group keeps at least one row,
+    so rare classes such as defaults stay visible.
+    """
+    if len(df) <= max_rows:
+        return df
+    rng = np.random.default_rng(seed)
+    if stratify is None:
+        idx = rng.choice(len(df), max_rows, replace=False)
+    else:
+        groups = pd.factorize(df[stratify])[0] + 1
+        counts = np.bincount(groups)
+        quota = np.maximum(counts * max_rows // len(df), counts > 0)
+        # A random permutation grouped by a stable sort is a random order within each group
+        order = rng.permutation(len(df))
+        order = order[np.argsort(groups[order], kind='stable')]
+        starts = np.cumsum(counts) - counts
+        idx = np.concatenate([order[start:start + q] for start, q in zip(starts, quota)])
+    return df.iloc[np.sort(idx)]
+
+
+def null_density(df: pd.DataFrame, bins: int = HEATMAP_BINS) -> pd.DataFrame:
+    """Share of missing values of each column in `bins` consecutive, equal row ranges (indexed by first row)"""
+    bins = max(min(bins, len(df)), 1)
+    starts = np.linspace(0, len(df), bins + 1).astype(np.int64)[:-1]
+    sizes = np.diff(np.append(starts, len(df)))
+    return pd.DataFrame({col: np.add.reduceat(df[col].isna().to_numpy(), starts, dtype=np.int64) / sizes
+                         for col in df.columns}, index=starts)
+
+
+def histogram_counts(values: pd.Series, bins: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+    """(counts, edges) of the non-missing values, the bins Series.hist(bins=bins) draws"""
+    x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.histogram(x[~np.isnan(x)], bins=bins)
+
+
+def box_stats(values: pd.Series, whis: float = 1.5, max_fliers: int = PLOT_ROW_BUDGET,
+              seed: int = 42) -> Dict[str, Any]:
+    """
+    Boxplot statistics for Axes.bxp, as matplotlib computes them from the raw values.
     
-    print(f"\nNumerical Columns Summary:")
-    print(df.describe().T)
+    Quartiles and whiskers are exact. If there are more than max_fliers
+    outliers, a random sample of them is kept, always including the most
+    extreme on each side, so the plotted range is unchanged.
+    """
+    x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    x = x[~np.isnan(x)]
+    q1, med, q3 = np.percentile(x, [25, 50, 75])
+    low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    outside = (x < low) | (x > high)
+    fliers = x[outside]
+    n_fliers = len(fliers)
+    if n_fliers > max_fliers:
+        keep = np.random.default_rng(seed).choice(n_fliers, max(max_fliers - 2, 0), replace=False)
+        fliers = np.concatenate([fliers[keep], [fliers.min(), fliers.max()]])
+    inside = x[~outside]
+    return {'label': values.name, 'q1': q1, 'med': med, 'q3': q3,
+            'whislo': inside.min() if len(inside) else q1, 'whishi': inside.max() if len(inside) else q3,
+            'fliers': fliers, 'n_fliers': n_fliers}
 
 
-def plot_missing_values(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 6)) -> None:
+def plot_missing_values(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 6),
+                        max_rows: int = PLOT_ROW_BUDGET) -> str:
     """
     Visualize missing values in the dataset.
     
+    The heatmap draws one cell per row and column up to max_rows rows;
+    beyond that it shows the share of missing values in HEATMAP_BINS
+    consecutive row ranges, which looks the same at screen resolution.
+    
     Parameters:
     -----------
     df : pd.DataFrame
         The dataset to analyze
     figsize : Tuple[int, int]
         Figure size
+    max_rows : int
+        Row budget of the heatmap
+    
+    Returns:
+    --------
+    str : 'full' or 'binned'
     """
     missing = df.isnull().sum()
     missing_pct = (missing / len(df)) * 100
@@ -81,8 +283,9 @@ def plot_missing_values(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 6)) ->
     
     if len(missing_df) == 0:
         print("No missing values to visualize!")
-        return
+        return 'full'
     
+    plt, sns = _plotting()
     fig, axes = plt.subplots(1, 2, figsize=figsize)
     
     # Bar plot
@@ -92,17 +295,31 @@ def plot_missing_values(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 6)) ->
     axes[0].grid(axis='x', alpha=0.3)
     
     # Heatmap
-    sns.heatmap(df.isnull().T, cmap='YlOrRd', cbar=True, ax=axes[1])
-    axes[1].set_title('Missing Values Heatmap')
-    
-    plt.tight_layout()
-    plt.show()
+    if len(df) <= max_rows:
+        strategy = report_plot_strategy('Missing values heatmap', 'full')
+        sns.heatmap(df.isnull().T, cmap='YlOrRd', cbar=True, ax=axes[1])
+        axes[1].set_title('Missing Values Heatmap')
+    else:
+        density = null_density(df)
+        strategy = report_plot_strategy('Missing values heatmap', 'binned',
+                                        f"{len(density):,} row bins of ~{len(df) // len(density):,} rows")
+        sns.heatmap(density.T, cmap='YlOrRd', vmin=0, vmax=1, cbar=True, ax=axes[1])
+        axes[1].set_xlabel('First row of bin')
+        axes[1].set_title('Missing Values Heatmap (share missing per row bin)')
+    
+    _finish_figure('missing_values')
+    return strategy
 
 
-def plot_distribution(df: pd.DataFrame, columns: List[str], ncols: int = 3, figsize: Tuple[int, int] = (15, 10)) -> None:
+def plot_distribution(df: pd.DataFrame, columns: List[str], ncols: int = 3, figsize: Tuple[int, int] = (15, 10),
+                      max_rows: int = PLOT_ROW_BUDGET) -> str:
     """
     Plot distributions of numerical columns.
     
+    Beyond max_rows rows the 30 bin counts are computed with np.histogram
+    and drawn as weights, so matplotlib gets 30 values per column instead
+    of every row; the bars are the same.
+    
     Parameters:
     -----------
     df : pd.DataFrame
@@ -113,14 +330,29 @@ def plot_distribution(df: pd.DataFrame, columns: List[str], ncols: int = 3, figs
         Number of columns in subplot grid
     figsize : Tuple[int, int]
         Figure size
+    max_rows : int
+        Row budget above which histograms are pre-binned
+    
+    Returns:
+    --------
+    str : 'full' or 'binned'
     """
+    binned = len(df) > max_rows
+    strategy = report_plot_strategy('Distributions', 'binned' if binned else 'full',
+                                    f"bin counts of {len(df):,} rows")
+    plt, _ = _plotting()
     nrows = (len(columns) + ncols - 1) // ncols
     fig, axes = plt.subplots(nrows, ncols, figsize=figsize)
     axes = axes.flatten() if len(columns) > 1 else [axes]
     
     for idx, col in enumerate(columns):
         if idx < len(axes):
-            df[col].hist(bins=30, ax=axes[idx], edgecolor='black', alpha=0.7)
+            if binned:
+                counts, edges = histogram_counts(df[col], bins=30)
+                axes[idx].hist(edges[:-1], bins=edges, weights=counts, edgecolor='black', alpha=0.7)
+                axes[idx].grid(True)
+            else:
+                df[col].hist(bins=30, ax=axes[idx], edgecolor='black', alpha=0.7)
             axes[idx].set_title(f'Distribution of {col}')
             axes[idx].set_xlabel(col)
             axes[idx].set_ylabel('Frequency')
@@ -130,14 +362,21 @@ def plot_distribution(df: pd.DataFrame, columns: List[str], ncols: int = 3, figs
     for idx in range(len(columns), len(axes)):
         axes[idx].axis('off')
     
-    plt.tight_layout()
-    plt.show()
+    _finish_figure('distribution')
+    return strategy
 
 
-def plot_correlation_matrix(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 10), method: str = 'pearson') -> None:
+def plot_correlation_matrix(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 10), method: str = 'pearson',
+                            max_rows: int = PLOT_ROW_BUDGET, stratify: str = None) -> str:
     """
     Plot correlation matrix heatmap.
     
+    Beyond max_rows rows the correlations are computed on a random sample
+    of max_rows rows (stratified by a column if given, see sample_rows);
+    at 100,000 rows a correlation's standard error is at most about 0.003,
+    so the two decimals shown rarely move by more than 0.01. Cells are annotated up
+    to ANNOT_MAX_COLUMNS columns.
+    
     Parameters:
     -----------
     df : pd.DataFrame
@@ -146,23 +385,37 @@ def plot_correlation_matrix(df: pd.DataFrame, figsize: Tuple[int, int] = (12, 10
         Figure size
     method : str
         Correlation method ('pearson', 'spearman', 'kendall')
+    max_rows : int
+        Row budget for the correlation
+    stratify : str, optional
+        Column whose value shares the sample keeps (e.g. the target)
+    
+    Returns:
+    --------
+    str : 'full', 'sample' or 'stratified sample'
     """
     # Select only numerical columns
     numerical_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
     if len(numerical_cols) < 2:
         print("Not enough numerical columns for correlation analysis!")
-        return
+        return 'full'
     
-    corr_matrix = df[numerical_cols].corr(method=method)
+    if len(df) <= max_rows:
+        strategy = report_plot_strategy('Correlation matrix', 'full')
+    else:
+        strategy = report_plot_strategy('Correlation matrix', 'stratified sample' if stratify else 'sample',
+                                        f"{max_rows:,} of {len(df):,} rows")
+    corr_matrix = sample_rows(df, max_rows, stratify)[numerical_cols].corr(method=method)
     
+    plt, sns = _plotting()
     plt.figure(figsize=figsize)
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-    sns.heatmap(corr_matrix, mask=mask, annot=True, fmt='.2f', cmap='coolwarm', 
+    sns.heatmap(corr_matrix, mask=mask, annot=len(numerical_cols) <= ANNOT_MAX_COLUMNS, fmt='.2f', cmap='coolwarm',
                 center=0, square=True, linewidths=1, cbar_kws={"shrink": 0.8})
     plt.title(f'{method.capitalize()} Correlation Matrix', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.show()
+    _finish_figure(f'correlation_{method}')
+    return strategy
 
 
 def detect_outliers_iqr(df: pd.DataFrame, column: str, multiplier: float = 1.5) -> pd.Series:
@@ -191,10 +444,16 @@ def detect_outliers_iqr(df: pd.DataFrame, column: str, multiplier: float = 1.5)
     return (df[column] < lower_bound) | (df[column] > upper_bound)
 
 
-def plot_outliers_boxplot(df: pd.DataFrame, columns: List[str], ncols: int = 3, figsize: Tuple[int, int] = (15, 10)) -> None:
+def plot_outliers_boxplot(df: pd.DataFrame, columns: List[str], ncols: int = 3, figsize: Tuple[int, int] = (15, 10),
+                          max_rows: int = PLOT_ROW_BUDGET) -> str:
     """
     Plot boxplots to visualize outliers.
     
+    Beyond max_rows rows each box is drawn from its statistics (box_stats:
+    exact quartiles and whiskers, outliers sampled so the figure draws at
+    most max_rows of them) with Axes.bxp instead of handing every value to
+    matplotlib.
+    
     Parameters:
     -----------
     df : pd.DataFrame
@@ -205,14 +464,30 @@ def plot_outliers_boxplot(df: pd.DataFrame, columns: List[str], ncols: int = 3,
         Number of columns in subplot grid
     figsize : Tuple[int, int]
         Figure size
+    max_rows : int
+        Row budget above which boxes are drawn from summaries
+    
+    Returns:
+    --------
+    str : 'full' or 'summary'
     """
+    summarised = len(df) > max_rows
+    max_fliers = max_rows // max(len(columns), 1)
+    strategy = report_plot_strategy('Boxplots', 'summary' if summarised else 'full',
+                                    f"quartiles of {len(df):,} rows, up to {max_fliers:,} outliers drawn per column")
+    plt, _ = _plotting()
     nrows = (len(columns) + ncols - 1) // ncols
     fig, axes = plt.subplots(nrows, ncols, figsize=figsize)
     axes = axes.flatten() if len(columns) > 1 else [axes]
     
     for idx, col in enumerate(columns):
         if idx < len(axes):
-            df.boxplot(column=col, ax=axes[idx])
+            if summarised:
+                stats = box_stats(df[col], max_fliers=max_fliers)
+                stats.pop('n_fliers')
+                axes[idx].bxp([stats])
+            else:
+                df.boxplot(column=col, ax=axes[idx])
             axes[idx].set_title(f'Boxplot of {col}')
             axes[idx].set_ylabel(col)
             axes[idx].grid(axis='y', alpha=0.3)
@@ -221,8 +496,8 @@ def plot_outliers_boxplot(df: pd.DataFrame, columns: List[str], ncols: int = 3,
     for idx in range(len(columns), len(axes)):
         axes[idx].axis('off')
     
-    plt.tight_layout()
-    plt.show()
+    _finish_figure('outliers_boxplot')
+    return strategy
 
 
 def save_dataset(df: pd.DataFrame, filepath: str, index: bool = False) -> None: